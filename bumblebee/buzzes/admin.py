@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from bumblebee.sentiment_analysis.admin import SENTIMENT_LABEL_ACTIONS
+
 from .forms import BuzzAdminCreationForm, BuzzAdminForm
 from .models import (
     Buzz,
@@ -18,11 +20,19 @@ class BuzzAdmin(admin.ModelAdmin):
     add_form = BuzzAdminCreationForm
 
     list_display = ("id", "author", "content", "created_date")
+    actions = SENTIMENT_LABEL_ACTIONS
+
+
+class RebuzzAdmin(admin.ModelAdmin):
+    """ """
+
+    list_display = ("id", "author", "content", "created_date")
+    actions = SENTIMENT_LABEL_ACTIONS
 
 
 admin.site.register(Buzz, BuzzAdmin)
 admin.site.register(BuzzInteractions)
 admin.site.register(BuzzImage)
-admin.site.register(Rebuzz)
+admin.site.register(Rebuzz, RebuzzAdmin)
 admin.site.register(RebuzzInteractions)
 admin.site.register(RebuzzImage)
@@ -4,7 +4,10 @@ from bumblebee.buzzes.api.serializers.interaction_serializers import (
     BuzzInteractionsSerializer,
 )
 from bumblebee.buzzes.models import Buzz, BuzzImage
+from bumblebee.core.api.serializers import EagerLoadingMixin
 from bumblebee.core.exceptions import UnknownModelFieldsError
+from bumblebee.sentiment_analysis.api.serializers import SentimentAggregateSerializer
+from bumblebee.sentiment_analysis.jobs import enqueue_sentiment_job
 
 from .user_serializers import BuzzUserSerializer
 
@@ -33,9 +36,12 @@ class ListBuzzImageSerializer(serializers.ModelSerializer):
         fields = ["image"]
 
 
-class BuzzDetailSerializer(serializers.ModelSerializer):
+class BuzzDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """ """
 
+    select_related_fields = ["author__profile", "buzz_interaction", "thread_sentiment"]
+    prefetch_related_fields = ["buzz_image"]
+
     buzzid = serializers.IntegerField(source="id")
 
     created_date = serializers.DateTimeField()
@@ -55,6 +61,8 @@ class BuzzDetailSerializer(serializers.ModelSerializer):
 
     sentiment_value = serializers.FloatField() 
     textblob_value = serializers.FloatField()
+    # sentiment of the comments, null until one is scored
+    thread_sentiment = SentimentAggregateSerializer(read_only=True, allow_null=True)
 
     class Meta:
         model = Buzz
@@ -72,6 +80,7 @@ class BuzzDetailSerializer(serializers.ModelSerializer):
             "interaction",
             "sentiment_value",
             "textblob_value",
+            "thread_sentiment",
         ]
 
 
@@ -116,6 +125,8 @@ class EditBuzzSerializer(serializers.ModelSerializer):
     def update_buzz(self, buzz_instance, **validated_data):
         """ """
         try:
+            content = buzz_instance.content
+
             for key, value in validated_data.items():
                 if buzz_instance.__dict__.__contains__(key):
                     if buzz_instance.__getattribute__(key) != value:
@@ -130,6 +141,10 @@ class EditBuzzSerializer(serializers.ModelSerializer):
 
             buzz_instance.save()
 
+            # edited contents are scored again
+            if buzz_instance.content != content:
+                enqueue_sentiment_job(buzz_instance)
+
         except UnknownModelFieldsError as error:
             print(error)
             raise error
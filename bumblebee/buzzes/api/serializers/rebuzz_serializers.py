@@ -8,7 +8,9 @@ from bumblebee.buzzes.api.serializers.interaction_serializers import (
     BuzzInteractionsSerializer,
 )
 from bumblebee.buzzes.models import Rebuzz, RebuzzImage
+from bumblebee.core.api.serializers import EagerLoadingMixin
 from bumblebee.core.exceptions import UnknownModelFieldsError
+from bumblebee.sentiment_analysis.jobs import enqueue_sentiment_job
 
 from .user_serializers import RebuzzUserSerializer
 
@@ -33,9 +35,17 @@ class ListRebuzzImageSerializer(serializers.ModelSerializer):
         fields = ["image"]
 
 
-class RebuzzDetailSerializer(serializers.ModelSerializer):
+class RebuzzDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """ """
 
+    select_related_fields = [
+        "author__profile",
+        "buzz__author__profile",
+        "buzz__buzz_interaction",
+        "buzz__thread_sentiment",
+    ]
+    prefetch_related_fields = ["buzz__buzz_image"]
+
     rebuzzid = serializers.IntegerField(source="id")
 
     created_date = serializers.DateTimeField()
@@ -114,6 +124,8 @@ class EditRebuzzSerializer(serializers.ModelSerializer):
     def update_rebuzz(self, rebuzz_instance, **validated_data):
         """ """
         try:
+            content = rebuzz_instance.content
+
             for key, value in validated_data.items():
                 if rebuzz_instance.__dict__.__contains__(key):
                     if rebuzz_instance.__getattribute__(key) != value:
@@ -128,6 +140,10 @@ class EditRebuzzSerializer(serializers.ModelSerializer):
 
             rebuzz_instance.save()
 
+            # edited contents are scored again
+            if rebuzz_instance.content != content:
+                enqueue_sentiment_job(rebuzz_instance)
+
         except UnknownModelFieldsError as error:
             print(error)
             raise error
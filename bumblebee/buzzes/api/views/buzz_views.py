@@ -75,10 +75,9 @@ class UserBuzzListView(APIView):
         """ """
 
         user_instance = self._get_url_user()
-        if self.request.user == user_instance:
-            return user_instance.author_buzz.all()
-        else:
-            return user_instance.author_buzz.filter(privacy="pub")
+        buzzes = user_instance.author_buzz.visible_to(self.request.user)
+
+        return BuzzDetailSerializer.setup_eager_loading(buzzes)
 
     def get(self, request, *args, **kwargs):
         """ """
@@ -127,7 +126,9 @@ class BuzzListView(APIView):
         if buzzid_list:
             buzzes = Buzz.objects.filter(id__in=buzzid_list)
             return dict(
-                public=buzzes.filter(privacy="pub").all(),
+                public=BuzzDetailSerializer.setup_eager_loading(
+                    buzzes.filter(privacy="pub")
+                ),
                 private=set(doc.id for doc in buzzes.filter(privacy="priv")),
                 non_existing=(
                     set(buzzid_list) - set([buzz.id for buzz in buzzes.all()])
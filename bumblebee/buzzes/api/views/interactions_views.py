@@ -17,6 +17,7 @@ from bumblebee.core.helpers import create_200, create_400, create_500
 from bumblebee.core.permissions import IsBuzzPublic, IsRebuzzPublic
 from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
 from bumblebee.notifications.utils import create_notification, delete_notification
+from bumblebee.sentiment_analysis.feedback import record_downvote_feedback
 
 ########################################
 ##              BUZZ
@@ -153,6 +154,8 @@ class DownvoteBuzzView(APIView):
                 )
 
             buzz_interaction.save()
+            if task == "Added DOWNVOTE":
+                record_downvote_feedback(buzz_interaction.buzz, buzz_interaction)
 
             return Response(
                 data=create_200(
@@ -316,6 +319,8 @@ class DownvoteRebuzzView(APIView):
                     rebuzz_interaction.rebuzz,
                 )
             rebuzz_interaction.save()
+            if task == "Added DOWNVOTE":
+                record_downvote_feedback(rebuzz_interaction.rebuzz, rebuzz_interaction)
 
             return Response(
                 data=create_200(
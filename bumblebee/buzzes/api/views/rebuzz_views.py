@@ -80,10 +80,9 @@ class UserRebuzzListView(APIView):
         """ """
 
         user_instance = self._get_url_user()
-        if self.request.user == user_instance:
-            return user_instance.author_rebuzz.all()
-        else:
-            return user_instance.author_rebuzz.filter(privacy="pub")
+        rebuzzes = user_instance.author_rebuzz.visible_to(self.request.user)
+
+        return RebuzzDetailSerializer.setup_eager_loading(rebuzzes)
 
     def get(self, request, *args, **kwargs):
         """ """
@@ -135,7 +134,9 @@ class RebuzzListView(APIView):
         if rebuzzid_list:
             rebuzzes = Rebuzz.objects.filter(id__in=rebuzzid_list)
             return dict(
-                public=rebuzzes.filter(privacy="pub").all(),
+                public=RebuzzDetailSerializer.setup_eager_loading(
+                    rebuzzes.filter(privacy="pub")
+                ),
                 private=set(doc.id for doc in rebuzzes.filter(privacy="priv")),
                 non_existing=(
                     set(rebuzzid_list) - set([rebuzz.id for rebuzz in rebuzzes.all()])
@@ -0,0 +1,45 @@
+from django.db import models
+from django.db.models import Q
+
+from bumblebee.connections.models import Following
+from bumblebee.connections.utils import get_connection_ids_subquery
+
+# privacy options a follower of the author may see
+FOLLOWER_VISIBLE_PRIVACY = ["pub", "prot"]
+
+
+class BuzzQuerySet(models.QuerySet):
+    """
+    Privacy aware querysets for buzzes and rebuzzes
+
+    Privacy is filtered in SQL and served by the `(author, privacy,
+    created_date)` index, instead of checking each post after fetching it.
+    """
+
+    def public(self):
+        """Posts anyone may see"""
+
+        return self.filter(privacy=self.model.PrivacyChoices.PUBLIC)
+
+    def visible_to_followers(self):
+        """Posts a follower of their author may see"""
+
+        return self.filter(privacy__in=FOLLOWER_VISIBLE_PRIVACY)
+
+    def visible_to(self, user):
+        """
+        Posts `user` may see: their own, public ones and protected ones of
+        accounts they follow
+        """
+
+        if not user.is_authenticated:
+            return self.public()
+
+        return self.filter(
+            Q(author=user)
+            | Q(privacy=self.model.PrivacyChoices.PUBLIC)
+            | Q(
+                privacy=self.model.PrivacyChoices.PROTECTED,
+                author__in=get_connection_ids_subquery(Following, "following", user),
+            )
+        )
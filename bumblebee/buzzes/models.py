@@ -5,6 +5,8 @@ from django.urls import reverse
 
 from bumblebee.users.models import CustomUser
 
+from .managers import BuzzQuerySet
+
 ######################################
 #           BUZZ
 ######################################
@@ -44,6 +46,13 @@ class AbstractBuzz(models.Model):
 
     sentiment_value = models.FloatField(null=True, blank=True)
     textblob_value = models.FloatField(null=True, blank=True)
+    # version of the sentiment models which scored the content
+    sentiment_version = models.CharField(max_length=40, null=True, blank=True)
+
+    # rank in the top feed, refreshed periodically from interactions
+    score = models.FloatField(default=0)
+
+    objects = BuzzQuerySet.as_manager()
 
     class Meta:
         abstract = True
@@ -63,6 +72,13 @@ class Buzz(AbstractBuzz):
         verbose_name = "Buzz"
         verbose_name_plural = "Buzzes"
         ordering = ["-created_date"]
+        indexes = [
+            models.Index(fields=["author", "-score"], name="buzz_author_score_idx"),
+            models.Index(
+                fields=["author", "privacy", "-created_date"],
+                name="buzz_author_privacy_idx",
+            ),
+        ]
 
     def __str__(self):
         """ """
@@ -94,6 +110,13 @@ class Rebuzz(AbstractBuzz):
     class Meta:
         verbose_name = "Rebuzz"
         verbose_name_plural = "Rebuzzes"
+        indexes = [
+            models.Index(fields=["author", "-score"], name="rebuzz_author_score_idx"),
+            models.Index(
+                fields=["author", "privacy", "-created_date"],
+                name="rebuzz_author_privacy_idx",
+            ),
+        ]
 
     def __str__(self):
         """ """
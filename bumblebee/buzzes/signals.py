@@ -1,5 +1,5 @@
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 from bumblebee.activities.models import UserActivity
@@ -8,10 +8,12 @@ from bumblebee.notifications.models.grouped_models import (
     BuzzNotification,
     RebuzzNotification,
 )
-from bumblebee.sentiment_analysis.utils import (
-    calculate_sentiment_index,
-    calculate_textblob_value,
+from bumblebee.notifications.utils import (
+    delete_content_notifications,
+    update_notification_summaries,
 )
+from bumblebee.sentiment_analysis.aggregates import remove_from_sentiment_aggregates
+from bumblebee.sentiment_analysis.jobs import enqueue_sentiment_job
 
 from .models import Buzz, BuzzInteractions, Rebuzz, RebuzzInteractions
 
@@ -34,9 +36,7 @@ def post_save_create_interaction_activity(sender, instance, created, **kwargs):
             instance.id,
         )
 
-        instance.sentiment_value = calculate_sentiment_index(instance.content)
-        instance.textblob_value = calculate_textblob_value(instance.content)
-        instance.save()
+        enqueue_sentiment_job(instance)
 
 
 @receiver(post_save, sender=Rebuzz)
@@ -53,9 +53,23 @@ def post_save_create_interaction_activity(sender, instance, created, **kwargs):
             instance.id,
         )
 
-        instance.sentiment_value = calculate_sentiment_index(instance.content)
-        instance.textblob_value = calculate_textblob_value(instance.content)
-        instance.save()
+        enqueue_sentiment_job(instance)
+
+
+@receiver(post_delete, sender=Buzz)
+@receiver(post_delete, sender=Rebuzz)
+def post_delete_remove_sentiment(sender, instance, **kwargs):
+    """ """
+
+    remove_from_sentiment_aggregates(instance)
+
+
+@receiver(post_delete, sender=Buzz)
+@receiver(post_delete, sender=Rebuzz)
+def post_delete_delete_notifications(sender, instance, **kwargs):
+    """ """
+
+    delete_content_notifications(instance)
 
 
 #########################################
@@ -95,3 +109,12 @@ def post_save_create_interaction_activity(sender, instance, created, **kwargs):
 
 
 # NOTIFICATIONS
+
+
+@receiver(post_save, sender=BuzzInteractions)
+@receiver(post_save, sender=RebuzzInteractions)
+def post_save_update_notification_summary(sender, instance, created, **kwargs):
+    """ """
+
+    if not created:
+        update_notification_summaries(instance)
@@ -1,3 +1,207 @@
+import os
+import random
+import string
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
 from django.test import TestCase
 
-# Create your tests here.
+from bumblebee.buzzes.models import Buzz
+from bumblebee.comments.models import Comment
+from bumblebee.sentiment_analysis.cache import sentiment_cache
+from bumblebee.sentiment_analysis.feedback import (
+    apply_sentiment_feedback,
+    record_sentiment_feedback,
+)
+from bumblebee.sentiment_analysis.jobs import process_sentiment_jobs
+from bumblebee.sentiment_analysis.models import (
+    AuthorSentiment,
+    SentimentFeedback,
+    SentimentJob,
+    ThreadSentiment,
+)
+from bumblebee.sentiment_analysis.online import OnlineSentimentModel
+from bumblebee.sentiment_analysis.registry import ModelRegistry, activate_version
+from bumblebee.users.models import CustomUser
+
+
+class BuzzPrivacyTest(TestCase):
+    def random_string(self):
+        return "".join(random.choice(string.ascii_lowercase) for i in range(10))
+
+    def create_user(self):
+        user = CustomUser(
+            email=f"{self.random_string()}@{self.random_string()}.com",
+            username=self.random_string(),
+            password="123ajkdsa34fana",
+        )
+        user.save()
+        return user
+
+    def setUp(self):
+        self.author = self.create_user()
+        self.follower = self.create_user()
+        self.stranger = self.create_user()
+
+        self.follower.user_following.following.append(self.author.id)
+        self.follower.user_following.save()
+
+        self.posts = dict(
+            (
+                privacy,
+                Buzz.objects.create(
+                    author=self.author, privacy=privacy, content="hello there"
+                ),
+            )
+            for privacy in ["pub", "prot", "priv"]
+        )
+
+    def get_visible(self, user):
+        return set(Buzz.objects.visible_to(user).filter(author=self.author))
+
+    def test_author_sees_every_post(self):
+        self.assertEqual(self.get_visible(self.author), set(self.posts.values()))
+
+    def test_follower_sees_protected_posts(self):
+        self.assertEqual(
+            self.get_visible(self.follower),
+            {self.posts["pub"], self.posts["prot"]},
+        )
+
+    def test_others_see_public_posts(self):
+        self.assertEqual(self.get_visible(self.stranger), {self.posts["pub"]})
+        self.assertEqual(self.get_visible(AnonymousUser()), {self.posts["pub"]})
+
+
+class BuzzSentimentJobTest(TestCase):
+    def setUp(self):
+        self.author = CustomUser(
+            email="sentiment@bumblebee.com",
+            username="sentiment",
+            password="123ajkdsa34fana",
+        )
+        self.author.save()
+
+    def test_buzz_is_scored_by_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            buzz = Buzz.objects.create(author=self.author, content="what a lovely day")
+
+        buzz.refresh_from_db()
+        self.assertIsNone(buzz.sentiment_value)
+        initial_score = buzz.score
+        self.assertEqual(SentimentJob.objects.count(), 1)
+
+        self.assertEqual(process_sentiment_jobs(), 1)
+
+        buzz.refresh_from_db()
+        self.assertIsNotNone(buzz.sentiment_value)
+        self.assertIsNotNone(buzz.textblob_value)
+        self.assertNotEqual(buzz.score, initial_score)
+        self.assertFalse(SentimentJob.objects.exists())
+
+    def test_failed_scoring_is_logged_and_retried(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Buzz.objects.create(author=self.author, content="what a lovely day")
+
+        with mock.patch(
+            "bumblebee.sentiment_analysis.jobs._score_instances",
+            side_effect=ValueError("no models"),
+        ), self.assertLogs("bumblebee.sentiment_analysis.jobs", "ERROR") as logs:
+            process_sentiment_jobs()
+
+        self.assertIn("Sentiment scoring of Buzz failed", logs.output[0])
+        self.assertEqual(SentimentJob.objects.get().attempts, 1)
+
+    def test_repeated_content_is_scored_once(self):
+        sentiment_cache.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for content in ["what a lovely day", "what  a lovely\nday"]:
+                Buzz.objects.create(author=self.author, content=content)
+        process_sentiment_jobs()
+
+        self.assertEqual(sentiment_cache.stats["misses"], 1)
+        self.assertEqual(
+            Buzz.objects.values("sentiment_value", "textblob_value").distinct().count(),
+            1,
+        )
+
+    def test_feedback_publishes_online_version(self):
+        negative = SentimentFeedback.LabelChoices.NEGATIVE
+        buzzes = [
+            Buzz.objects.create(author=self.author, content=f"awful terrible day {i}")
+            for i in range(4)
+        ]
+        for buzz in buzzes:
+            record_sentiment_feedback(
+                buzz, negative, SentimentFeedback.SourceChoices.MODERATOR
+            )
+
+        with tempfile.TemporaryDirectory() as versions_dir:
+            current_file = os.path.join(versions_dir, "CURRENT")
+            model = OnlineSentimentModel(n_features=2**10).partial_fit(
+                ["lovely day", "awful day"], [1, 0]
+            )
+            activate_version(model.save(versions_dir), current_file, versions_dir)
+
+            registry = ModelRegistry(
+                current_file=current_file, versions_dir=versions_dir, check_interval=0
+            )
+            before = registry.get_engine().score(["awful terrible day"])[0]
+
+            partial_fit = OnlineSentimentModel.partial_fit
+
+            def relabel(model, *args, **kwargs):
+                # a moderator changes a label while the batch is applied
+                record_sentiment_feedback(
+                    buzzes[3],
+                    SentimentFeedback.LabelChoices.POSITIVE,
+                    SentimentFeedback.SourceChoices.MODERATOR,
+                )
+                return partial_fit(model, *args, **kwargs)
+
+            with mock.patch.object(OnlineSentimentModel, "partial_fit", relabel):
+                version, metrics = apply_sentiment_feedback(
+                    batch_size=2, versions_dir=versions_dir, current_file=current_file
+                )
+
+            self.assertEqual(metrics["feedback_rows"], 4)
+            self.assertEqual(registry.get_model_version(), version)
+            self.assertLess(
+                registry.get_engine().score(["awful terrible day"])[0], before
+            )
+            self.assertEqual(
+                list(
+                    SentimentFeedback.objects.exclude(
+                        applied_version=version
+                    ).values_list("object_id", "applied_version")
+                ),
+                [(buzzes[3].id, None)],
+            )
+
+    def test_scored_comments_update_aggregates(self):
+        buzz = Buzz.objects.create(author=self.author, content="what a lovely day")
+        with self.captureOnCommitCallbacks(execute=True):
+            comments = [
+                Comment.objects.create(
+                    commenter=self.author, parent_buzz=buzz, content=content
+                )
+                for content in ["lovely indeed", "what an awful day"]
+            ]
+        process_sentiment_jobs()
+
+        values = [
+            Comment.objects.get(id=comment.id).sentiment_value for comment in comments
+        ]
+        thread = ThreadSentiment.objects.get(buzz=buzz)
+        self.assertEqual(thread.count, 2)
+        self.assertAlmostEqual(thread.mean, sum(values) / 2)
+        self.assertEqual(AuthorSentiment.objects.get(user=self.author).count, 2)
+
+        Comment.objects.get(id=comments[0].id).delete()
+
+        thread.refresh_from_db()
+        self.assertEqual(thread.count, 1)
+        self.assertAlmostEqual(thread.mean, values[1])
+        self.assertAlmostEqual(thread.variance, 0.0)
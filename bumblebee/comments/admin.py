@@ -1,7 +1,17 @@
 from django.contrib import admin
 
+from bumblebee.sentiment_analysis.admin import SENTIMENT_LABEL_ACTIONS
+
 from .models import Comment, CommentInteractions, CommentUpvoteDownvoteMeta
 
-admin.site.register(Comment)
+
+class CommentAdmin(admin.ModelAdmin):
+    """ """
+
+    list_display = ("id", "commenter", "content", "created_date")
+    actions = SENTIMENT_LABEL_ACTIONS
+
+
+admin.site.register(Comment, CommentAdmin)
 admin.site.register(CommentInteractions)
 admin.site.register(CommentUpvoteDownvoteMeta)
@@ -5,7 +5,9 @@ Serializers for Comments
 from rest_framework import serializers
 
 from bumblebee.comments.models import Comment
+from bumblebee.core.api.serializers import EagerLoadingMixin
 from bumblebee.core.exceptions import UnknownModelFieldsError
+from bumblebee.sentiment_analysis.jobs import enqueue_sentiment_job
 
 from .commenter_serializers import CommentUserSerializer
 from .interaction_serializers import CommentInteractionsSerializer
@@ -15,9 +17,11 @@ from .interaction_serializers import CommentInteractionsSerializer
 ######################################
 
 
-class CommentDetailSerializer(serializers.ModelSerializer):
+class CommentDetailSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """ """
 
+    select_related_fields = ["commenter__profile", "comment_interaction"]
+
     commentid = serializers.IntegerField(source="id")
 
     created_date = serializers.DateTimeField()
@@ -110,6 +114,8 @@ class EditCommentSerializer(serializers.ModelSerializer):
     def update_comment(self, comment_instance, **validated_data):
         """ """
         try:
+            content = comment_instance.content
+
             for key, value in validated_data.items():
                 if comment_instance.__dict__.__contains__(key):
                     if comment_instance.__getattribute__(key) != value:
@@ -124,6 +130,10 @@ class EditCommentSerializer(serializers.ModelSerializer):
 
             comment_instance.save()
 
+            # edited contents are scored again
+            if comment_instance.content != content:
+                enqueue_sentiment_job(comment_instance)
+
         except UnknownModelFieldsError as error:
             print(error)
             raise error
@@ -14,6 +14,7 @@ from bumblebee.core.helpers import create_200, create_400, create_500
 from bumblebee.core.permissions import IsBuzzPublic
 from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
 from bumblebee.notifications.utils import create_notification, delete_notification
+from bumblebee.sentiment_analysis.feedback import record_downvote_feedback
 
 ########################################
 ##              COMMENT
@@ -158,6 +159,10 @@ class DownvoteCommentView(APIView):
                 )
 
             comment_interaction.save()
+            if task == "Added DOWNVOTE":
+                record_downvote_feedback(
+                    comment_interaction.comment, comment_interaction
+                )
 
             return Response(
                 data=create_200(
@@ -102,11 +102,15 @@ class BuzzOrRebuzzCommentListView(APIView):
 
         if url_buzzid:
             buzz_instance = self._get_url_buzz(url_buzzid)
-            return buzz_instance.buzz_comment.filter(level=1)
+            return CommentDetailSerializer.setup_eager_loading(
+                buzz_instance.buzz_comment.filter(level=1)
+            )
 
         elif url_rebuzzid:
             rebuzz_instance = self._get_url_rebuzz(url_rebuzzid)
-            return rebuzz_instance.rebuzz_comment.filter(level=1)
+            return CommentDetailSerializer.setup_eager_loading(
+                rebuzz_instance.rebuzz_comment.filter(level=1)
+            )
 
     def get(self, request, *args, **kwargs):
         """ """
@@ -208,7 +212,7 @@ class CommentReplyListView(APIView):
             if len(replyid_list) != 0:
                 replies = get_comments_from_commentid_list(replyid_list)
                 objects = replies["comments"].filter(level=comment_instance.level + 1)
-                return objects
+                return CommentDetailSerializer.setup_eager_loading(objects)
 
             else:
                 return None
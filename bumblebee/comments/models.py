@@ -47,6 +47,8 @@ class AbstractComment(models.Model):
 
     sentiment_value = models.FloatField(null=True, blank=True)
     textblob_value = models.FloatField(null=True, blank=True)
+    # version of the sentiment models which scored the content
+    sentiment_version = models.CharField(max_length=40, null=True, blank=True)
 
     class Meta:
         abstract = True
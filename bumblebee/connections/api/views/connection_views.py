@@ -13,6 +13,7 @@ from bumblebee.connections.api.serializers.connection_serializers import (
 from bumblebee.connections.api.serializers.connection_users_serializers import (
     ConnectionUserSerializer,
 )
+from bumblebee.connections.signals import unfollow_signal
 from bumblebee.core.exceptions import (
     MissingFieldsError,
     NoneExistenceError,
@@ -596,6 +597,12 @@ class FollowUnfollowRequestUnrequestView(APIView):
                 user_to_follow_unfollow.user_follower.follower.remove(owner_user.id)
                 task = "Unfollow"
 
+                unfollow_signal.send(
+                    sender=self.__class__,
+                    owner=user_to_follow_unfollow,
+                    follower=owner_user,
+                )
+
                 # owner_user.user_follower.
 
             #  if not private and not followed follow
@@ -996,6 +1003,12 @@ class DeleteFollowerView(APIView):
                 owner_user.user_follower.follower.remove(user_to_remove_follow.id)
                 user_to_remove_follow.user_following.following.remove(owner_user.id)
 
+                unfollow_signal.send(
+                    sender=self.__class__,
+                    owner=owner_user,
+                    follower=user_to_remove_follow,
+                )
+
                 owner_user.user_follower.save()
                 user_to_remove_follow.user_following.save()
 
@@ -1074,6 +1087,12 @@ class DeleteFollowingView(APIView):
             owner_user.user_following.following.remove(user_to_remove_following.id)
             user_to_remove_following.user_follower.follower.remove(owner_user.id)
 
+            unfollow_signal.send(
+                sender=self.__class__,
+                owner=user_to_remove_following,
+                follower=owner_user,
+            )
+
             owner_user.user_following.save()
             user_to_remove_following.user_follower.save()
 
@@ -1,12 +1,15 @@
 from django.contrib.contenttypes.models import ContentType
 from django.db.models.signals import post_save
-from django.dispatch import receiver
+from django.dispatch import Signal, receiver
 
 from bumblebee.activities.models import UserActivity
 from bumblebee.activities.utils import _create_activity
 
 # from .models import Foller, Following, Muted, Blocked
 
+#  unfollow signal instance, `follower` stopped following `owner`
+unfollow_signal = Signal(providing_args=["owner", "follower"])
+
 
 # @receiver(post_save, sender=Muted)
 # def post_save_create_interaction_activity(sender, instance, created, **kwargs):
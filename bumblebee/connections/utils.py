@@ -0,0 +1,24 @@
+from django.db.models import Func, PositiveIntegerField
+
+
+class Unnest(Func):
+    """Expand an array field into one row per element"""
+
+    function = "UNNEST"
+    output_field = PositiveIntegerField()
+
+
+def get_connection_ids_subquery(model, field, owner_user):
+    """
+    Subquery of the ids in one of a user's connection arrays, eg.
+    `get_connection_ids_subquery(Following, "following", user)`
+
+    Lets a query filter on connections without loading the array and sending
+    it back as an `IN (...)` literal.
+    """
+
+    return (
+        model.objects.filter(user=owner_user)
+        .annotate(connection_id=Unnest(field))
+        .values("connection_id")
+    )
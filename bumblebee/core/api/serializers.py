@@ -0,0 +1,34 @@
+from django.db.models import prefetch_related_objects
+
+
+class EagerLoadingMixin:
+    """
+    Declares the relations a serializer reads so list endpoints can load them
+    up front, keeping the query count of a response independent of its size.
+
+    `select_related_fields` are followed with joins when a queryset is
+    prepared, `prefetch_related_fields` with one extra query each. Both are
+    resolved with `prefetch_related_objects` for instances that were already
+    fetched (eg. posts merged from several querysets).
+    """
+
+    select_related_fields = []
+    prefetch_related_fields = []
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Apply the relations read by the serializer to `queryset`"""
+
+        return queryset.select_related(*cls.select_related_fields).prefetch_related(
+            *cls.prefetch_related_fields
+        )
+
+    @classmethod
+    def prefetch_instances(cls, instances):
+        """Load the relations read by the serializer onto fetched `instances`"""
+
+        instances = list(instances)
+        prefetch_related_objects(
+            instances, *cls.select_related_fields, *cls.prefetch_related_fields
+        )
+        return instances
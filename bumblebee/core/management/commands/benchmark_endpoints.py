@@ -0,0 +1,156 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bumblebee.buzzes.models import Buzz
+from bumblebee.feeds.cache import invalidate_feed_cache
+from bumblebee.users.models import CustomUser
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of a list of numbers"""
+
+    values = sorted(values)
+    if not values:
+        return None
+    rank = max(1, -(-len(values) * percent // 100))
+    return values[int(rank) - 1]
+
+
+class Command(BaseCommand):
+    """
+    Load test the read endpoints against a graph made by
+    `generate_synthetic_graph`.
+
+    Requests go through the Django test client as sampled synthetic users, so
+    the whole stack (authentication, views, serializers, sql) is measured
+    without a server. Reports p50/p95/p99 latency and query counts of each
+    endpoint as json.
+    """
+
+    help = "Benchmark feed, search, notification and comment endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            default="synthetic",
+            help="Username prefix the graph was generated with",
+        )
+        parser.add_argument(
+            "--users", type=int, default=50, help="Number of sampled readers"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Requests per reader and endpoint"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keyword", default="honey", help="Search keyword")
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Keep the feed cache between requests instead of clearing it",
+        )
+        parser.add_argument("--output", help="Write the json report to a file")
+
+    def _get_endpoints(self, reader):
+        """Urls and query params requested on behalf of `reader`"""
+
+        endpoints = dict(
+            feed=(reverse("feed-post-list"), None),
+            feed_top=(reverse("feed-post-list"), dict(mode="top")),
+            search=("/api/search/list", dict(keyword=self.keyword)),
+            # grouped and individual notification urls share names
+            notifications=("/api/notification/grouped/categorized", None),
+        )
+
+        buzz = (
+            Buzz.objects.public()
+            .filter(author_id__in=reader.user_following.following)
+            .order_by("-created_date")
+            .first()
+        )
+        if buzz is not None:
+            endpoints["comments"] = (
+                reverse("buzz-comment-list", kwargs=dict(buzzid=buzz.id)),
+                None,
+            )
+
+        return endpoints
+
+    def _request(self, client, reader, url, params):
+        if not self.warm:
+            invalidate_feed_cache([reader.id])
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = client.get(url, params)
+            elapsed = (time.perf_counter() - start) * 1000
+
+        if response.status_code != 200:
+            raise CommandError(f"{url} responded with {response.status_code}")
+
+        return elapsed, len(context.captured_queries)
+
+    def handle(self, *args, **options):
+        self.keyword = options["keyword"]
+        self.warm = options["warm"]
+        rng = random.Random(options["seed"])
+
+        userids = list(
+            CustomUser.objects.filter(
+                username__startswith=f"{options['prefix']}_"
+            ).values_list("id", flat=True)
+        )
+        if not userids:
+            raise CommandError(
+                f"No users prefixed `{options['prefix']}_`, "
+                "run `generate_synthetic_graph` first"
+            )
+
+        readers = CustomUser.objects.filter(
+            id__in=rng.sample(userids, min(options["users"], len(userids)))
+        ).select_related("user_following")
+
+        timings = {}
+        queries = {}
+        for reader in readers:
+            # `testserver`, the default host of the client, is not allowed
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(user=reader)
+
+            for name, (url, params) in self._get_endpoints(reader).items():
+                for i in range(options["repeat"]):
+                    elapsed, count = self._request(client, reader, url, params)
+                    timings.setdefault(name, []).append(elapsed)
+                    queries.setdefault(name, []).append(count)
+
+        report = dict(
+            prefix=options["prefix"],
+            readers=len(readers),
+            warm=self.warm,
+            endpoints=dict(
+                (
+                    name,
+                    dict(
+                        requests=len(timings[name]),
+                        p50_ms=round(percentile(timings[name], 50), 2),
+                        p95_ms=round(percentile(timings[name], 95), 2),
+                        p99_ms=round(percentile(timings[name], 99), 2),
+                        queries_p50=percentile(queries[name], 50),
+                        queries_max=max(queries[name]),
+                    ),
+                )
+                for name in timings
+            ),
+        )
+
+        report = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(report)
+        self.stdout.write(report)
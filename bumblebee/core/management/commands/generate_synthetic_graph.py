@@ -0,0 +1,418 @@
+import bisect
+import datetime as dt
+import itertools
+import json
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from bumblebee.buzzes.models import Buzz, BuzzInteractions, Rebuzz, RebuzzInteractions
+from bumblebee.comments.models import Comment, CommentInteractions
+from bumblebee.connections.models import Blocked, Follower, Following, Muted
+from bumblebee.feeds.models import TimelineEntry
+from bumblebee.feeds.utils import (
+    FANOUT_FOLLOWER_LIMIT,
+    _create_timeline_entry,
+    rebuild_follow_suggestions,
+    refresh_post_scores,
+)
+from bumblebee.notifications.models.grouped_models import (
+    BuzzNotification,
+    RebuzzNotification,
+)
+from bumblebee.notifications.models.individual_models import (
+    CommentBuzzNotification,
+    NewFollowerNotification,
+    RebuzzBuzzNotification,
+    UpvoteBuzzNotification,
+)
+from bumblebee.notifications.utils import rebuild_notification_summaries
+from bumblebee.profiles.models import Profile
+from bumblebee.sentiment_analysis.aggregates import rebuild_sentiment_aggregates
+from bumblebee.sentiment_analysis.utils import calculate_versioned_sentiment_values
+from bumblebee.users.models import CustomUser
+
+# words synthetic posts are made of, `honey` is a good search keyword
+VOCABULARY = [
+    "honey",
+    "hive",
+    "queen",
+    "worker",
+    "drone",
+    "pollen",
+    "nectar",
+    "flower",
+    "garden",
+    "summer",
+    "sunny",
+    "happy",
+    "sad",
+    "great",
+    "terrible",
+    "love",
+    "hate",
+    "today",
+    "tomorrow",
+    "meadow",
+]
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    """
+    Generate a reproducible synthetic social graph for load testing.
+
+    Accounts get a power-law (pareto) popularity, so a few of them gather most
+    of the followers, as on a real network. The same seed always generates the
+    same graph. Rows are bulk created with the related rows the model signals
+    would create (profiles, connections, interactions, grouped notifications,
+    timeline entries), leaving out activities. Sentiment values are scored in
+    batches instead of being queued for the worker.
+    """
+
+    help = "Generate a reproducible synthetic social graph for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--followings", type=int, default=50, help="Mean followings per user"
+        )
+        parser.add_argument(
+            "--alpha",
+            type=float,
+            default=1.2,
+            help="Pareto shape of account popularity, lower is more skewed",
+        )
+        parser.add_argument("--posts", type=int, default=3, help="Mean buzzes per user")
+        parser.add_argument(
+            "--rebuzz-ratio",
+            type=float,
+            default=0.2,
+            help="Rebuzzes created per buzz",
+        )
+        parser.add_argument(
+            "--comments", type=int, default=2, help="Mean comments per buzz"
+        )
+        parser.add_argument("--days", type=int, default=7, help="Age of oldest post")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--prefix",
+            default="synthetic",
+            help="Prefix of generated usernames, used by `benchmark_endpoints`",
+        )
+
+    ######################################
+    ##           HELPERS
+    ######################################
+
+    def _sample_popular(self, k, exclude=None):
+        """Pick up to `k` distinct user ids, weighted by popularity"""
+
+        picked = set()
+        for i in range(k * 2):
+            if len(picked) >= k:
+                break
+            index = bisect.bisect(
+                self.cum_weights, self.rng.random() * self.cum_weights[-1]
+            )
+            userid = self.user_ids[min(index, len(self.user_ids) - 1)]
+            if userid != exclude:
+                picked.add(userid)
+        return sorted(picked)
+
+    def _random_content(self):
+        return " ".join(self.rng.choices(VOCABULARY, k=self.rng.randint(3, 12)))
+
+    def _random_date(self):
+        return self.now - dt.timedelta(seconds=self.rng.randint(0, self.max_age))
+
+    def _random_privacy(self):
+        return self.rng.choices(["pub", "prot", "priv"], weights=[80, 15, 5])[0]
+
+    def _create_dated(self, model, instances):
+        """
+        Score, bulk create and backdate rows, `auto_now_add` overwrites dates
+        on create
+        """
+
+        version, *values = calculate_versioned_sentiment_values(
+            instance.content for instance in instances
+        )
+        for instance, sentiment_value, textblob_value in zip(instances, *values):
+            instance.sentiment_value = float(sentiment_value)
+            instance.textblob_value = float(textblob_value)
+            instance.sentiment_version = version
+
+        dates = [instance.created_date for instance in instances]
+        instances = model.objects.bulk_create(instances, batch_size=BATCH_SIZE)
+        for instance, created_date in zip(instances, dates):
+            instance.created_date = created_date
+        model.objects.bulk_update(instances, ["created_date"], batch_size=BATCH_SIZE)
+        return instances
+
+    ######################################
+    ##           GENERATORS
+    ######################################
+
+    def _create_users(self, count, prefix):
+        password = make_password(prefix)
+        users = CustomUser.objects.bulk_create(
+            [
+                CustomUser(
+                    username=f"{prefix}_{i}",
+                    email=f"{prefix}_{i}@bumblebee.local",
+                    password=password,
+                    active=True,
+                    email_verified=True,
+                )
+                for i in range(count)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        Profile.objects.bulk_create(
+            [
+                Profile(user=user, name=user.username, nickname=user.username)
+                for user in users
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return users
+
+    def _create_connections(self, users, mean_followings):
+        following_map = {}
+        follower_map = dict((user.id, []) for user in users)
+
+        for user in users:
+            count = min(
+                len(users) - 1,
+                max(1, int(self.rng.expovariate(1 / max(mean_followings, 1)))),
+            )
+            following_map[user.id] = self._sample_popular(count, exclude=user.id)
+            for followed_id in following_map[user.id]:
+                follower_map[followed_id].append(user.id)
+
+        Following.objects.bulk_create(
+            [Following(user=user, following=following_map[user.id]) for user in users],
+            batch_size=BATCH_SIZE,
+        )
+        Follower.objects.bulk_create(
+            [Follower(user=user, follower=follower_map[user.id]) for user in users],
+            batch_size=BATCH_SIZE,
+        )
+        Muted.objects.bulk_create(
+            [Muted(user=user) for user in users], batch_size=BATCH_SIZE
+        )
+        Blocked.objects.bulk_create(
+            [Blocked(user=user) for user in users], batch_size=BATCH_SIZE
+        )
+        NewFollowerNotification.objects.bulk_create(
+            [
+                NewFollowerNotification(user_id=followed_id, follower_id=follower_id)
+                for followed_id, follower_ids in follower_map.items()
+                for follower_id in follower_ids
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        return following_map, follower_map
+
+    def _create_buzzes(self, users, mean_posts):
+        buzzes = [
+            Buzz(
+                author=user,
+                content=self._random_content(),
+                privacy=self._random_privacy(),
+                created_date=self._random_date(),
+            )
+            for user in users
+            for i in range(self.rng.randint(0, 2 * mean_posts))
+        ]
+        buzzes = self._create_dated(Buzz, buzzes)
+
+        # grouped notifications inherit a concrete model, they cannot be bulk created
+        for buzz in buzzes:
+            BuzzNotification.objects.create(buzz=buzz, user_id=buzz.author_id)
+        return buzzes
+
+    def _create_rebuzzes(self, buzzes, ratio):
+        public_buzzes = [buzz for buzz in buzzes if buzz.privacy == "pub"]
+        if not public_buzzes:
+            return []
+
+        rebuzzes = []
+        for i in range(int(len(buzzes) * ratio)):
+            buzz = self.rng.choice(public_buzzes)
+            rebuzzes.append(
+                Rebuzz(
+                    author_id=self._sample_popular(1, exclude=buzz.author_id)[0],
+                    buzz=buzz,
+                    content=self._random_content(),
+                    privacy=self._random_privacy(),
+                    created_date=max(buzz.created_date, self._random_date()),
+                )
+            )
+        rebuzzes = self._create_dated(Rebuzz, rebuzzes)
+
+        for rebuzz in rebuzzes:
+            RebuzzNotification.objects.create(rebuzz=rebuzz, user_id=rebuzz.author_id)
+        RebuzzBuzzNotification.objects.bulk_create(
+            [
+                RebuzzBuzzNotification(
+                    user_id=rebuzz.buzz.author_id,
+                    buzz=rebuzz.buzz,
+                    agent_id=rebuzz.author_id,
+                    rebuzz=rebuzz,
+                )
+                for rebuzz in rebuzzes
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return rebuzzes
+
+    def _create_comments(self, buzzes, mean_comments):
+        comments = [
+            Comment(
+                commenter_id=self.rng.choice(self.user_ids),
+                parent_buzz=buzz,
+                content=self._random_content(),
+                created_date=max(buzz.created_date, self._random_date()),
+            )
+            for buzz in buzzes
+            for i in range(self.rng.randint(0, 2 * mean_comments))
+        ]
+        comments = self._create_dated(Comment, comments)
+
+        CommentInteractions.objects.bulk_create(
+            [CommentInteractions(comment=comment) for comment in comments],
+            batch_size=BATCH_SIZE,
+        )
+        CommentBuzzNotification.objects.bulk_create(
+            [
+                CommentBuzzNotification(
+                    user_id=comment.parent_buzz.author_id,
+                    buzz=comment.parent_buzz,
+                    agent_id=comment.commenter_id,
+                    comment=comment,
+                )
+                for comment in comments
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        return comments
+
+    def _create_interactions(self, buzzes, rebuzzes, comments, alpha):
+        comment_ids = dict((buzz.id, []) for buzz in buzzes)
+        for comment in comments:
+            comment_ids[comment.parent_buzz_id].append(comment.id)
+
+        rebuzz_ids = dict((buzz.id, []) for buzz in buzzes)
+        for rebuzz in rebuzzes:
+            rebuzz_ids[rebuzz.buzz_id].append(rebuzz.id)
+
+        def votes():
+            return self._sample_popular(int(self.rng.paretovariate(alpha)) - 1)
+
+        buzz_interactions = []
+        upvote_notifications = []
+        for buzz in buzzes:
+            upvotes = votes()
+            buzz_interactions.append(
+                BuzzInteractions(
+                    buzz=buzz,
+                    upvotes=upvotes,
+                    downvotes=votes(),
+                    comments=comment_ids[buzz.id],
+                    rebuzzes=rebuzz_ids[buzz.id],
+                )
+            )
+            upvote_notifications += [
+                UpvoteBuzzNotification(
+                    user_id=buzz.author_id, buzz=buzz, agent_id=userid
+                )
+                for userid in upvotes
+            ]
+
+        BuzzInteractions.objects.bulk_create(buzz_interactions, batch_size=BATCH_SIZE)
+        UpvoteBuzzNotification.objects.bulk_create(
+            upvote_notifications, batch_size=BATCH_SIZE
+        )
+        RebuzzInteractions.objects.bulk_create(
+            [
+                RebuzzInteractions(rebuzz=rebuzz, upvotes=votes(), downvotes=votes())
+                for rebuzz in rebuzzes
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+    def _create_timelines(self, posts, follower_map):
+        entries = []
+        for post in posts:
+            follower_ids = follower_map[post.author_id]
+            if len(follower_ids) > FANOUT_FOLLOWER_LIMIT:
+                continue
+
+            entries += [_create_timeline_entry(userid, post) for userid in follower_ids]
+
+            if len(entries) >= BATCH_SIZE:
+                TimelineEntry.objects.bulk_create(entries)
+                entries = []
+
+        TimelineEntry.objects.bulk_create(entries)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if CustomUser.objects.filter(username__startswith=f"{prefix}_").exists():
+            raise CommandError(
+                f"Users prefixed `{prefix}_` already exist, pick another --prefix"
+            )
+
+        self.rng = random.Random(options["seed"])
+        self.now = timezone.now()
+        self.max_age = options["days"] * 24 * 60 * 60
+
+        with transaction.atomic():
+            users = self._create_users(options["users"], prefix)
+            self.user_ids = [user.id for user in users]
+
+            popularity = [self.rng.paretovariate(options["alpha"]) for user in users]
+            self.cum_weights = list(itertools.accumulate(popularity))
+
+            following_map, follower_map = self._create_connections(
+                users, options["followings"]
+            )
+            buzzes = self._create_buzzes(users, options["posts"])
+            rebuzzes = self._create_rebuzzes(buzzes, options["rebuzz_ratio"])
+            comments = self._create_comments(buzzes, options["comments"])
+            self._create_interactions(buzzes, rebuzzes, comments, options["alpha"])
+            self._create_timelines(buzzes + rebuzzes, follower_map)
+
+        rebuild_follow_suggestions()
+        rebuild_sentiment_aggregates()
+        rebuild_notification_summaries()
+        refresh_post_scores(self.now - dt.timedelta(days=options["days"]))
+
+        follower_counts = sorted(len(ids) for ids in follower_map.values())
+        self.stdout.write(
+            json.dumps(
+                dict(
+                    prefix=prefix,
+                    seed=options["seed"],
+                    users=len(users),
+                    follows=sum(follower_counts),
+                    max_followers=follower_counts[-1] if follower_counts else 0,
+                    median_followers=(
+                        follower_counts[len(follower_counts) // 2]
+                        if follower_counts
+                        else 0
+                    ),
+                    buzzes=len(buzzes),
+                    rebuzzes=len(rebuzzes),
+                    comments=len(comments),
+                ),
+                indent=2,
+            )
+        )
@@ -1,3 +1,138 @@
+import io
+import json
+import random
+import string
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.comments.models import Comment
+from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
+from bumblebee.notifications.utils import create_notification
+from bumblebee.users.models import CustomUser
+
+
+class QueryBudgetTest(TestCase):
+    """
+    List endpoints must load their relations up front, so the number of
+    queries per response stays the same however many rows it holds
+    """
+
+    def random_string(self):
+        return "".join(random.choice(string.ascii_lowercase) for i in range(10))
+
+    def create_user(self, username=None):
+        user = CustomUser(
+            email=f"{self.random_string()}@{self.random_string()}.com",
+            username=username or self.random_string(),
+            password="123ajkdsa34fana",
+        )
+        user.save()
+        return user
+
+    def setUp(self):
+        self.reader = self.create_user()
+        self.author = self.create_user(username="queenbee")
+
+        self.reader.user_following.following.append(self.author.id)
+        self.reader.user_following.save()
+        self.author.user_follower.follower.append(self.reader.id)
+        self.author.user_follower.save()
+
+        self.buzz = Buzz.objects.create(author=self.author, content="hello hive")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.reader)
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def assertFixedQueryCount(self, url, add_rows, params=None):
+        add_rows(0)
+        few = self.count_queries(url, params)
+        for i in range(1, 6):
+            add_rows(i)
+        many = self.count_queries(url, params)
+
+        self.assertEqual(few, many)
+
+    def add_post(self, i):
+        buzz = Buzz.objects.create(author=self.author, content=f"buzz {i}")
+        Rebuzz.objects.create(author=self.create_user(), buzz=buzz, content="re")
+        Rebuzz.objects.create(author=self.author, buzz=buzz, content=f"rebuzz {i}")
+
+    def add_comment(self, i):
+        Comment.objects.create(
+            commenter=self.create_user(), parent_buzz=self.buzz, content=f"hi {i}"
+        )
+
+    def test_feed(self):
+        self.assertFixedQueryCount(reverse("feed-post-list"), self.add_post)
+
+    def test_user_buzz_list(self):
+        self.assertFixedQueryCount(
+            reverse("user-buzz-list", kwargs=dict(username=self.author.username)),
+            self.add_post,
+        )
+
+    def test_search(self):
+        self.assertFixedQueryCount(
+            "/api/search/list", self.add_post, params=dict(keyword="queenbee")
+        )
+
+    def test_comment_list(self):
+        self.assertFixedQueryCount(
+            reverse("buzz-comment-list", kwargs=dict(buzzid=self.buzz.id)),
+            self.add_comment,
+        )
+
+    def add_notification(self, i):
+        author_buzz = Buzz.objects.create(author=self.reader, content=f"buzz {i}")
+        create_notification(
+            ACTION_TYPE["UPV"], CONTENT_TYPE["BUZZ"], self.create_user(), author_buzz
+        )
+
+    def test_notification_inbox(self):
+        self.assertFixedQueryCount(
+            reverse("user-notifications-inbox"), self.add_notification
+        )
+
+
+class SyntheticGraphTest(TestCase):
+    """ """
+
+    def test_generated_graph_is_reproducible(self):
+        summaries = []
+        for prefix in ["first", "second"]:
+            out = io.StringIO()
+            call_command(
+                "generate_synthetic_graph",
+                users=20,
+                followings=5,
+                posts=2,
+                comments=1,
+                prefix=prefix,
+                stdout=out,
+            )
+            summary = json.loads(out.getvalue())
+            del summary["prefix"]
+            summaries.append(summary)
+
+        self.assertEqual(summaries[0], summaries[1])
+        self.assertEqual(
+            CustomUser.objects.filter(username__startswith="first_").count(), 20
+        )
 
-# Create your tests here.
+        out = io.StringIO()
+        call_command("benchmark_endpoints", prefix="first", users=2, stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertIn("feed", report["endpoints"])
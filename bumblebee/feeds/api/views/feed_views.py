@@ -6,6 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from bumblebee.buzzes.models import Rebuzz
 from bumblebee.core.exceptions import (
     MissingFieldsError,
     NoneExistenceError,
@@ -17,44 +18,181 @@ from bumblebee.feeds.api.serializers.feed_serializers import (
     FeedRebuzzSerializer,
 )
 from bumblebee.feeds.api.serializers.user_serializers import FeedUserSerializer
+from bumblebee.feeds.cache import cache_feed_response, get_cached_feed_response
 from bumblebee.feeds.utils import (
+    decode_feed_cursor,
+    get_feed_page_size,
     get_follow_suggestions_for_user,
-    get_folowing_buzzes_for_user,
+    get_top_posts_for_user,
+    get_timeline_etag,
+    get_timeline_posts_for_user,
 )
 from bumblebee.users.utils import DbExistenceChecker
 
 
 class FeedBuzzListView(APIView):
-    """ """
+    """
+    Get a page of the home feed, newest first
+
+    Query params
+    ---
+    mode: `latest` (default) or `top` for the highest scored posts of the week
+    cursor: `next_cursor` of the previous page
+    since: `since_cursor` of the last response, to get only newer posts
+    limit: number of posts in a page
+
+    The `top` feed is a single ranked page and takes no `cursor` or `since`.
+
+    Latest feed responses carry a weak `ETag`. Sending it back in
+    `If-None-Match` gets a `304 Not Modified` while the feed has not changed.
+
+    Responses are cached per user until one of their feed sources changes.
+    """
+
+    MODES = ["latest", "top"]
 
     permission_classes = [IsAuthenticated]
 
-    def get_posts(self, *args, **kwargs):
+    def _get_query_params(self):
         """ """
 
-        return get_folowing_buzzes_for_user(self.request.user)
+        mode = self.request.query_params.get("mode", "latest")
+        cursor = self.request.query_params.get("cursor")
+        since = self.request.query_params.get("since")
+
+        if mode not in self.MODES:
+            raise UrlParameterError(
+                "mode",
+                create_400(
+                    status.HTTP_400_BAD_REQUEST,
+                    "Url Error",
+                    f"Query param `mode` must be one of {', '.join(self.MODES)}",
+                    "url:mode",
+                ),
+            )
+
+        if mode == "top" and (cursor or since):
+            raise UrlParameterError(
+                "mode",
+                create_400(
+                    status.HTTP_400_BAD_REQUEST,
+                    "Url Error",
+                    "Query params `cursor` and `since` cannot be used with `mode=top`",
+                    "url:mode",
+                ),
+            )
+
+        if cursor and since:
+            raise UrlParameterError(
+                "cursor",
+                create_400(
+                    status.HTTP_400_BAD_REQUEST,
+                    "Url Error",
+                    "Only one of query params `cursor` and `since` can be provided",
+                    "url:cursor",
+                ),
+            )
+
+        return dict(
+            mode=mode,
+            cursor=decode_feed_cursor(cursor) if cursor else None,
+            since=decode_feed_cursor(since) if since else None,
+            limit=get_feed_page_size(self.request.query_params.get("limit")),
+        )
+
+    def get_etag(self, query_params):
+        """ """
+
+        # scores change on every refresh, the top feed is neither tagged nor
+        # cached, see `get`
+        if query_params.get("mode") == "top":
+            return None
+
+        return get_timeline_etag(
+            self.request.user,
+            query_params.get("cursor"),
+            query_params.get("since"),
+            query_params.get("limit"),
+        )
+
+    def get_posts(self, query_params, *args, **kwargs):
+        """ """
+
+        if query_params.get("mode") == "top":
+            return get_top_posts_for_user(
+                self.request.user, limit=query_params.get("limit")
+            )
+
+        return get_timeline_posts_for_user(
+            self.request.user,
+            cursor=query_params.get("cursor"),
+            since=query_params.get("since"),
+            limit=query_params.get("limit"),
+        )
+
+    def _serialize_posts(self, post_instances):
+        """Serialize buzzes and rebuzzes keeping the timeline order"""
+
+        FeedBuzzSerializer.prefetch_instances(
+            post for post in post_instances if not isinstance(post, Rebuzz)
+        )
+        FeedRebuzzSerializer.prefetch_instances(
+            post for post in post_instances if isinstance(post, Rebuzz)
+        )
+
+        return [
+            FeedRebuzzSerializer(post).data
+            if isinstance(post, Rebuzz)
+            else FeedBuzzSerializer(post).data
+            for post in post_instances
+        ]
 
     def get(self, request, *args, **kwargs):
         """ """
 
         try:
+            query_params = self._get_query_params()
 
-            post_instances = self.get_posts()
-            user_serializer = FeedUserSerializer(self.request.user, many=False)
-            buzz_serializer = FeedBuzzSerializer(
-                post_instances.get("buzzes"), many=True
-            )
-            rebuzz_serializer = FeedRebuzzSerializer(
-                post_instances.get("rebuzzes"), many=True
+            # no signal reports a score refresh, ranked responses are built
+            # every time
+            cacheable = query_params.get("mode") != "top"
+            version, cached = (
+                get_cached_feed_response(request.user.id, "posts", query_params)
+                if cacheable
+                else (None, None)
             )
+            if cached is not None:
+                etag, data = cached
+            else:
+                etag = self.get_etag(query_params)
+                data = None
 
-            return Response(
-                data=dict(
+            if etag and etag in request.headers.get("If-None-Match", ""):
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED, headers=dict(ETag=etag)
+                )
+
+            if data is None:
+                post_instances = self.get_posts(query_params)
+                user_serializer = FeedUserSerializer(self.request.user, many=False)
+
+                data = dict(
                     updated_time=dt.datetime.now(),
                     user=user_serializer.data,
-                    post=buzz_serializer.data + rebuzz_serializer.data,
-                ),
+                    post=self._serialize_posts(post_instances.get("posts")),
+                    next_cursor=post_instances.get("next_cursor"),
+                    since_cursor=post_instances.get("since_cursor"),
+                    has_more=post_instances.get("has_more"),
+                )
+                if cacheable:
+                    cache_feed_response(
+                        request.user.id, "posts", query_params, version, (etag, data)
+                    )
+
+            return Response(
+                data=data,
                 status=status.HTTP_200_OK,
+                headers=dict(ETag=etag) if etag else None,
             )
 
         except (MissingFieldsError, UrlParameterError, NoneExistenceError) as error:
@@ -94,18 +232,25 @@ class FeedFollowSuggestionsListView(APIView):
         """ """
 
         try:
-            suggestion_instances = self.get_suggestions()
-            user_serializer = FeedUserSerializer(self.request.user, many=False)
-            suggestion_serializer = FeedUserSerializer(suggestion_instances, many=True)
+            version, data = get_cached_feed_response(
+                request.user.id, "suggestions", None
+            )
 
-            return Response(
-                data=dict(
+            if data is None:
+                suggestion_instances = self.get_suggestions()
+                user_serializer = FeedUserSerializer(self.request.user, many=False)
+                suggestion_serializer = FeedUserSerializer(
+                    suggestion_instances, many=True
+                )
+
+                data = dict(
                     updated_time=dt.datetime.now(),
                     user=user_serializer.data,
                     suggestions=suggestion_serializer.data,
-                ),
-                status=status.HTTP_200_OK,
-            )
+                )
+                cache_feed_response(request.user.id, "suggestions", None, version, data)
+
+            return Response(data=data, status=status.HTTP_200_OK)
 
         except (MissingFieldsError, UrlParameterError, NoneExistenceError) as error:
             return Response(error.message, status=error.message.get("status"))
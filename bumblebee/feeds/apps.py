@@ -6,4 +6,4 @@ class FeedsConfig(AppConfig):
     name = "bumblebee.feeds"
 
     def ready(self):
-        pass
+        import bumblebee.feeds.signals
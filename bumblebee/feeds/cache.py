@@ -0,0 +1,74 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+# cached responses also expire on their own, for changes no signal reports
+# (eg. interaction counts or friends-of-friends scores moving)
+FEED_CACHE_TIMEOUT = 60 * 5
+
+# number of keys deleted in a single cache call
+FEED_CACHE_DELETE_BATCH = 1000
+
+
+def _get_version_key(userid):
+    """ """
+
+    return f"feed:version:{userid}"
+
+
+def _get_response_key(userid, name, params):
+    """ """
+
+    digest = hashlib.sha1(repr(params).encode()).hexdigest()
+    return f"feed:{name}:{userid}:{digest}"
+
+
+def get_cached_feed_response(userid, name, params):
+    """
+    Get the current feed cache version of a user and the response cached for
+    `name` and request `params`, if it is still valid, in one cache read
+
+    Returns a `(version, response)` tuple, `response` being None on a miss.
+    """
+
+    version_key = _get_version_key(userid)
+    response_key = _get_response_key(userid, name, params)
+
+    values = cache.get_many([version_key, response_key])
+    version = values.get(version_key)
+
+    if version is None:
+        # a timestamp never repeats a version which was deleted or evicted
+        version = time.time_ns()
+        if not cache.add(version_key, version, timeout=None):
+            version = cache.get(version_key, version)
+        return version, None
+
+    cached = values.get(response_key)
+    if cached is not None and cached[0] == version:
+        return version, cached[1]
+
+    return version, None
+
+
+def cache_feed_response(userid, name, params, version, response):
+    """
+    Cache a response for `name` and request `params` under the version read
+    before it was built, so a change made meanwhile is not hidden
+    """
+
+    cache.set(
+        _get_response_key(userid, name, params),
+        (version, response),
+        timeout=FEED_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_feed_cache(userids):
+    """Drop every cached feed and suggestion response of the given users"""
+
+    version_keys = [_get_version_key(userid) for userid in set(userids)]
+
+    for start in range(0, len(version_keys), FEED_CACHE_DELETE_BATCH):
+        cache.delete_many(version_keys[start : start + FEED_CACHE_DELETE_BATCH])
@@ -0,0 +1,142 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+
+from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.feeds.models import TimelineEntry
+from bumblebee.feeds.utils import (
+    FEED_PAGE_SIZE,
+    _get_feed_keys,
+    _order_feed_keys,
+    get_date_a_week_ago,
+    get_feed_author_filter,
+)
+from bumblebee.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Compare the feed query built from connection subqueries with the one
+    sending the following, muted and blocked lists as `IN (...)` literals.
+    Both read the sort keys of a feed page, with the same columns, privacy and
+    date filters, only the author filter differs.
+
+    Runs inside a transaction which is rolled back, nothing is kept. Following
+    lists are padded with ids of accounts which do not exist, as only the size
+    of the lists matters to the query.
+    """
+
+    help = "Benchmark feed queries for users following many accounts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--followings",
+            type=int,
+            nargs="+",
+            default=[10, 1000, 10000],
+            help="Sizes of the following list to benchmark",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Runs of each query per size"
+        )
+
+    def _time(self, func, repeat):
+        """
+        Median milliseconds of a feed read, and SQL characters sent over all
+        the reads
+        """
+
+        timings = []
+        sql_size = 0
+        for i in range(repeat):
+            # connection rows are loaded as part of each read
+            owner_user = CustomUser.objects.get(id=self.reader.id)
+
+            with CaptureQueriesContext(connection) as context:
+                start = time.perf_counter()
+                func(owner_user)
+                timings.append((time.perf_counter() - start) * 1000)
+
+            sql_size += sum(len(query["sql"]) for query in context.captured_queries)
+        return statistics.median(timings), sql_size
+
+    def _read_keys(self, author_filter):
+        """Sort keys of the newest posts of the feed window matching `author_filter`"""
+
+        date_limit = get_date_a_week_ago()
+        keys = [
+            _get_feed_keys(
+                model.objects.visible_to_followers().filter(
+                    author_filter & Q(created_date__gte=date_limit)
+                ),
+                post_type,
+            )
+            for model, post_type in (
+                (Buzz, TimelineEntry.PostTypeChoices.BUZZ),
+                (Rebuzz, TimelineEntry.PostTypeChoices.REBUZZ),
+            )
+        ]
+        return list(
+            _order_feed_keys(
+                keys[0].union(keys[1], all=True), fetch_limit=FEED_PAGE_SIZE
+            )
+        )
+
+    def _legacy_read(self, owner_user):
+        blacklist_ids = owner_user.user_muted.muted + owner_user.user_blocked.blocked
+        return self._read_keys(
+            Q(author__in=owner_user.user_following.following)
+            & ~Q(author__in=blacklist_ids)
+        )
+
+    def _subquery_read(self, owner_user):
+        return self._read_keys(get_feed_author_filter(owner_user))
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.reader = CustomUser.objects.create(
+                email="feed-benchmark@bumblebee.local",
+                username="feed-benchmark",
+                password="feed-benchmark",
+            )
+            author = CustomUser.objects.create(
+                email="feed-benchmark-author@bumblebee.local",
+                username="feed-benchmark-author",
+                password="feed-benchmark",
+            )
+            for i in range(20):
+                Buzz.objects.create(author=author, content=f"benchmark buzz {i}")
+
+            missing_id = CustomUser.objects.order_by("-id").first().id + 1
+
+            self.stdout.write(
+                f"{'followings':>12} {'legacy ms':>12} {'subquery ms':>12}"
+            )
+            for size in options["followings"]:
+                following = self.reader.user_following
+                following.following = [author.id] + list(
+                    range(missing_id, missing_id + size - 1)
+                )
+                following.save()
+
+                muted = self.reader.user_muted
+                muted.muted = random.sample(following.following[1:], (size - 1) // 10)
+                muted.save()
+
+                legacy, legacy_sql = self._time(self._legacy_read, options["repeat"])
+                subquery, subquery_sql = self._time(
+                    self._subquery_read, options["repeat"]
+                )
+
+                self.stdout.write(
+                    f"{size:>12} {legacy:>12.2f} {subquery:>12.2f}"
+                    f"   (sql chars over {options['repeat']} reads"
+                    f" {legacy_sql} vs {subquery_sql})"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.feeds.utils import prune_timeline_entries
+
+
+class Command(BaseCommand):
+    """
+    Delete materialized timeline entries older than the feed window.
+
+    Meant to be run periodically, eg. from cron.
+    """
+
+    help = "Delete timeline entries which have fallen out of the feed window"
+
+    def handle(self, *args, **options):
+        deleted = prune_timeline_entries()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} timeline entries"))
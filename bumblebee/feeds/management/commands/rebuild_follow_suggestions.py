@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.feeds.models import FollowSuggestion
+from bumblebee.feeds.utils import rebuild_follow_suggestions
+
+
+class Command(BaseCommand):
+    """
+    Recompute follow suggestion scores from the whole follow graph.
+
+    Scores are kept up to date on follow and unfollow, run this once to fill
+    the table and afterwards to repair drift.
+    """
+
+    help = "Recompute friends-of-friends follow suggestion scores"
+
+    def handle(self, *args, **options):
+        rebuild_follow_suggestions()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {FollowSuggestion.objects.count()} follow suggestions"
+            )
+        )
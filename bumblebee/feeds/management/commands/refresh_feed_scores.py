@@ -0,0 +1,32 @@
+import datetime as dt
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bumblebee.feeds.utils import refresh_post_scores
+
+
+class Command(BaseCommand):
+    """
+    Recalculate the top feed scores of recent buzzes and rebuzzes.
+
+    Meant to be run periodically, eg. from cron.
+    """
+
+    help = "Recalculate the top feed scores of recent posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Score posts created in the last given days, a week by default",
+        )
+
+    def handle(self, *args, **options):
+        date_limit = None
+        if options["days"] is not None:
+            date_limit = timezone.now() - dt.timedelta(days=options["days"])
+
+        refreshed = refresh_post_scores(date_limit)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} post scores"))
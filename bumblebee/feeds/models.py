@@ -1,6 +1,7 @@
 from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
+from bumblebee.buzzes.models import Buzz, Rebuzz
 from bumblebee.users.models import CustomUser
 
 
@@ -23,3 +24,115 @@ class FeedMeta(models.Model):
     #     muted_blocked_ids = self.user.user_muted.muted + self.user.user_blocked.blocked
 
     #     self.feed_source_id = list(set(following_ids) - set(muted_blocked_ids))
+
+
+class TimelineEntry(models.Model):
+    """
+    A materialized home timeline row.
+
+    One row is pushed to every follower of an author when a buzz or rebuzz is
+    created (fan-out-on-write), so a feed read is a single indexed range scan
+    over `(user, created_date)` instead of an `author__in` scan of every post.
+    """
+
+    class PostTypeChoices(models.TextChoices):
+        """
+        Choices for the kind of post an entry points to
+        """
+
+        BUZZ = "buzz", "buzz"
+        REBUZZ = "rebuzz", "rebuzz"
+
+    user = models.ForeignKey(
+        CustomUser, related_name="user_timeline", on_delete=models.CASCADE
+    )
+    author = models.ForeignKey(
+        CustomUser, related_name="author_timeline_entry", on_delete=models.CASCADE
+    )
+
+    post_type = models.CharField(max_length=10, choices=PostTypeChoices.choices)
+    post_id = models.PositiveIntegerField()
+
+    buzz = models.ForeignKey(
+        Buzz,
+        related_name="buzz_timeline_entry",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+    )
+    rebuzz = models.ForeignKey(
+        Rebuzz,
+        related_name="rebuzz_timeline_entry",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+    )
+
+    # copied from the post so the timeline can be sorted without a join
+    created_date = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Timeline Entry"
+        verbose_name_plural = "Timeline Entries"
+        ordering = ["-created_date", "-post_type", "-post_id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post_type", "post_id"],
+                name="unique_timeline_entry_per_user",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_date", "-post_type", "-post_id"],
+                name="timeline_user_created_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"Timeline of userid:{self.user_id} {self.post_type}:{self.post_id}"
+
+    def get_post(self):
+        """Get the buzz or rebuzz this entry points to"""
+
+        if self.post_type == self.PostTypeChoices.BUZZ:
+            return self.buzz
+        return self.rebuzz
+
+
+class FollowSuggestion(models.Model):
+    """
+    Precomputed friends-of-friends score of a candidate for a user.
+
+    `score` is the number of the user's followings who follow the candidate.
+    Rows are rebuilt in bulk and kept up to date on every follow and unfollow,
+    so suggestions are read straight off the `(user, score)` index.
+    """
+
+    user = models.ForeignKey(
+        CustomUser, related_name="user_follow_suggestion", on_delete=models.CASCADE
+    )
+    candidate = models.ForeignKey(
+        CustomUser,
+        related_name="candidate_follow_suggestion",
+        on_delete=models.CASCADE,
+    )
+    score = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Follow Suggestion"
+        verbose_name_plural = "Follow Suggestions"
+        ordering = ["-score", "candidate"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "candidate"], name="unique_follow_suggestion"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-score", "candidate"],
+                name="suggestion_user_score_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"Suggest userid:{self.candidate_id} to userid:{self.user_id}"
@@ -0,0 +1,121 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.connections.models import Blocked, Follower, Following, Muted
+from bumblebee.connections.signals import unfollow_signal
+from bumblebee.notifications.signals import new_follower_signal
+from bumblebee.profiles.models import Profile
+from bumblebee.sentiment_analysis.signals import sentiment_scored_signal
+
+from .cache import invalidate_feed_cache
+from .utils import (
+    backfill_timeline,
+    fan_out_post,
+    refresh_post_scores_by_id,
+    set_initial_post_score,
+    update_follow_suggestions_on_follow,
+    update_follow_suggestions_on_unfollow,
+)
+
+#########################################
+#           TIMELINE
+#########################################
+
+
+@receiver(post_save, sender=Buzz)
+def post_save_fan_out_buzz(sender, instance, created, **kwargs):
+    """ """
+
+    if created:
+        set_initial_post_score(instance)
+        fan_out_post(instance)
+
+
+@receiver(post_save, sender=Rebuzz)
+def post_save_fan_out_rebuzz(sender, instance, created, **kwargs):
+    """ """
+
+    if created:
+        set_initial_post_score(instance)
+        fan_out_post(instance)
+
+
+@receiver(sentiment_scored_signal)
+def refresh_scores_on_sentiment(**kwargs):
+    """ """
+
+    model = kwargs.get("model")
+    if model in (Buzz, Rebuzz):
+        refresh_post_scores_by_id(model, kwargs.get("ids"))
+
+
+@receiver(new_follower_signal)
+def backfill_timeline_on_follow(**kwargs):
+    """ """
+
+    backfill_timeline(owner_user=kwargs.get("follower"), author=kwargs.get("owner"))
+
+
+#########################################
+#           SUGGESTIONS
+#########################################
+
+
+@receiver(new_follower_signal)
+def update_follow_suggestions_on_new_follower(**kwargs):
+    """ """
+
+    update_follow_suggestions_on_follow(
+        owner_user=kwargs.get("owner"), follower=kwargs.get("follower")
+    )
+
+
+@receiver(unfollow_signal)
+def update_follow_suggestions_on_remove_follower(**kwargs):
+    """ """
+
+    update_follow_suggestions_on_unfollow(
+        owner_user=kwargs.get("owner"), follower=kwargs.get("follower")
+    )
+
+
+#########################################
+#           CACHE
+#########################################
+
+
+def _invalidate_feed_cache_of_followers(userid):
+    """Drop cached feeds of a user and everyone following them"""
+
+    # read directly, the follower row may already be gone on cascading deletes
+    follower_ids = (
+        Follower.objects.filter(user=userid).values_list("follower", flat=True).first()
+    )
+    invalidate_feed_cache((follower_ids or []) + [userid])
+
+
+@receiver(post_save, sender=Buzz)
+@receiver(post_delete, sender=Buzz)
+@receiver(post_save, sender=Rebuzz)
+@receiver(post_delete, sender=Rebuzz)
+def invalidate_feed_cache_on_post_change(sender, instance, **kwargs):
+    """New, edited (eg. privacy) and deleted posts change the feeds of followers"""
+
+    _invalidate_feed_cache_of_followers(instance.author_id)
+
+
+@receiver(post_save, sender=Profile)
+def invalidate_feed_cache_on_profile_change(sender, instance, **kwargs):
+    """Profiles, privacy included, are shown in the feeds of followers"""
+
+    _invalidate_feed_cache_of_followers(instance.user_id)
+
+
+@receiver(post_save, sender=Following)
+@receiver(post_save, sender=Muted)
+@receiver(post_save, sender=Blocked)
+def invalidate_feed_cache_on_connection_change(sender, instance, **kwargs):
+    """Follows, unfollows, mutes and blocks change the sources of a feed"""
+
+    invalidate_feed_cache([instance.user_id])
@@ -1,3 +1,319 @@
+import datetime as dt
+import random
+import string
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.feeds.models import FollowSuggestion, TimelineEntry
+from bumblebee.feeds.utils import (
+    get_follow_suggestions_for_user,
+    get_timeline_posts_for_user,
+    get_top_posts_for_user,
+    rebuild_follow_suggestions,
+    refresh_post_scores,
+)
+from bumblebee.users.models import CustomUser
+
+
+class FeedTestMixin:
+    def random_string(self):
+        return "".join(random.choice(string.ascii_lowercase) for i in range(10))
+
+    def create_user(self):
+        user = CustomUser(
+            email=f"{self.random_string()}@{self.random_string()}.com",
+            username=self.random_string(),
+            password="123ajkdsa34fana",
+        )
+        user.save()
+        return user
+
+    def follow(self, follower, author):
+        follower.user_following.following.append(author.id)
+        follower.user_following.save()
+        author.user_follower.follower.append(follower.id)
+        author.user_follower.save()
+
+
+class TimelineFanoutTest(FeedTestMixin, TestCase):
+    def setUp(self):
+        self.reader = self.create_user()
+        self.author = self.create_user()
+        self.follow(self.reader, self.author)
+
+    def test_post_is_fanned_out_to_followers(self):
+        buzz = Buzz.objects.create(author=self.author, content="hello there")
+
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, buzz=buzz).exists()
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.author, buzz=buzz).exists()
+        )
+
+    def test_timeline_is_newest_first_across_types(self):
+        buzz = Buzz.objects.create(author=self.author, content="first")
+        rebuzz = Rebuzz.objects.create(author=self.author, buzz=buzz, content="second")
+
+        posts = get_timeline_posts_for_user(self.reader)["posts"]
+
+        self.assertEqual(posts, [rebuzz, buzz])
+
+    def test_muted_author_is_excluded(self):
+        Buzz.objects.create(author=self.author, content="hello there")
+        self.reader.user_muted.muted.append(self.author.id)
+        self.reader.user_muted.save()
+
+        self.assertEqual(get_timeline_posts_for_user(self.reader)["posts"], [])
+
+    def test_private_posts_are_excluded(self):
+        protected = Buzz.objects.create(
+            author=self.author, privacy="prot", content="hello there"
+        )
+        Buzz.objects.create(author=self.author, privacy="priv", content="hi")
+
+        self.assertEqual(get_timeline_posts_for_user(self.reader)["posts"], [protected])
+
+    def test_blocked_author_is_excluded(self):
+        buzz = Buzz.objects.create(author=self.author, content="hello there")
+        self.assertEqual(get_timeline_posts_for_user(self.reader)["posts"], [buzz])
+
+        self.reader.user_blocked.blocked.append(self.author.id)
+        self.reader.user_blocked.save()
+
+        self.assertEqual(get_timeline_posts_for_user(self.reader)["posts"], [])
+
+    def test_large_author_is_merged_on_read(self):
+        with mock.patch("bumblebee.feeds.utils.FANOUT_FOLLOWER_LIMIT", 0):
+            buzz = Buzz.objects.create(author=self.author, content="hello there")
+
+            self.assertFalse(TimelineEntry.objects.filter(buzz=buzz).exists())
+            self.assertEqual(get_timeline_posts_for_user(self.reader)["posts"], [buzz])
+
+
+class FeedPaginationTest(FeedTestMixin, TestCase):
+    def setUp(self):
+        self.reader = self.create_user()
+        self.author = self.create_user()
+        self.follow(self.reader, self.author)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.reader)
+
+    def test_pages_walk_the_whole_feed_once(self):
+        buzzes = [
+            Buzz.objects.create(author=self.author, content=f"buzz {i}")
+            for i in range(5)
+        ]
+        rebuzz = Rebuzz.objects.create(
+            author=self.author, buzz=buzzes[0], content="rebuzz"
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            params = dict(limit=2)
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(reverse("feed-post-list"), params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["post"]), 2)
+
+            seen += [
+                post.get("rebuzzid", post.get("buzzid"))
+                for post in response.data["post"]
+            ]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, [rebuzz.id] + [buzz.id for buzz in buzzes[::-1]])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse("feed-post-list"), dict(cursor="nope"))
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_since_returns_only_newer_posts(self):
+        Buzz.objects.create(author=self.author, content="old")
+        response = self.client.get(reverse("feed-post-list"))
+        since = response.data["since_cursor"]
+
+        new = Buzz.objects.create(author=self.author, content="new")
+        response = self.client.get(reverse("feed-post-list"), dict(since=since))
+
+        self.assertEqual([post["buzzid"] for post in response.data["post"]], [new.id])
+
+    def test_unchanged_feed_is_not_modified(self):
+        Buzz.objects.create(author=self.author, content="hello there")
+        response = self.client.get(reverse("feed-post-list"))
+        etag = response["ETag"]
+
+        response = self.client.get(reverse("feed-post-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Buzz.objects.create(author=self.author, content="something new")
+        response = self.client.get(reverse("feed-post-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+class FollowSuggestionTest(FeedTestMixin, TestCase):
+    def setUp(self):
+        self.users = dict((name, self.create_user()) for name in "abcde")
+        self.client = APIClient()
+
+        self.api_follow("b", "c")
+        self.api_follow("b", "d")
+        self.api_follow("e", "d")
+        self.api_follow("a", "b")
+        self.api_follow("a", "e")
+
+    def api_follow(self, follower, author):
+        """Follow or unfollow through the api so the signals are sent"""
+
+        self.client.force_authenticate(
+            user=CustomUser.objects.get(id=self.users[follower].id)
+        )
+        response = self.client.post(
+            reverse("follow-user"), dict(username=self.users[author].username)
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def get_suggestions(self, name):
+        user = CustomUser.objects.get(id=self.users[name].id)
+        return get_follow_suggestions_for_user(user, limit=2)
+
+    def get_scores(self):
+        return set(FollowSuggestion.objects.values_list("user", "candidate", "score"))
+
+    def test_suggestions_are_ranked_by_mutual_connections(self):
+        self.assertEqual(self.get_suggestions("a"), [self.users["d"], self.users["c"]])
+
+    def test_incremental_scores_match_a_rebuild(self):
+        self.api_follow("a", "e")
+        self.api_follow("c", "a")
+        incremental = self.get_scores()
+
+        rebuild_follow_suggestions()
+
+        self.assertEqual(incremental, self.get_scores())
+
+    def test_muted_users_are_not_suggested(self):
+        a = CustomUser.objects.get(id=self.users["a"].id)
+        a.user_muted.muted.append(self.users["d"].id)
+        a.user_muted.save()
+
+        self.assertEqual(self.get_suggestions("a")[0], self.users["c"])
+
+
+class FeedTopModeTest(FeedTestMixin, TestCase):
+    def setUp(self):
+        self.reader = self.create_user()
+        self.author = self.create_user()
+        self.follow(self.reader, self.author)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.reader)
+
+    def test_posts_are_ranked_by_engagement(self):
+        popular = Buzz.objects.create(author=self.author, content="hello there")
+        Buzz.objects.create(author=self.author, content="hello there")
+
+        interaction = popular.buzz_interaction
+        interaction.upvotes = [self.create_user().id for i in range(3)]
+        interaction.rebuzzes = [1, 2, 3]
+        interaction.save()
+        refresh_post_scores()
+
+        response = self.client.get(reverse("feed-post-list"), dict(mode="top"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["post"][0]["buzzid"], popular.id)
+        self.assertNotIn("ETag", response)
+
+    def test_refreshed_scores_are_served(self):
+        Buzz.objects.create(author=self.author, content="hello there")
+        older = Buzz.objects.create(author=self.author, content="hello there")
+        older.created_date -= dt.timedelta(hours=1)
+        older.save()
+        refresh_post_scores()
+
+        response = self.client.get(reverse("feed-post-list"), dict(mode="top"))
+        self.assertNotEqual(response.data["post"][0]["buzzid"], older.id)
+
+        interaction = older.buzz_interaction
+        interaction.upvotes = [self.create_user().id for i in range(3)]
+        interaction.save()
+        refresh_post_scores()
+
+        response = self.client.get(reverse("feed-post-list"), dict(mode="top"))
+        self.assertEqual(response.data["post"][0]["buzzid"], older.id)
+
+    def test_newer_posts_rank_first_without_engagement(self):
+        Buzz.objects.create(author=self.author, content="hello there")
+        newer = Buzz.objects.create(author=self.author, content="hello there")
+
+        posts = get_top_posts_for_user(self.reader)["posts"]
+
+        self.assertEqual(posts[0], newer)
+
+    def test_top_mode_takes_no_cursor(self):
+        response = self.client.get(
+            reverse("feed-post-list"), dict(mode="top", since="abc")
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class FeedCacheTest(FeedTestMixin, TestCase):
+    def setUp(self):
+        self.reader = self.create_user()
+        self.author = self.create_user()
+        self.follow(self.reader, self.author)
+        Buzz.objects.create(author=self.author, content="hello there")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.reader)
+
+    def get_post_ids(self):
+        response = self.client.get(reverse("feed-post-list"))
+        self.assertEqual(response.status_code, 200)
+        return [post["buzzid"] for post in response.data["post"]]
+
+    def test_repeat_load_is_served_from_cache(self):
+        self.get_post_ids()
+
+        with CaptureQueriesContext(connection) as context:
+            self.get_post_ids()
+
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_new_post_invalidates_followers(self):
+        self.get_post_ids()
+        buzz = Buzz.objects.create(author=self.author, content="something new")
+
+        self.assertEqual(self.get_post_ids()[0], buzz.id)
+
+    def test_privacy_edit_invalidates_followers(self):
+        self.get_post_ids()
+        buzz = Buzz.objects.get(author=self.author)
+        buzz.content = "edited"
+        buzz.privacy = Buzz.PrivacyChoices.PROTECTED
+        buzz.save()
+
+        response = self.client.get(reverse("feed-post-list"))
+        self.assertEqual(response.data["post"][0]["privacy"], "prot")
+
+    def test_mute_invalidates_user(self):
+        self.get_post_ids()
+        self.reader.user_muted.muted.append(self.author.id)
+        self.reader.user_muted.save()
 
-# Create your tests here.
+        self.assertEqual(self.get_post_ids(), [])
@@ -1,21 +1,53 @@
+import base64
+import binascii
 import datetime as dt
-import random
+import hashlib
+import heapq
+import math
+from collections import Counter
+from itertools import islice
 
 import pytz
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import (
+    CharField,
+    F,
+    Func,
+    IntegerField,
+    Q,
+    Value,
+)
+from rest_framework import status
 
+from bumblebee.buzzes.managers import FOLLOWER_VISIBLE_PRIVACY
 from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.connections.models import Blocked, Follower, Following, Muted
+from bumblebee.connections.utils import get_connection_ids_subquery
+from bumblebee.core.exceptions import UrlParameterError
+from bumblebee.core.helpers import create_400
+from bumblebee.feeds.models import FollowSuggestion, TimelineEntry
 from bumblebee.users.models import CustomUser
 from config.definitions import TIME_ZONE
 
+# authors with more followers than this are not fanned out on write, their
+# posts are merged into the feed at read time instead
+FANOUT_FOLLOWER_LIMIT = 5000
 
-def select_max_10_random(ids_list):
-    """ """
-    random_ids = set()
-    for i in range(0, 10):
-        choice = random.choice(ids_list)
-        random_ids.add(choice)
-    return list(random_ids)
+# number of posts returned in a single feed page by default and at most
+FEED_PAGE_SIZE = 50
+FEED_MAX_PAGE_SIZE = 100
+
+# number of accounts suggested to follow
+FOLLOW_SUGGESTION_LIMIT = 10
+
+# weights of interactions in the score of a post in the top feed
+COMMENT_SCORE_WEIGHT = 2
+REBUZZ_SCORE_WEIGHT = 3
+SENTIMENT_SCORE_WEIGHT = 1
+
+# seconds of recency worth as much as tenfold engagement in the top feed
+SCORE_DECAY_SECONDS = 45000
+SCORE_EPOCH = pytz.utc.localize(dt.datetime(2021, 1, 1))
 
 
 def get_date_a_week_ago():
@@ -27,48 +59,690 @@ def get_date_a_week_ago():
     return weekago
 
 
-def get_folowing_buzzes_for_user(owner_user):
-    """Get buzzes of an authentucated user followings"""
+###########################################
+#           SUGGESTIONS
+###########################################
 
-    ids_to_use = owner_user.user_following.following
+
+def get_follow_suggestions_for_user(owner_user, limit=FOLLOW_SUGGESTION_LIMIT):
+    """
+    Get accounts an authenticated user's followings follow, ranked by the
+    number of mutual connections. Topped up with other accounts when there
+    are not enough
+    """
+
+    following_ids = owner_user.user_following.following
     blacklist_ids = owner_user.user_muted.muted + owner_user.user_blocked.blocked
-    date_limit = get_date_a_week_ago()
 
-    buzzes = (
-        Buzz.objects.filter(Q(author__in=ids_to_use) & Q(created_date__gte=date_limit))
-        .exclude(author__in=blacklist_ids)
-        .order_by("-created_date")
+    ids_to_exclude = following_ids + blacklist_ids + [owner_user.id]
+
+    suggestions = [
+        suggestion.candidate
+        for suggestion in FollowSuggestion.objects.filter(user=owner_user)
+        .exclude(candidate__in=ids_to_exclude)
+        .select_related("candidate__profile")[:limit]
+    ]
+
+    if len(suggestions) < limit:
+        suggestions += CustomUser.objects.exclude(
+            id__in=ids_to_exclude + [user.id for user in suggestions]
+        ).select_related("profile")[: limit - len(suggestions)]
+
+    return suggestions
+
+
+def rebuild_follow_suggestions(batch_size=1000):
+    """
+    Recompute every friends-of-friends score from the following lists.
+    Loads the follow graph once and aggregates second degree accounts per user
+    """
+
+    following_map = dict(Following.objects.values_list("user", "following"))
+
+    with transaction.atomic():
+        FollowSuggestion.objects.all().delete()
+
+        suggestions = []
+        for user_id, following_ids in following_map.items():
+            scores = Counter()
+            for followed_id in following_ids:
+                scores.update(following_map.get(followed_id, []))
+
+            for id_to_exclude in following_ids + [user_id]:
+                scores.pop(id_to_exclude, None)
+
+            suggestions += [
+                FollowSuggestion(
+                    user_id=user_id, candidate_id=candidate_id, score=score
+                )
+                for candidate_id, score in scores.items()
+                # following lists are not constrained, skip deleted accounts
+                if candidate_id in following_map
+            ]
+
+            if len(suggestions) >= batch_size:
+                FollowSuggestion.objects.bulk_create(suggestions)
+                suggestions = []
+
+        FollowSuggestion.objects.bulk_create(suggestions)
+
+
+def _shift_follow_suggestion_scores(user_ids, candidate_ids, delta):
+    """
+    Add `delta` to the score of every user and candidate pair, creating rows
+    that do not exist yet and removing rows that drop to zero
+    """
+
+    suggestions = FollowSuggestion.objects.filter(
+        user__in=user_ids, candidate__in=candidate_ids
     )
-    rebuzzes = (
-        Rebuzz.objects.filter(
-            Q(author__in=ids_to_use) & Q(created_date__gte=date_limit)
+    existing_pairs = set(suggestions.values_list("user", "candidate"))
+    suggestions.update(score=F("score") + delta)
+
+    if delta > 0:
+        FollowSuggestion.objects.bulk_create(
+            [
+                FollowSuggestion(
+                    user_id=user_id, candidate_id=candidate_id, score=delta
+                )
+                for user_id in user_ids
+                for candidate_id in candidate_ids
+                if user_id != candidate_id
+                and (user_id, candidate_id) not in existing_pairs
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
         )
-        .exclude(author__in=blacklist_ids)
-        .order_by("-created_date")
+    else:
+        suggestions.filter(score__lte=0).delete()
+
+
+def _get_follow_suggestion_changes(owner_user, follower):
+    """
+    Pairs whose score depends on `follower` following `owner_user`: the
+    accounts `owner_user` follows gain a mutual connection for `follower`, and
+    `owner_user` gains one for everyone following `follower`. Accounts that
+    are already followed are left out as they are never suggested
+    """
+
+    candidate_ids = set(owner_user.user_following.following) - set(
+        follower.user_following.following
     )
+    user_ids = set(follower.user_follower.follower) - set(
+        owner_user.user_follower.follower
+    )
+    return [follower.id], list(candidate_ids), list(user_ids), [owner_user.id]
 
-    return dict(buzzes=buzzes.all(), rebuzzes=rebuzzes.all())
 
+def update_follow_suggestions_on_follow(owner_user, follower):
+    """Add the mutual connections made when `follower` follows `owner_user`"""
 
-def get_follow_suggestions_for_user(owner_user):
-    """Get followings of an authentucated user's followings to suggest"""
+    (
+        follower_ids,
+        candidate_ids,
+        user_ids,
+        owner_ids,
+    ) = _get_follow_suggestion_changes(owner_user, follower)
 
-    following_ids = owner_user.user_following.following
-    blacklist_ids = owner_user.user_muted.muted + owner_user.user_blocked.blocked
+    _shift_follow_suggestion_scores(follower_ids, candidate_ids, 1)
+    _shift_follow_suggestion_scores(user_ids, owner_ids, 1)
 
-    ids_to_exclude = following_ids + blacklist_ids + [owner_user.id]
+    FollowSuggestion.objects.filter(user=follower, candidate=owner_user).delete()
+
+
+def update_follow_suggestions_on_unfollow(owner_user, follower):
+    """Remove the mutual connections lost when `follower` unfollows `owner_user`"""
 
-    rec_ids = []
-    for account in CustomUser.objects.filter(id__in=following_ids):
-        rec_ids += account.user_following.following
+    (
+        follower_ids,
+        candidate_ids,
+        user_ids,
+        owner_ids,
+    ) = _get_follow_suggestion_changes(owner_user, follower)
+
+    _shift_follow_suggestion_scores(follower_ids, candidate_ids, -1)
+    _shift_follow_suggestion_scores(user_ids, owner_ids, -1)
+
+    # `owner_user` can be suggested again through the remaining followings
+    score = Following.objects.filter(
+        user__in=follower.user_following.following,
+        following__contains=[owner_user.id],
+    ).count()
+    if score:
+        FollowSuggestion.objects.update_or_create(
+            user=follower, candidate=owner_user, defaults=dict(score=score)
+        )
 
-    filtered_ids = list(set(rec_ids) - set(ids_to_exclude))
 
-    if len(filtered_ids) >= 10:
-        return CustomUser.objects.filter(id__in=select_max_10_random(filtered_ids))[:10]
+###########################################
+#           TIMELINE
+###########################################
+
+
+def get_post_type(post):
+    """Get the timeline post type of a buzz or rebuzz instance"""
+
+    if isinstance(post, Rebuzz):
+        return TimelineEntry.PostTypeChoices.REBUZZ
+    return TimelineEntry.PostTypeChoices.BUZZ
+
+
+def get_post_sort_key(post):
+    """Sort key of a post in the feed. Newest posts have the greatest key"""
+
+    return (post.created_date, get_post_type(post), post.id)
+
+
+def _create_timeline_entry(userid, post):
+    """ """
+
+    post_type = get_post_type(post)
+    return TimelineEntry(
+        user_id=userid,
+        author_id=post.author_id,
+        post_type=post_type,
+        post_id=post.id,
+        buzz=post if post_type == TimelineEntry.PostTypeChoices.BUZZ else None,
+        rebuzz=post if post_type == TimelineEntry.PostTypeChoices.REBUZZ else None,
+        created_date=post.created_date,
+    )
+
 
-    elif len(filtered_ids) > 0:
-        return CustomUser.objects.filter(id__in=filtered_ids)
+def is_fanout_on_write_author(author):
+    """Check whether posts of an author are pushed to the timelines of followers"""
 
+    return len(author.user_follower.follower) <= FANOUT_FOLLOWER_LIMIT
+
+
+def fan_out_post(post):
+    """Push a newly created buzz or rebuzz to the timeline of every follower"""
+
+    author = post.author
+    if not is_fanout_on_write_author(author):
+        return 0
+
+    # follower arrays are not cleaned up when users are deleted
+    follower_ids = CustomUser.objects.filter(
+        id__in=author.user_follower.follower
+    ).values_list("id", flat=True)
+
+    entries = TimelineEntry.objects.bulk_create(
+        [_create_timeline_entry(userid, post) for userid in follower_ids],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(entries)
+
+
+def backfill_timeline(owner_user, author):
+    """Push the recent posts of a newly followed author to a user's timeline"""
+
+    if not is_fanout_on_write_author(author):
+        return 0
+
+    date_limit = get_date_a_week_ago()
+    posts = list(Buzz.objects.filter(author=author, created_date__gte=date_limit))
+    posts += list(Rebuzz.objects.filter(author=author, created_date__gte=date_limit))
+
+    entries = TimelineEntry.objects.bulk_create(
+        [_create_timeline_entry(owner_user.id, post) for post in posts],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(entries)
+
+
+def prune_timeline_entries():
+    """Delete timeline entries which have fallen out of the feed window"""
+
+    deleted, _ = TimelineEntry.objects.filter(
+        created_date__lt=get_date_a_week_ago()
+    ).delete()
+    return deleted
+
+
+###########################################
+#           FEED QUERY
+###########################################
+
+
+def get_feed_author_filter(owner_user, field="author"):
+    """
+    Filter on the accounts an authenticated user follows, leaving out the
+    muted and blocked ones
+
+    The connection arrays are unnested inside the query instead of being
+    loaded and sent back as `IN (...)` literals.
+    """
+
+    return (
+        Q(
+            **{
+                f"{field}__in": get_connection_ids_subquery(
+                    Following, "following", owner_user
+                )
+            }
+        )
+        & ~Q(
+            **{f"{field}__in": get_connection_ids_subquery(Muted, "muted", owner_user)}
+        )
+        & ~Q(
+            **{
+                f"{field}__in": get_connection_ids_subquery(
+                    Blocked, "blocked", owner_user
+                )
+            }
+        )
+    )
+
+
+def get_timeline_entry_privacy_filter():
+    """
+    Filter timeline entries on the privacy of their post, joined from the
+    post table, so followers never see private posts
+    """
+
+    return Q(
+        post_type=TimelineEntry.PostTypeChoices.BUZZ,
+        buzz__privacy__in=FOLLOWER_VISIBLE_PRIVACY,
+    ) | Q(
+        post_type=TimelineEntry.PostTypeChoices.REBUZZ,
+        rebuzz__privacy__in=FOLLOWER_VISIBLE_PRIVACY,
+    )
+
+
+def _get_fanout_on_read_author_subquery(owner_user):
+    """Subquery of the followed authors whose posts are not fanned out on write"""
+
+    return Follower.objects.filter(
+        user__in=get_connection_ids_subquery(Following, "following", owner_user),
+        follower__len__gt=FANOUT_FOLLOWER_LIMIT,
+    ).values("user")
+
+
+def _get_feed_keys(queryset, post_type=None, id_field="id"):
+    """
+    Select the `(created_date, post_type, id)` sort keys of feed rows. Posts
+    are given their `post_type`, timeline entries carry their own
+    """
+
+    if post_type is None:
+        feed_type = F("post_type")
     else:
-        return CustomUser.objects.exclude(id__in=ids_to_exclude)[:10]
+        feed_type = Value(post_type, output_field=CharField())
+
+    return (
+        queryset.annotate(
+            feed_date=F("created_date"), feed_type=feed_type, feed_id=F(id_field)
+        )
+        .values_list("feed_date", "feed_type", "feed_id")
+        .order_by()
+    )
+
+
+def _order_feed_keys(keys, newer=False, fetch_limit=1):
+    """ """
+
+    sign = "" if newer else "-"
+    return keys.order_by(f"{sign}feed_date", f"{sign}feed_type", f"{sign}feed_id")[
+        :fetch_limit
+    ]
+
+
+def _get_timeline_keys(owner_user, cursor=None, since=None, fetch_limit=1):
+    """
+    Get the sort keys of a user's home timeline in a single query
+
+    Posts of regular authors are read from the materialized timeline, posts of
+    authors with very large follower counts are read from their own tables.
+    Keys are sorted newest first, or oldest first when reading `since` a
+    cursor, and at most `fetch_limit` are returned.
+    """
+
+    date_limit = get_date_a_week_ago()
+    author_filter = get_feed_author_filter(owner_user)
+    fanout_on_read_ids = _get_fanout_on_read_author_subquery(owner_user)
+
+    keyset = since if since is not None else cursor
+    newer = since is not None
+
+    entries = TimelineEntry.objects.filter(
+        Q(user=owner_user)
+        & author_filter
+        & Q(created_date__gte=date_limit)
+        & get_timeline_entry_privacy_filter()
+    ).exclude(author__in=fanout_on_read_ids)
+    if keyset is not None:
+        entries = entries.filter(get_timeline_entry_keyset_filter(keyset, newer))
+    keys = _get_feed_keys(entries, id_field="post_id")
+
+    for model, post_type in (
+        (Buzz, TimelineEntry.PostTypeChoices.BUZZ),
+        (Rebuzz, TimelineEntry.PostTypeChoices.REBUZZ),
+    ):
+        posts = model.objects.visible_to_followers().filter(
+            author_filter
+            & Q(author__in=fanout_on_read_ids)
+            & Q(created_date__gte=date_limit)
+        )
+        if keyset is not None:
+            posts = posts.filter(get_post_keyset_filter(model, keyset, newer))
+        keys = keys.union(_get_feed_keys(posts, post_type), all=True)
+
+    return _order_feed_keys(keys, newer, fetch_limit)
+
+
+def load_feed_posts(keys):
+    """Load the buzzes and rebuzzes of feed sort keys, keeping their order"""
+
+    keys = list(keys)
+    posts = {
+        post_type: model.objects.in_bulk(
+            [postid for _, key_type, postid in keys if key_type == post_type]
+        )
+        for model, post_type in (
+            (Buzz, TimelineEntry.PostTypeChoices.BUZZ),
+            (Rebuzz, TimelineEntry.PostTypeChoices.REBUZZ),
+        )
+    }
+
+    # posts deleted since the keys were read are skipped
+    return [
+        posts[post_type][postid]
+        for _, post_type, postid in keys
+        if postid in posts[post_type]
+    ]
+
+
+def get_timeline_posts_for_user(
+    owner_user, cursor=None, since=None, limit=FEED_PAGE_SIZE
+):
+    """
+    Get a page of an authenticated user's home timeline, newest first
+
+    Posts are sorted on `(created_date, post_type, id)`. Only posts older than
+    `cursor` are returned, so each page costs the same. With `since`, only the
+    posts newer than it are returned, oldest `limit` first, so a client
+    polling the feed never skips a post.
+    """
+
+    # one extra post tells whether there are more posts to read
+    fetch_limit = limit + 1
+    newer = since is not None
+
+    posts = load_feed_posts(_get_timeline_keys(owner_user, cursor, since, fetch_limit))
+
+    page = posts[:limit]
+    has_more = len(posts) > limit
+
+    if newer:
+        page.reverse()
+        return dict(
+            posts=page,
+            next_cursor=None,
+            since_cursor=encode_feed_cursor(page[0]) if page else None,
+            has_more=has_more,
+        )
+
+    return dict(
+        posts=page,
+        next_cursor=encode_feed_cursor(page[-1]) if has_more else None,
+        since_cursor=encode_feed_cursor(page[0]) if page else None,
+        has_more=has_more,
+    )
+
+
+def get_timeline_etag(owner_user, *request_params):
+    """
+    Get a weak ETag of a user's home timeline
+
+    It only changes when a newer post arrives or the follow, mute or block
+    state of the user changes, so an idle feed can be answered with `304`.
+    """
+
+    newest_key = next(iter(_get_timeline_keys(owner_user, fetch_limit=1)), None)
+
+    state = (
+        newest_key,
+        owner_user.user_following.following,
+        owner_user.user_muted.muted,
+        owner_user.user_blocked.blocked,
+        request_params,
+    )
+    digest = hashlib.sha1(repr(state).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+###########################################
+#           RANKING
+###########################################
+
+
+def calculate_post_score(
+    created_date, upvotes=0, downvotes=0, comments=0, rebuzzes=0, sentiment=None
+):
+    """
+    Score of a post in the top feed
+
+    The log of the engagement is added to the creation time. Newer posts start
+    higher and older ones need tenfold engagement per `SCORE_DECAY_SECONDS` to
+    keep up, so recency decays without the score depending on when it was
+    calculated. `sentiment` is the stored sentiment value in `0..1`, if any.
+    """
+
+    engagement = (
+        upvotes
+        - downvotes
+        + COMMENT_SCORE_WEIGHT * comments
+        + REBUZZ_SCORE_WEIGHT * rebuzzes
+    )
+    order = math.copysign(math.log10(max(abs(engagement), 1)), engagement)
+    recency = (created_date - SCORE_EPOCH).total_seconds() / SCORE_DECAY_SECONDS
+    mood = SENTIMENT_SCORE_WEIGHT * (sentiment - 0.5) if sentiment is not None else 0
+
+    return order + recency + mood
+
+
+# interactions relation of each kind of post
+INTERACTION_FIELDS = {Buzz: "buzz_interaction", Rebuzz: "rebuzz_interaction"}
+
+
+def _get_interaction_count(field):
+    """Annotation counting the ids in an interactions array field"""
+
+    return Func(F(field), function="CARDINALITY", output_field=IntegerField())
+
+
+def _refresh_scores(model, posts, batch_size=1000):
+    """Recalculate and bulk update the scores of a queryset of posts"""
+
+    interaction = INTERACTION_FIELDS[model]
+    posts = posts.annotate(
+        upvote_count=_get_interaction_count(f"{interaction}__upvotes"),
+        downvote_count=_get_interaction_count(f"{interaction}__downvotes"),
+        comment_count=_get_interaction_count(f"{interaction}__comments"),
+        rebuzz_count=_get_interaction_count(f"{interaction}__rebuzzes"),
+    )
+
+    refreshed = 0
+    batch = []
+    for post in posts.iterator(chunk_size=batch_size):
+        post.score = calculate_post_score(
+            post.created_date,
+            upvotes=post.upvote_count or 0,
+            downvotes=post.downvote_count or 0,
+            comments=post.comment_count or 0,
+            rebuzzes=post.rebuzz_count or 0,
+            sentiment=post.sentiment_value,
+        )
+        batch.append(post)
+
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, ["score"])
+            refreshed += len(batch)
+            batch = []
+
+    model.objects.bulk_update(batch, ["score"])
+    refreshed += len(batch)
+
+    return refreshed
+
+
+def refresh_post_scores(date_limit=None, batch_size=1000):
+    """
+    Recalculate the top feed score of buzzes and rebuzzes created after
+    `date_limit`, a week ago by default. Meant to be run periodically
+    """
+
+    date_limit = date_limit or get_date_a_week_ago()
+
+    return sum(
+        _refresh_scores(
+            model, model.objects.filter(created_date__gte=date_limit), batch_size
+        )
+        for model in (Buzz, Rebuzz)
+    )
+
+
+def refresh_post_scores_by_id(model, postids):
+    """Recalculate the top feed score of the given buzzes or rebuzzes"""
+
+    return _refresh_scores(model, model.objects.filter(id__in=postids))
+
+
+def set_initial_post_score(post):
+    """Score a newly created post so it ranks before its first refresh"""
+
+    post.score = calculate_post_score(post.created_date, sentiment=post.sentiment_value)
+    post.__class__.objects.filter(id=post.id).update(score=post.score)
+
+
+def get_top_posts_for_user(owner_user, limit=FEED_PAGE_SIZE):
+    """
+    Get the highest scored buzzes and rebuzzes of an authenticated user's
+    followings from the feed window, read in score order off the
+    `(author, score)` indexes
+    """
+
+    author_filter = get_feed_author_filter(owner_user)
+    date_limit = get_date_a_week_ago()
+
+    # one extra post tells whether there are more posts to read
+    fetch_limit = limit + 1
+
+    sources = [
+        model.objects.visible_to_followers()
+        .filter(author_filter & Q(created_date__gte=date_limit))
+        .order_by("-score", "-id")[:fetch_limit]
+        for model in (Buzz, Rebuzz)
+    ]
+    merged = heapq.merge(
+        *sources,
+        key=lambda post: (post.score, get_post_type(post), post.id),
+        reverse=True,
+    )
+    posts = list(islice(merged, fetch_limit))
+
+    return dict(
+        posts=posts[:limit],
+        next_cursor=None,
+        since_cursor=None,
+        has_more=len(posts) > limit,
+    )
+
+
+###########################################
+#           CURSOR
+###########################################
+
+
+def encode_feed_cursor(post):
+    """Create an opaque cursor pointing at a post of the feed"""
+
+    created_date, post_type, postid = get_post_sort_key(post)
+    raw = f"{created_date.isoformat()}|{post_type}|{postid}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_feed_cursor(cursor):
+    """
+    Decode an opaque feed cursor into `(created_date, post_type, id)` or raise
+    """
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_date, post_type, postid = raw.split("|")
+
+        if post_type not in TimelineEntry.PostTypeChoices.values:
+            raise ValueError(post_type)
+
+        return (dt.datetime.fromisoformat(created_date), post_type, int(postid))
+
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise UrlParameterError(
+            "cursor",
+            create_400(
+                status.HTTP_400_BAD_REQUEST,
+                "Url Error",
+                "Query param `cursor` is not a valid feed cursor",
+                "url:cursor",
+            ),
+        )
+
+
+def get_feed_page_size(limit):
+    """Validate the requested feed page size or raise"""
+
+    if limit is None:
+        return FEED_PAGE_SIZE
+
+    try:
+        limit = int(limit)
+        if not 0 < limit <= FEED_MAX_PAGE_SIZE:
+            raise ValueError(limit)
+        return limit
+
+    except (TypeError, ValueError):
+        raise UrlParameterError(
+            "limit",
+            create_400(
+                status.HTTP_400_BAD_REQUEST,
+                "Url Error",
+                f"Query param `limit` must be between 1 and {FEED_MAX_PAGE_SIZE}",
+                "url:limit",
+            ),
+        )
+
+
+def get_timeline_entry_keyset_filter(cursor, newer=False):
+    """Filter timeline entries sorting strictly before, or after, the cursor"""
+
+    created_date, post_type, postid = cursor
+    op = "gt" if newer else "lt"
+    return (
+        Q(**{f"created_date__{op}": created_date})
+        | Q(created_date=created_date, **{f"post_type__{op}": post_type})
+        | Q(
+            created_date=created_date, post_type=post_type, **{f"post_id__{op}": postid}
+        )
+    )
+
+
+def get_post_keyset_filter(model, cursor, newer=False):
+    """Filter buzzes or rebuzzes sorting strictly before, or after, the cursor"""
+
+    created_date, post_type, postid = cursor
+    model_post_type = (
+        TimelineEntry.PostTypeChoices.REBUZZ
+        if model is Rebuzz
+        else TimelineEntry.PostTypeChoices.BUZZ
+    )
+    op = "gt" if newer else "lt"
+
+    if model_post_type == post_type:
+        return Q(**{f"created_date__{op}": created_date}) | Q(
+            created_date=created_date, **{f"id__{op}": postid}
+        )
+    elif (model_post_type > post_type) == newer:
+        return Q(**{f"created_date__{op}e": created_date})
+    return Q(**{f"created_date__{op}": created_date})
@@ -4,8 +4,13 @@ from django.contrib import admin
 from bumblebee.notifications.models.grouped_models import (
     BuzzNotification,
     CommentNotification,
+    NotificationSummary,
     RebuzzNotification,
 )
+from bumblebee.notifications.models.inbox_models import (
+    Notification,
+    NotificationCounter,
+)
 from bumblebee.notifications.models.individual_models import (
     CommentBuzzNotification,
     CommentRebuzzNotification,
@@ -36,3 +41,6 @@ admin.site.register(CommentRebuzzNotification)
 admin.site.register(UpvoteCommentNotification)
 admin.site.register(DownvoteCommentNotification)
 admin.site.register(ReplyCommentNotification)
+admin.site.register(Notification)
+admin.site.register(NotificationSummary)
+admin.site.register(NotificationCounter)
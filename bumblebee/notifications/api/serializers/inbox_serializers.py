@@ -0,0 +1,44 @@
+"""
+Serializers for the Notification Inbox
+"""
+
+from rest_framework import serializers
+
+from bumblebee.core.api.serializers import EagerLoadingMixin
+from bumblebee.notifications.api.serializers.user_serializers import UserSerializer
+from bumblebee.notifications.models.inbox_models import Notification
+
+######################################
+##           RETRIEVE
+######################################
+
+
+class InboxNotificationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    """ """
+
+    select_related_fields = ["agent__profile"]
+
+    notificationid = serializers.IntegerField(source="id")
+    contenttype = serializers.CharField(source="get_contenttype")
+    action = serializers.CharField(source="get_action")
+    timestamp = serializers.DateTimeField()
+    agent = UserSerializer()
+    targetid = serializers.IntegerField(source="target_id", allow_null=True)
+    offshootid = serializers.IntegerField(source="offshoot_id", allow_null=True)
+    notification = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = [
+            "notificationid",
+            "contenttype",
+            "action",
+            "timestamp",
+            "agent",
+            "targetid",
+            "offshootid",
+            "notification",
+        ]
+
+    def get_notification(self, obj):
+        return obj.__str__()
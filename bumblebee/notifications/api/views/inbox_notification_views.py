@@ -0,0 +1,231 @@
+from datetime import datetime as dt
+
+from rest_framework import status
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from bumblebee.core.exceptions import (
+    MissingFieldsError,
+    NoneExistenceError,
+    UrlParameterError,
+)
+from bumblebee.core.helpers import create_200, create_400, create_500
+from bumblebee.notifications.api.serializers.inbox_serializers import (
+    InboxNotificationSerializer,
+)
+from bumblebee.notifications.api.serializers.user_serializers import (
+    NotificationOwnerSerializer,
+)
+from bumblebee.notifications.utils import (
+    decode_notification_cursor,
+    get_inbox_notifications_for_userid,
+    get_notification_page_size,
+    get_unread_notification_count,
+    hide_notification,
+    mark_notifications_read,
+)
+
+##################################
+##          RETRIEVE
+##################################
+
+
+class UserInboxNotificationView(APIView):
+    """
+    Get a page of the notifications of every kind, newest first
+
+    query params
+    ------------
+    cursor: `next_cursor` of the previous page
+    limit: number of notifications in the page
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def _get_notifications(self, *args, **kwargs):
+        """ """
+
+        cursor = self.request.query_params.get("cursor")
+
+        return get_inbox_notifications_for_userid(
+            self.request.user.id,
+            cursor=decode_notification_cursor(cursor) if cursor else None,
+            limit=get_notification_page_size(self.request.query_params.get("limit")),
+        )
+
+    def get(self, request, *args, **kwargs):
+        """ """
+        try:
+
+            user_serializer = NotificationOwnerSerializer(self.request.user)
+            notification_instances = self._get_notifications()
+
+            notification_serializer = InboxNotificationSerializer(
+                notification_instances["notifications"], many=True
+            )
+
+            return Response(
+                dict(
+                    notif_received_date=dt.now(),
+                    user=user_serializer.data,
+                    notifications=notification_serializer.data,
+                    next_cursor=notification_instances["next_cursor"],
+                    has_more=notification_instances["has_more"],
+                ),
+                status=status.HTTP_200_OK,
+            )
+
+        except (MissingFieldsError, UrlParameterError, NoneExistenceError) as error:
+            return Response(error.message, status=error.message.get("status"))
+
+        except (PermissionDenied, NotAuthenticated) as error:
+            return Response(
+                create_400(
+                    error.status_code,
+                    error.get_codes(),
+                    error.get_full_details().get("message"),
+                ),
+                status=error.status_code,
+            )
+
+        except Exception as error:
+            return Response(
+                create_500(
+                    cause=error.args[0] or None,
+                    verbose=f"Could not get notifications of `{kwargs.get('username')}` due to an unknown error",
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class UserNotificationBadgeView(APIView):
+    """
+    Get the number of unread notifications, off a single row
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """ """
+        try:
+
+            return Response(
+                dict(unread=get_unread_notification_count(self.request.user.id)),
+                status=status.HTTP_200_OK,
+            )
+
+        except (PermissionDenied, NotAuthenticated) as error:
+            return Response(
+                create_400(
+                    error.status_code,
+                    error.get_codes(),
+                    error.get_full_details().get("message"),
+                ),
+                status=error.status_code,
+            )
+
+        except Exception as error:
+            return Response(
+                create_500(
+                    cause=error.args[0] or None,
+                    verbose="Could not count unread notifications due to an unknown error",
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+##################################
+##          UPDATE
+##################################
+
+
+class UserInboxNotificationReadView(APIView):
+    """
+    Mark the notifications read up to and including a cursor
+
+    fields
+    ------
+    cursor: `next_cursor` of an inbox page, or a notification's cursor, all
+        notifications are marked read without it
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """ """
+        try:
+            cursor = request.data.get("cursor")
+            counter = mark_notifications_read(
+                self.request.user.id,
+                cursor=decode_notification_cursor(cursor) if cursor else None,
+            )
+
+            return Response(dict(unread=counter.unread), status=status.HTTP_200_OK)
+
+        except (UrlParameterError, NoneExistenceError) as error:
+            return Response(error.message, status=error.message.get("status"))
+
+        except (PermissionDenied, NotAuthenticated) as error:
+            return Response(
+                create_400(
+                    error.status_code,
+                    error.get_codes(),
+                    error.get_full_details().get("message"),
+                ),
+                status=error.status_code,
+            )
+
+        except Exception as error:
+            return Response(
+                create_500(
+                    cause=error.args[0] or None,
+                    verbose="Could not mark notifications read due to an unknown error",
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class UserInboxNotificationHideView(APIView):
+    """
+    Hide a notification of the inbox
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        """ """
+        try:
+            hide_notification(self.request.user.id, kwargs.get("notificationid"))
+
+            return Response(
+                create_200(
+                    status.HTTP_200_OK,
+                    "Notification Hidden",
+                    "Notification has been hidden.",
+                ),
+                status=status.HTTP_200_OK,
+            )
+
+        except (UrlParameterError, NoneExistenceError) as error:
+            return Response(error.message, status=error.message.get("status"))
+
+        except (PermissionDenied, NotAuthenticated) as error:
+            return Response(
+                create_400(
+                    error.status_code,
+                    error.get_codes(),
+                    error.get_full_details().get("message"),
+                ),
+                status=error.status_code,
+            )
+
+        except Exception as error:
+            return Response(
+                create_500(
+                    cause=error.args[0] or None,
+                    verbose="Could not hide notification due to an unknown error",
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
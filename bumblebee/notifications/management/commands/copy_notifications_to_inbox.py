@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.notifications.utils import copy_legacy_notifications
+
+
+class Command(BaseCommand):
+    """
+    Copy the notifications of the individual notification tables to the
+    inbox table.
+
+    New notifications are written to both, run this once after deploying the
+    inbox to bring the older ones along. Running it again copies nothing.
+    """
+
+    help = "Copy the individual notifications to the notification inbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Notifications inserted together",
+        )
+
+    def handle(self, *args, **options):
+        copied = copy_legacy_notifications(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Copied {copied} notifications to the inbox")
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.notifications.utils import rebuild_notification_counters
+
+
+class Command(BaseCommand):
+    """
+    Count the unread inbox notifications of every user again.
+
+    Counters are kept up to date as notifications are created, deleted and
+    hidden, this is only needed for notifications written around them, eg.
+    by a bulk import. `copy_notifications_to_inbox` runs it already.
+    """
+
+    help = "Rebuild the unread notification counters"
+
+    def handle(self, *args, **options):
+        counted = rebuild_notification_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {counted} notification counters")
+        )
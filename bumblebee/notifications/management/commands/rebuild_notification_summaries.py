@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.notifications.utils import rebuild_notification_summaries
+
+
+class Command(BaseCommand):
+    """
+    Compute the grouped notification summaries of every buzz, rebuzz and
+    comment again from their interactions.
+
+    Summaries are kept up to date as interactions are saved, this is only
+    needed for interactions written around them, eg. by a bulk import.
+    """
+
+    help = "Rebuild the grouped notification summaries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Interactions summarized together",
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild_notification_summaries(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {created} notification summaries")
+        )
@@ -1,8 +1,14 @@
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
 from bumblebee.buzzes.models import Buzz, Rebuzz
 from bumblebee.comments.models import Comment
 from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
+from bumblebee.notifications.models.inbox_models import (
+    CONTENT_VERBS,
+    TARGET_VERBS,
+    Verb,
+)
 from bumblebee.users.models import CustomUser
 
 
@@ -52,6 +58,23 @@ class NotificationMethods(models.Model):
     #           STRING
     ##################################
 
+    def get_summaries(self):
+        """
+        Summaries of the interactions with the content by verb, as attached by
+        `utils.attach_notification_summaries` or read on first use
+        """
+
+        summaries = getattr(self, "summaries", None)
+        if summaries is None:
+            summaries = self.summaries = dict(
+                (summary.verb, summary)
+                for summary in NotificationSummary.objects.filter(
+                    target_id=getattr(self, f"{self.content_name}_id"),
+                    verb__in=TARGET_VERBS[self.content_name],
+                )
+            )
+        return summaries
+
     def get_notification(self, action, contenttype):
         """
         Generate string based on action and contenttype
@@ -59,45 +82,65 @@ class NotificationMethods(models.Model):
         Eg, If a user commented on a rebuzz, it generates based on number of action doers
             a string like:
                 `User1, User2 and # others commented on your rebuzz`
+
+        Only fields of the precomputed summary are read, see `NotificationSummary`
         """
 
-        # CONTENT
-        if contenttype == CONTENT_TYPE["BUZZ"]:
-            interaction = self.buzz.buzz_interaction
-        elif contenttype == CONTENT_TYPE["RBZ"]:
-            interaction = self.rebuzz.rebuzz_interaction
-        elif contenttype == CONTENT_TYPE["CMNT"]:
-            interaction = self.comment.comment_interaction
-
-        # ACTION
-        if action == ACTION_TYPE["UPV"]:
-            ids = interaction.upvotes
-        elif action == ACTION_TYPE["DWV"]:
-            ids = interaction.downvotes
-        elif action == ACTION_TYPE["CMNT"]:
-            ids = interaction.comments
-        elif action == ACTION_TYPE["RBZ"]:
-            ids = interaction.rebuzzes
-        elif action == ACTION_TYPE["RPLY"]:
-            ids = interaction.replies
-
-        count = len(ids)
-        usernames = self.get_usernames_from_user_ids(ids[-2:])
-        username_count = len(usernames)
-        if username_count != count:
-            return f"{count} users have {action} your {contenttype}."
+        summary = self.get_summaries().get(CONTENT_VERBS[(contenttype, action)])
 
+        count = summary.count if summary is not None else 0
+        usernames = summary.actor_usernames if summary is not None else []
+
+        if count == 0:
+            return f"0 users have {action} your {contenttype}."
+        elif len(usernames) < min(count, 2):
+            return f"{count} users have {action} your {contenttype}."
+        elif count == 1:
+            return f"{usernames[-1]} {action} your {contenttype}."
+        elif count == 2:
+            return f"{usernames[-1]} and {usernames[-2]} {action} your {contenttype}."
         else:
-            if count == 1:
-                return f"{usernames[-1]} {action} your {contenttype}."
-            elif count == 2:
-                return (
-                    f"{usernames[-1]} and {usernames[-2]} {action} your {contenttype}."
-                )
-            elif count >= 2:
-                return f"{usernames[-1]}, {usernames[-2]}, and {count-2} others {action} your {contenttype}."
-            else:
-                return f"0 users have {action} your {contenttype}."
+            return f"{usernames[-1]}, {usernames[-2]}, and {count-2} others {action} your {contenttype}."
+
+
+class NotificationSummary(models.Model):
+    """
+    Precomputed summary of one kind of interaction with a content, eg. the
+    upvotes of a buzz: how many there are and who did the last few.
+
+    Grouped notifications are rendered from these fields alone, instead of
+    reading the interaction arrays and the users behind them on every render.
+    A summary is computed again from the interaction arrays whenever they are
+    saved, see `utils.update_notification_summaries`.
+
+    `recent_ids` are the last ids of the interaction array, user ids for votes
+    and content ids otherwise, `actor_ids` and `actor_usernames` the users
+    behind them, oldest first.
+    """
+
+    verb = models.PositiveSmallIntegerField(choices=Verb.choices)
+    target_id = models.PositiveIntegerField()
+
+    count = models.PositiveIntegerField(default=0)
+    recent_ids = ArrayField(models.PositiveIntegerField(), blank=True, default=list)
+    actor_ids = ArrayField(models.PositiveIntegerField(), blank=True, default=list)
+    actor_usernames = ArrayField(
+        models.CharField(max_length=150), blank=True, default=list
+    )
+
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Notification Summary"
+        verbose_name_plural = "Notification Summaries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["target_id", "verb"], name="unique_notification_summary"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.get_verb_display()} id:{self.target_id} x{self.count}"
 
 
 #########################################
@@ -108,6 +151,8 @@ class NotificationMethods(models.Model):
 class BuzzNotification(BaseNotification, NotificationMethods):
     """ """
 
+    content_name = "buzz"
+
     buzz = models.OneToOneField(
         Buzz, related_name="buzz_notification", on_delete=models.CASCADE
     )
@@ -139,6 +184,8 @@ class BuzzNotification(BaseNotification, NotificationMethods):
 class RebuzzNotification(BaseNotification, NotificationMethods):
     """ """
 
+    content_name = "rebuzz"
+
     rebuzz = models.OneToOneField(
         Rebuzz, related_name="rebuzz_notification", on_delete=models.CASCADE
     )
@@ -167,6 +214,8 @@ class RebuzzNotification(BaseNotification, NotificationMethods):
 class CommentNotification(BaseNotification, NotificationMethods):
     """ """
 
+    content_name = "comment"
+
     comment = models.OneToOneField(
         Comment, related_name="comment_notification", on_delete=models.CASCADE
     )
@@ -0,0 +1,161 @@
+from django.db import models
+from django.utils import timezone
+
+from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
+from bumblebee.users.models import CustomUser
+
+
+class Notification(models.Model):
+    """
+    A row of a user's notification inbox.
+
+    Every kind of individual notification is stored in this one table. The
+    verb encodes both the action and the kind of content acted on, and the
+    content is referenced by a plain id instead of a foreign key per kind, so
+    a page of the inbox is a single range scan over
+    `(user, hide, timestamp)`, merged and ordered by time.
+
+    `target_id` is the buzz, rebuzz or comment acted on, `offshoot_id` the
+    comment, rebuzz or reply created by the action, both None for connection
+    verbs.
+    """
+
+    class VerbChoices(models.IntegerChoices):
+        """
+        Choices for the action of a notification and its target
+        """
+
+        UPVOTE_BUZZ = 1, "upvoted your buzz"
+        DOWNVOTE_BUZZ = 2, "downvoted your buzz"
+        COMMENT_BUZZ = 3, "commented on your buzz"
+        REBUZZ_BUZZ = 4, "rebuzzed your buzz"
+        UPVOTE_REBUZZ = 5, "upvoted your rebuzz"
+        DOWNVOTE_REBUZZ = 6, "downvoted your rebuzz"
+        COMMENT_REBUZZ = 7, "commented on your rebuzz"
+        UPVOTE_COMMENT = 8, "upvoted your comment"
+        DOWNVOTE_COMMENT = 9, "downvoted your comment"
+        REPLY_COMMENT = 10, "replied on your comment"
+        NEW_FOLLOWER = 11, "followed you"
+        FOLLOW_REQUEST = 12, "requested to follow you"
+        FOLLOW_REQUEST_ACCEPTED = 13, "accepted your request to follow them"
+        FOLLOW_REQUEST_REJECTED = 14, "rejected your request to follow them"
+
+    user = models.ForeignKey(
+        CustomUser, related_name="user_notification", on_delete=models.CASCADE
+    )
+    agent = models.ForeignKey(
+        CustomUser, related_name="agent_notification", on_delete=models.CASCADE
+    )
+    verb = models.PositiveSmallIntegerField(choices=VerbChoices.choices)
+
+    target_id = models.PositiveIntegerField(null=True, blank=True)
+    offshoot_id = models.PositiveIntegerField(null=True, blank=True)
+
+    timestamp = models.DateTimeField(default=timezone.now)
+    hide = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = "Notification"
+        ordering = ["-timestamp", "-id"]
+        indexes = [
+            models.Index(
+                fields=["user", "hide", "-timestamp", "-id"],
+                name="notification_inbox_idx",
+            ),
+            # notifications of a deleted content are removed with it
+            models.Index(fields=["target_id", "verb"], name="notification_target_idx"),
+            models.Index(
+                fields=["offshoot_id", "verb"], name="notification_offshoot_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.agent.username} {self.get_verb_display()}"
+
+    def get_contenttype(self):
+        return VERB_CONTENT[self.verb][0]
+
+    def get_action(self):
+        return VERB_CONTENT[self.verb][1]
+
+
+Verb = Notification.VerbChoices
+
+# `(contenttype, action)` of each verb, as the individual notifications give them
+VERB_CONTENT = {
+    Verb.UPVOTE_BUZZ: (CONTENT_TYPE["BUZZ"], "Upvoted"),
+    Verb.DOWNVOTE_BUZZ: (CONTENT_TYPE["BUZZ"], "Downvoted"),
+    Verb.COMMENT_BUZZ: (CONTENT_TYPE["BUZZ"], "Commented"),
+    Verb.REBUZZ_BUZZ: (CONTENT_TYPE["BUZZ"], "Rebuzzed"),
+    Verb.UPVOTE_REBUZZ: (CONTENT_TYPE["RBZ"], "Upvoted"),
+    Verb.DOWNVOTE_REBUZZ: (CONTENT_TYPE["RBZ"], "Downvoted"),
+    Verb.COMMENT_REBUZZ: (CONTENT_TYPE["RBZ"], "Commented"),
+    Verb.UPVOTE_COMMENT: (CONTENT_TYPE["CMNT"], "Upvoted"),
+    Verb.DOWNVOTE_COMMENT: (CONTENT_TYPE["CMNT"], "Downvoted"),
+    Verb.REPLY_COMMENT: (CONTENT_TYPE["CMNT"], "Replied"),
+    Verb.NEW_FOLLOWER: ("Connection", "Follow"),
+    Verb.FOLLOW_REQUEST: ("Connection", "Request Follow"),
+    Verb.FOLLOW_REQUEST_ACCEPTED: ("Connection", "Accepted Request Follow"),
+    Verb.FOLLOW_REQUEST_REJECTED: ("Connection", "Rejected Request Follow"),
+}
+
+# verb of each `(contenttype, action)` of `utils.create_notification`
+CONTENT_VERBS = {
+    (CONTENT_TYPE["BUZZ"], ACTION_TYPE["UPV"]): Verb.UPVOTE_BUZZ,
+    (CONTENT_TYPE["BUZZ"], ACTION_TYPE["DWV"]): Verb.DOWNVOTE_BUZZ,
+    (CONTENT_TYPE["BUZZ"], ACTION_TYPE["CMNT"]): Verb.COMMENT_BUZZ,
+    (CONTENT_TYPE["BUZZ"], ACTION_TYPE["RBZ"]): Verb.REBUZZ_BUZZ,
+    (CONTENT_TYPE["RBZ"], ACTION_TYPE["UPV"]): Verb.UPVOTE_REBUZZ,
+    (CONTENT_TYPE["RBZ"], ACTION_TYPE["DWV"]): Verb.DOWNVOTE_REBUZZ,
+    (CONTENT_TYPE["RBZ"], ACTION_TYPE["CMNT"]): Verb.COMMENT_REBUZZ,
+    (CONTENT_TYPE["CMNT"], ACTION_TYPE["UPV"]): Verb.UPVOTE_COMMENT,
+    (CONTENT_TYPE["CMNT"], ACTION_TYPE["DWV"]): Verb.DOWNVOTE_COMMENT,
+    (CONTENT_TYPE["CMNT"], ACTION_TYPE["RPLY"]): Verb.REPLY_COMMENT,
+}
+
+# verbs targeting, or creating, each kind of content by its model name
+TARGET_VERBS = dict(
+    buzz=[verb for verb, (kind, _) in VERB_CONTENT.items() if kind == "Buzz"],
+    rebuzz=[verb for verb, (kind, _) in VERB_CONTENT.items() if kind == "Rebuzz"],
+    comment=[verb for verb, (kind, _) in VERB_CONTENT.items() if kind == "Comment"],
+)
+OFFSHOOT_VERBS = dict(
+    rebuzz=[Verb.REBUZZ_BUZZ],
+    comment=[Verb.COMMENT_BUZZ, Verb.COMMENT_REBUZZ, Verb.REPLY_COMMENT],
+)
+
+
+class NotificationCounter(models.Model):
+    """
+    The number of unread notifications of a user's inbox, so the badge is a
+    single row read instead of a count of the inbox.
+
+    A notification is unread while it is visible and newer, on
+    `(timestamp, id)`, than the read position, which only moves forward.
+    The create, delete and hide helpers of `utils.py` keep `unread` in step
+    with the inbox, `utils.mark_notifications_read` moves the position.
+    """
+
+    user = models.OneToOneField(
+        CustomUser,
+        related_name="notification_counter",
+        primary_key=True,
+        on_delete=models.CASCADE,
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    read_timestamp = models.DateTimeField(null=True, blank=True)
+    read_id = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Notification Counter"
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+    def is_unread(self, timestamp, notificationid):
+        """Whether a visible notification is newer than the read position"""
+
+        if self.read_timestamp is None:
+            return True
+        return (timestamp, notificationid) > (self.read_timestamp, self.read_id)
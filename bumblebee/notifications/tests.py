@@ -1,3 +1,178 @@
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from bumblebee.buzzes.models import Buzz
+from bumblebee.comments.models import Comment
+from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
+from bumblebee.notifications.models.grouped_models import NotificationSummary
+from bumblebee.notifications.models.inbox_models import Notification, Verb
+from bumblebee.notifications.models.individual_models import NewFollowerNotification
+from bumblebee.notifications.utils import (
+    copy_legacy_notifications,
+    create_new_follower_notification,
+    create_notification,
+    delete_notification,
+    get_notifications_for_userid,
+    rebuild_notification_counters,
+    rebuild_notification_summaries,
+)
+from bumblebee.users.models import CustomUser
+
+
+def create_user(username):
+    user = CustomUser(
+        email=f"{username}@bumblebee.com",
+        username=username,
+        password="123ajkdsa34fana",
+    )
+    user.save()
+    return user
+
+
+class NotificationInboxTest(TestCase):
+    def setUp(self):
+        self.owner = create_user("queenbee")
+        self.agent = create_user("workerbee")
+        self.buzz = Buzz.objects.create(author=self.owner, content="hello hive")
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.owner)
+
+    def notify(self):
+        comment = Comment.objects.create(
+            commenter=self.agent, parent_buzz=self.buzz, content="hi"
+        )
+        create_notification(
+            ACTION_TYPE["UPV"], CONTENT_TYPE["BUZZ"], self.agent, self.buzz
+        )
+        create_notification(
+            ACTION_TYPE["CMNT"], CONTENT_TYPE["BUZZ"], self.agent, self.buzz, comment
+        )
+        create_new_follower_notification(self.owner, self.agent)
+        return comment
+
+    def get_inbox(self, **params):
+        response = self.client.get(reverse("user-notifications-inbox"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_inbox_pages_are_merged_and_ordered(self):
+        self.notify()
+
+        first = self.get_inbox(limit=2)
+        second = self.get_inbox(limit=2, cursor=first["next_cursor"])
+
+        self.assertEqual(
+            [n["action"] for n in first["notifications"] + second["notifications"]],
+            ["Follow", "Commented", "Upvoted"],
+        )
+        self.assertTrue(first["has_more"])
+        self.assertFalse(second["has_more"])
+        self.assertEqual(
+            first["notifications"][1]["notification"],
+            "workerbee commented on your buzz",
+        )
+
+    def test_removed_and_deleted_contents_leave_inbox(self):
+        comment = self.notify()
+
+        delete_notification(
+            ACTION_TYPE["UPV"], CONTENT_TYPE["BUZZ"], self.agent, self.buzz
+        )
+        comment.delete()
+
+        self.assertEqual(
+            [n["action"] for n in self.get_inbox()["notifications"]], ["Follow"]
+        )
+
+    def test_legacy_notifications_are_copied_once(self):
+        self.notify()
+        Notification.objects.all().delete()
+
+        self.assertEqual(copy_legacy_notifications(), 3)
+        self.assertEqual(copy_legacy_notifications(), 0)
+        self.assertEqual(len(self.get_inbox()["notifications"]), 3)
+        self.assertEqual(self.get_badge(), 3)
+
+    def test_legacy_notifications_at_the_cutoff_are_copied(self):
+        self.notify()
+        oldest = Notification.objects.order_by("timestamp").first()
+        Notification.objects.filter(verb=Verb.NEW_FOLLOWER).delete()
+        NewFollowerNotification.objects.update(timestamp=oldest.timestamp)
+
+        self.assertEqual(copy_legacy_notifications(), 1)
+        self.assertEqual(copy_legacy_notifications(), 0)
+
+    def get_badge(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("user-notifications-badge"))
+        self.assertEqual(response.status_code, 200)
+        return response.data["unread"]
+
+    def test_unread_counter_follows_inbox(self):
+        self.assertEqual(self.get_badge(), 0)
+        comment = self.notify()
+        self.assertEqual(self.get_badge(), 3)
+
+        # read up to the comment, the follow is newer
+        newest, read = self.get_inbox(limit=1), self.get_inbox(limit=2)
+        response = self.client.post(
+            reverse("user-notifications-inbox-read"), dict(cursor=read["next_cursor"])
+        )
+        self.assertEqual(response.data["unread"], 1)
+
+        # hiding or deleting read notifications leaves the count
+        comment.delete()
+        self.assertEqual(self.get_badge(), 1)
+
+        follow = newest["notifications"][0]["notificationid"]
+        self.client.post(reverse("user-notifications-inbox-hide", args=[follow]))
+        self.assertEqual(self.get_badge(), 0)
+
+        create_notification(
+            ACTION_TYPE["DWV"], CONTENT_TYPE["BUZZ"], self.agent, self.buzz
+        )
+        self.assertEqual(self.get_badge(), 1)
+        self.assertEqual(rebuild_notification_counters(), 1)
+        self.assertEqual(self.get_badge(), 1)
+
+        self.client.post(reverse("user-notifications-inbox-read"))
+        self.assertEqual(self.get_badge(), 0)
+
+
+class NotificationSummaryTest(TestCase):
+    def setUp(self):
+        self.users = [create_user(f"bee{i}") for i in range(4)]
+        self.buzz = Buzz.objects.create(author=self.users[0], content="hello hive")
+
+    def upvote(self, user):
+        interaction = self.buzz.buzz_interaction
+        interaction.upvotes.append(user.id)
+        interaction.save()
+
+    def render(self):
+        notification = get_notifications_for_userid(self.users[0].id)[
+            "buzz_notification"
+        ][0]
+        with self.assertNumQueries(0):
+            return notification.get_upvote_notification()
+
+    def test_summary_follows_interactions(self):
+        self.upvote(self.users[1])
+        self.assertEqual(self.render(), "bee1 upvoted your Buzz.")
+
+        self.upvote(self.users[2])
+        self.upvote(self.users[3])
+        self.assertEqual(self.render(), "bee3, bee2, and 1 others upvoted your Buzz.")
+
+        interaction = self.buzz.buzz_interaction
+        interaction.upvotes.remove(self.users[3].id)
+        interaction.save()
+        self.assertEqual(self.render(), "bee2 and bee1 upvoted your Buzz.")
+
+        self.assertEqual(rebuild_notification_summaries(), 1)
+        self.assertEqual(self.render(), "bee2 and bee1 upvoted your Buzz.")
+
+        self.buzz.delete()
+        self.assertFalse(NotificationSummary.objects.exists())
@@ -4,6 +4,12 @@ from bumblebee.notifications.api.views.grouped_notification_views import (
     UserGroupedNotificationListView,
     UserGroupedNotificationView,
 )
+from bumblebee.notifications.api.views.inbox_notification_views import (
+    UserInboxNotificationHideView,
+    UserInboxNotificationReadView,
+    UserInboxNotificationView,
+    UserNotificationBadgeView,
+)
 from bumblebee.notifications.api.views.individual_notification_views import (
     UserIndividualNotificationListView,
     UserIndividualNotificationView,
@@ -30,4 +36,24 @@ urlpatterns = [
         UserIndividualNotificationListView.as_view(),
         name="user-notifications-list",
     ),
+    path(
+        "inbox",
+        UserInboxNotificationView.as_view(),
+        name="user-notifications-inbox",
+    ),
+    path(
+        "inbox/read",
+        UserInboxNotificationReadView.as_view(),
+        name="user-notifications-inbox-read",
+    ),
+    path(
+        "inbox/<int:notificationid>/hide",
+        UserInboxNotificationHideView.as_view(),
+        name="user-notifications-inbox-hide",
+    ),
+    path(
+        "badge",
+        UserNotificationBadgeView.as_view(),
+        name="user-notifications-badge",
+    ),
 ]
@@ -1,12 +1,25 @@
 """
 Notification Utility Function
 """
-from django.db.models import Q
-
+import base64
+import binascii
+import datetime as dt
+import itertools
+
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.db.models.functions import Greatest
+from rest_framework import status
+
+from bumblebee.core.exceptions import NoneExistenceError, UrlParameterError
+from bumblebee.core.helpers import create_400
+from bumblebee.buzzes.models import BuzzInteractions, Rebuzz, RebuzzInteractions
+from bumblebee.comments.models import Comment, CommentInteractions
 from bumblebee.notifications.choices import ACTION_TYPE, CONTENT_TYPE
 from bumblebee.notifications.models.grouped_models import (
     BuzzNotification,
     CommentNotification,
+    NotificationSummary,
     RebuzzNotification,
 )
 from bumblebee.notifications.models.individual_models import (
@@ -25,6 +38,22 @@ from bumblebee.notifications.models.individual_models import (
     UpvoteCommentNotification,
     UpvoteRebuzzNotification,
 )
+from bumblebee.notifications.models.inbox_models import (
+    CONTENT_VERBS,
+    OFFSHOOT_VERBS,
+    TARGET_VERBS,
+    Notification,
+    NotificationCounter,
+    Verb,
+)
+from bumblebee.users.models import CustomUser
+
+# notifications in a page of the inbox
+NOTIFICATION_PAGE_SIZE = 20
+NOTIFICATION_MAX_PAGE_SIZE = 100
+
+# actors named by a grouped notification, "X, Y and N others"
+NOTIFICATION_SUMMARY_ACTORS = 2
 
 ###########################################
 #           CONNECTION CREATE
@@ -34,35 +63,37 @@ from bumblebee.notifications.models.individual_models import (
 def create_notification(action, contenttype, agent, instance, offshoot=None):
     """ """
 
+    notification = None
+
     if contenttype == CONTENT_TYPE["BUZZ"]:
         if action == ACTION_TYPE["UPV"]:
-            UpvoteBuzzNotification.objects.create(
+            notification = UpvoteBuzzNotification.objects.create(
                 agent=agent, user=instance.author, buzz=instance
             )
         elif action == ACTION_TYPE["DWV"]:
-            DownvoteBuzzNotification.objects.create(
+            notification = DownvoteBuzzNotification.objects.create(
                 agent=agent, user=instance.author, buzz=instance
             )
         elif action == ACTION_TYPE["CMNT"]:
-            CommentBuzzNotification.objects.create(
+            notification = CommentBuzzNotification.objects.create(
                 agent=agent, user=instance.author, buzz=instance, comment=offshoot
             )
         elif action == ACTION_TYPE["RBZ"]:
-            RebuzzBuzzNotification.objects.create(
+            notification = RebuzzBuzzNotification.objects.create(
                 agent=agent, user=instance.author, buzz=instance, rebuzz=offshoot
             )
 
     elif contenttype == CONTENT_TYPE["RBZ"]:
         if action == ACTION_TYPE["UPV"]:
-            UpvoteRebuzzNotification.objects.create(
+            notification = UpvoteRebuzzNotification.objects.create(
                 agent=agent, user=instance.author, rebuzz=instance
             )
         elif action == ACTION_TYPE["DWV"]:
-            DownvoteRebuzzNotification.objects.create(
+            notification = DownvoteRebuzzNotification.objects.create(
                 agent=agent, user=instance.author, rebuzz=instance
             )
         elif action == ACTION_TYPE["CMNT"]:
-            CommentRebuzzNotification.objects.create(
+            notification = CommentRebuzzNotification.objects.create(
                 agent=agent, user=instance.author, rebuzz=instance, comment=offshoot
             )
 
@@ -73,18 +104,27 @@ def create_notification(action, contenttype, agent, instance, offshoot=None):
             user = instance.parent_rebuzz.author
 
         if action == ACTION_TYPE["UPV"]:
-            UpvoteCommentNotification.objects.create(
+            notification = UpvoteCommentNotification.objects.create(
                 agent=agent, user=user, comment=instance
             )
         elif action == ACTION_TYPE["DWV"]:
-            DownvoteCommentNotification.objects.create(
+            notification = DownvoteCommentNotification.objects.create(
                 agent=agent, user=user, comment=instance
             )
         elif action == ACTION_TYPE["RPLY"]:
-            ReplyCommentNotification.objects.create(
+            notification = ReplyCommentNotification.objects.create(
                 agent=agent, user=user, comment=instance, reply=offshoot
             )
 
+    if notification is not None:
+        add_to_inbox(
+            notification,
+            CONTENT_VERBS[(contenttype, action)],
+            agent,
+            instance,
+            offshoot,
+        )
+
 
 def delete_notification(action, contenttype, agent, instance):
     """ """
@@ -139,27 +179,50 @@ def delete_notification(action, contenttype, agent, instance):
                 Q(agent=agent), Q(comment=instance)
             ).delete()
 
+    verb = CONTENT_VERBS.get((contenttype, action))
+    if verb is not None:
+        with transaction.atomic():
+            notifications = Notification.objects.filter(
+                verb=verb, target_id=instance.id, agent=agent
+            )
+            _remove_unread(notifications)
+            notifications.delete()
+
 
 def create_new_follower_notification(owner, follower):
     """Create a new follower notification instance"""
 
-    return NewFollowerNotification.objects.create(user=owner, follower=follower)
+    notification = NewFollowerNotification.objects.create(user=owner, follower=follower)
+    add_to_inbox(notification, Verb.NEW_FOLLOWER, follower)
+    return notification
 
 
 def create_new_follower_request_notification(owner, follow_requester):
     """Create a new follower request notification instance"""
 
-    return NewFollowerRequestNotification.objects.create(user=owner, follow_requester=follow_requester)
+    notification = NewFollowerRequestNotification.objects.create(
+        user=owner, follow_requester=follow_requester
+    )
+    add_to_inbox(notification, Verb.FOLLOW_REQUEST, follow_requester)
+    return notification
 
 def create_new_follower_request_accept_notification(owner, follow_requester):
     """Create a new follower request accept notification instance"""
 
-    return AcceptedFollowerRequestNotification.objects.create(user=owner, follow_requester=follow_requester)
+    notification = AcceptedFollowerRequestNotification.objects.create(
+        user=owner, follow_requester=follow_requester
+    )
+    add_to_inbox(notification, Verb.FOLLOW_REQUEST_ACCEPTED, follow_requester)
+    return notification
 
 def create_new_follower_request_reject_notification(owner, follow_requester):
     """Create a new follower request reject notification instance"""
 
-    return RejectedFollowerRequestNotification.objects.create(user=owner, follow_requester=follow_requester)
+    notification = RejectedFollowerRequestNotification.objects.create(
+        user=owner, follow_requester=follow_requester
+    )
+    add_to_inbox(notification, Verb.FOLLOW_REQUEST_REJECTED, follow_requester)
+    return notification
 
 
 ####################################################
@@ -170,14 +233,20 @@ def create_new_follower_request_reject_notification(owner, follow_requester):
 def get_notifications_for_userid(userid):
     """ """
 
-    buzz_notification = BuzzNotification.objects.filter(user__id=userid).exclude(
-        hide=True
+    buzz_notification = attach_notification_summaries(
+        BuzzNotification.objects.filter(user__id=userid)
+        .exclude(hide=True)
+        .select_related("buzz__buzz_interaction")
     )
-    rebuzz_notification = RebuzzNotification.objects.filter(user__id=userid).exclude(
-        hide=True
+    rebuzz_notification = attach_notification_summaries(
+        RebuzzNotification.objects.filter(user__id=userid)
+        .exclude(hide=True)
+        .select_related("rebuzz__rebuzz_interaction")
     )
-    comment_notification = CommentNotification.objects.filter(user__id=userid).exclude(
-        hide=True
+    comment_notification = attach_notification_summaries(
+        CommentNotification.objects.filter(user__id=userid)
+        .exclude(hide=True)
+        .select_related("comment__comment_interaction")
     )
     follower_notification = NewFollowerNotification.objects.filter(
         user__id=userid
@@ -257,3 +326,583 @@ def get_individual_notifications_for_userid(userid):
         comment_notification=comment_notification,
         connection_notification=connection_notification,
     )
+
+
+####################################################
+#               INBOX
+####################################################
+
+
+def add_to_inbox(notification, verb, agent, target=None, offshoot=None):
+    """Copy a created individual notification to the inbox"""
+
+    with transaction.atomic():
+        inbox_notification = Notification.objects.create(
+            user_id=notification.user_id,
+            agent=agent,
+            verb=verb,
+            target_id=target.id if target is not None else None,
+            offshoot_id=offshoot.id if offshoot is not None else None,
+            timestamp=notification.timestamp,
+        )
+        _add_unread(inbox_notification)
+
+    return inbox_notification
+
+
+def delete_content_notifications(instance):
+    """
+    Delete the inbox notifications and notification summaries of a deleted
+    buzz, rebuzz or comment
+    """
+
+    name = instance._meta.model_name
+    with transaction.atomic():
+        notifications = Notification.objects.filter(
+            Q(target_id=instance.id, verb__in=TARGET_VERBS[name])
+            | Q(offshoot_id=instance.id, verb__in=OFFSHOOT_VERBS.get(name, []))
+        )
+        _remove_unread(notifications)
+        notifications.delete()
+
+    NotificationSummary.objects.filter(
+        target_id=instance.id, verb__in=TARGET_VERBS[name]
+    ).delete()
+
+
+# `(model, verb, agent, target, offshoot)` fields of the individual tables
+LEGACY_NOTIFICATIONS = [
+    (UpvoteBuzzNotification, Verb.UPVOTE_BUZZ, "agent_id", "buzz_id", None),
+    (DownvoteBuzzNotification, Verb.DOWNVOTE_BUZZ, "agent_id", "buzz_id", None),
+    (CommentBuzzNotification, Verb.COMMENT_BUZZ, "agent_id", "buzz_id", "comment_id"),
+    (RebuzzBuzzNotification, Verb.REBUZZ_BUZZ, "agent_id", "buzz_id", "rebuzz_id"),
+    (UpvoteRebuzzNotification, Verb.UPVOTE_REBUZZ, "agent_id", "rebuzz_id", None),
+    (DownvoteRebuzzNotification, Verb.DOWNVOTE_REBUZZ, "agent_id", "rebuzz_id", None),
+    (
+        CommentRebuzzNotification,
+        Verb.COMMENT_REBUZZ,
+        "agent_id",
+        "rebuzz_id",
+        "comment_id",
+    ),
+    (UpvoteCommentNotification, Verb.UPVOTE_COMMENT, "agent_id", "comment_id", None),
+    (
+        DownvoteCommentNotification,
+        Verb.DOWNVOTE_COMMENT,
+        "agent_id",
+        "comment_id",
+        None,
+    ),
+    (
+        ReplyCommentNotification,
+        Verb.REPLY_COMMENT,
+        "agent_id",
+        "comment_id",
+        "reply_id",
+    ),
+    (NewFollowerNotification, Verb.NEW_FOLLOWER, "follower_id", None, None),
+    (
+        NewFollowerRequestNotification,
+        Verb.FOLLOW_REQUEST,
+        "follow_requester_id",
+        None,
+        None,
+    ),
+    (
+        AcceptedFollowerRequestNotification,
+        Verb.FOLLOW_REQUEST_ACCEPTED,
+        "follow_requester_id",
+        None,
+        None,
+    ),
+    (
+        RejectedFollowerRequestNotification,
+        Verb.FOLLOW_REQUEST_REJECTED,
+        "follow_requester_id",
+        None,
+        None,
+    ),
+]
+
+
+def copy_legacy_notifications(batch_size=1000):
+    """
+    Copy the notifications of the individual tables to the inbox, returning
+    the number of rows copied.
+
+    Notifications are written to both since the inbox exists, so only rows
+    up to the oldest inbox notification are copied, leaving out those of its
+    timestamp already in the inbox, and running it again copies nothing.
+    """
+
+    with transaction.atomic():
+        cutoff = Notification.objects.aggregate(oldest=Min("timestamp"))["oldest"]
+        # notifications written to both at the cutoff, by their natural key
+        existing = set(
+            Notification.objects.filter(timestamp=cutoff).values_list(
+                "user_id", "agent_id", "verb", "target_id", "offshoot_id"
+            )
+        )
+
+        copied = 0
+        for (
+            model,
+            verb,
+            agent_field,
+            target_field,
+            offshoot_field,
+        ) in LEGACY_NOTIFICATIONS:
+            rows = model.objects.all()
+            if cutoff is not None:
+                rows = rows.filter(timestamp__lte=cutoff)
+
+            fields = ["user_id", agent_field, "timestamp", "hide"]
+            fields += [field for field in (target_field, offshoot_field) if field]
+
+            batch = []
+            for row in rows.values(*fields).iterator(chunk_size=batch_size):
+                target_id = row[target_field] if target_field else None
+                offshoot_id = row[offshoot_field] if offshoot_field else None
+
+                key = (row["user_id"], row[agent_field], verb, target_id, offshoot_id)
+                if row["timestamp"] == cutoff and key in existing:
+                    continue
+
+                batch.append(
+                    Notification(
+                        user_id=row["user_id"],
+                        agent_id=row[agent_field],
+                        verb=verb,
+                        target_id=target_id,
+                        offshoot_id=offshoot_id,
+                        timestamp=row["timestamp"],
+                        hide=row["hide"],
+                    )
+                )
+                if len(batch) == batch_size:
+                    copied += len(Notification.objects.bulk_create(batch))
+                    batch = []
+            copied += len(Notification.objects.bulk_create(batch))
+
+        rebuild_notification_counters()
+
+    return copied
+
+
+def encode_notification_cursor(notification):
+    """Create an opaque cursor pointing at a notification of the inbox"""
+
+    raw = f"{notification.timestamp.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_notification_cursor(cursor):
+    """Decode an opaque inbox cursor into `(timestamp, id)` or raise"""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, notificationid = raw.split("|")
+
+        return (dt.datetime.fromisoformat(timestamp), int(notificationid))
+
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise UrlParameterError(
+            "cursor",
+            create_400(
+                status.HTTP_400_BAD_REQUEST,
+                "Url Error",
+                "Query param `cursor` is not a valid notification cursor",
+                "url:cursor",
+            ),
+        )
+
+
+def get_notification_page_size(limit):
+    """Validate the requested inbox page size or raise"""
+
+    if limit is None:
+        return NOTIFICATION_PAGE_SIZE
+
+    try:
+        limit = int(limit)
+        if not 0 < limit <= NOTIFICATION_MAX_PAGE_SIZE:
+            raise ValueError(limit)
+        return limit
+
+    except (TypeError, ValueError):
+        raise UrlParameterError(
+            "limit",
+            create_400(
+                status.HTTP_400_BAD_REQUEST,
+                "Url Error",
+                f"Query param `limit` must be between 1 and {NOTIFICATION_MAX_PAGE_SIZE}",
+                "url:limit",
+            ),
+        )
+
+
+def get_inbox_notifications_for_userid(
+    userid, cursor=None, limit=NOTIFICATION_PAGE_SIZE
+):
+    """
+    Get a page of a user's visible notifications of every kind, newest first
+
+    Notifications are sorted on `(timestamp, id)` and read in one query off
+    the inbox index. Only notifications older than `cursor` are returned, so
+    each page costs the same.
+    """
+
+    notifications = Notification.objects.filter(user__id=userid, hide=False)
+    if cursor is not None:
+        timestamp, notificationid = cursor
+        notifications = notifications.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=notificationid)
+        )
+
+    # one extra notification tells whether there are more to read
+    page = list(
+        notifications.select_related("agent__profile").order_by("-timestamp", "-id")[
+            : limit + 1
+        ]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    return dict(
+        notifications=page,
+        next_cursor=encode_notification_cursor(page[-1]) if has_more else None,
+        has_more=has_more,
+    )
+
+
+####################################################
+#               UNREAD
+####################################################
+
+
+def _newer_than(timestamp, notificationid):
+    """Notifications after `(timestamp, id)` in inbox order"""
+
+    return Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=notificationid)
+
+
+def _add_unread(notification):
+    """Count a new visible notification as unread, unless it was read past"""
+
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=notification.user_id)], ignore_conflicts=True
+    )
+    NotificationCounter.objects.filter(
+        Q(read_timestamp__isnull=True)
+        | Q(read_timestamp__lt=notification.timestamp)
+        | Q(read_timestamp=notification.timestamp, read_id__lt=notification.id),
+        user_id=notification.user_id,
+    ).update(unread=F("unread") + 1)
+
+
+def _remove_unread(notifications):
+    """
+    Take the unread ones of inbox notifications about to be deleted or hidden
+    off their users' counters. Must run in the transaction changing them
+    """
+
+    rows = list(
+        notifications.select_for_update()
+        .filter(hide=False)
+        .values_list("user_id", "timestamp", "id")
+    )
+    if not rows:
+        return
+
+    counters = NotificationCounter.objects.select_for_update().in_bulk(
+        set(userid for userid, _, _ in rows)
+    )
+    unread = {}
+    for userid, timestamp, notificationid in rows:
+        counter = counters.get(userid)
+        if counter is not None and counter.is_unread(timestamp, notificationid):
+            unread[userid] = unread.get(userid, 0) + 1
+
+    for userid, count in unread.items():
+        NotificationCounter.objects.filter(pk=userid).update(
+            unread=Greatest(F("unread") - count, 0)
+        )
+
+
+def hide_notification(userid, notificationid):
+    """Hide a notification of a user's inbox or raise"""
+
+    with transaction.atomic():
+        notifications = Notification.objects.filter(user__id=userid, id=notificationid)
+        _remove_unread(notifications)
+
+        if not notifications.update(hide=True):
+            raise NoneExistenceError(
+                notificationid,
+                create_400(
+                    404,
+                    "Non existence",
+                    f"Notification with id {notificationid} does not exist!",
+                    "notification",
+                ),
+            )
+
+
+def get_unread_notification_count(userid):
+    """Number of unread notifications of a user, read off a single row"""
+
+    return (
+        NotificationCounter.objects.filter(pk=userid)
+        .values_list("unread", flat=True)
+        .first()
+        or 0
+    )
+
+
+def mark_notifications_read(userid, cursor=None):
+    """
+    Mark a user's notifications read up to and including the `(timestamp, id)`
+    of `cursor`, or all of them, and return the counter
+
+    The read position never moves back, the notifications still unread after
+    it are counted again off the inbox index.
+    """
+
+    with transaction.atomic():
+        NotificationCounter.objects.bulk_create(
+            [NotificationCounter(user_id=userid)], ignore_conflicts=True
+        )
+        counter = NotificationCounter.objects.select_for_update().get(pk=userid)
+        visible = Notification.objects.filter(user__id=userid, hide=False)
+
+        if cursor is None:
+            cursor = (
+                visible.order_by("-timestamp", "-id")
+                .values_list("timestamp", "id")
+                .first()
+            )
+        if cursor is None or not counter.is_unread(*cursor):
+            return counter
+
+        counter.read_timestamp, counter.read_id = cursor
+        counter.unread = visible.filter(_newer_than(*cursor)).count()
+        counter.save()
+
+    return counter
+
+
+def rebuild_notification_counters():
+    """
+    Count the unread notifications of every user again, eg. after
+    notifications are copied or written in bulk. Returns the number of
+    counters
+    """
+
+    with transaction.atomic():
+        counters = NotificationCounter.objects.select_for_update().in_bulk()
+
+        unread = {}
+        for userid, timestamp, notificationid in (
+            Notification.objects.filter(hide=False)
+            .values_list("user_id", "timestamp", "id")
+            .iterator()
+        ):
+            counter = counters.get(userid)
+            if counter is None or counter.is_unread(timestamp, notificationid):
+                unread[userid] = unread.get(userid, 0) + 1
+
+        for userid, counter in counters.items():
+            counter.unread = unread.pop(userid, 0)
+        NotificationCounter.objects.bulk_update(
+            counters.values(), ["unread"], batch_size=1000
+        )
+        created = NotificationCounter.objects.bulk_create(
+            NotificationCounter(user_id=userid, unread=count)
+            for userid, count in unread.items()
+        )
+
+    return len(counters) + len(created)
+
+
+####################################################
+#               SUMMARIES
+####################################################
+
+
+# `(model, user id, username)` fields giving the actor behind an interaction id
+ACTOR_FIELDS = dict(
+    user=(CustomUser, "id", "username"),
+    comment=(Comment, "commenter_id", "commenter__username"),
+    rebuzz=(Rebuzz, "author_id", "author__username"),
+)
+
+# `(verb, interaction array, kind of ids)` summarized for each interaction model
+SUMMARIZED_INTERACTIONS = dict(
+    buzzinteractions=(
+        "buzz_id",
+        [
+            (Verb.UPVOTE_BUZZ, "upvotes", "user"),
+            (Verb.DOWNVOTE_BUZZ, "downvotes", "user"),
+            (Verb.COMMENT_BUZZ, "comments", "comment"),
+            (Verb.REBUZZ_BUZZ, "rebuzzes", "rebuzz"),
+        ],
+    ),
+    rebuzzinteractions=(
+        "rebuzz_id",
+        [
+            (Verb.UPVOTE_REBUZZ, "upvotes", "user"),
+            (Verb.DOWNVOTE_REBUZZ, "downvotes", "user"),
+            (Verb.COMMENT_REBUZZ, "comments", "comment"),
+        ],
+    ),
+    commentinteractions=(
+        "comment_id",
+        [
+            (Verb.UPVOTE_COMMENT, "upvotes", "user"),
+            (Verb.DOWNVOTE_COMMENT, "downvotes", "user"),
+            (Verb.REPLY_COMMENT, "replies", "comment"),
+        ],
+    ),
+)
+
+
+def _get_actors(ids_by_kind):
+    """`{(kind, id): (userid, username)}` of interaction ids, one query per kind"""
+
+    actors = {}
+    for kind, ids in ids_by_kind.items():
+        if not ids:
+            continue
+        model, userid_field, username_field = ACTOR_FIELDS[kind]
+        for itemid, userid, username in model.objects.filter(id__in=ids).values_list(
+            "id", userid_field, username_field
+        ):
+            actors[(kind, itemid)] = (userid, username)
+    return actors
+
+
+def _get_summaries(interactions, saved=None):
+    """
+    Unsaved summaries of every summarized array of interactions of a single
+    model, empty arrays included. Summaries equal to the `(count, recent_ids)`
+    of `saved`, by `(target_id, verb)`, are left out
+    """
+
+    if not interactions:
+        return []
+
+    target_field, summarized = SUMMARIZED_INTERACTIONS[interactions[0]._meta.model_name]
+    saved = saved or {}
+
+    pending = []
+    ids_by_kind = dict((kind, set()) for kind in ACTOR_FIELDS)
+    for interaction in interactions:
+        target_id = getattr(interaction, target_field)
+        for verb, field, kind in summarized:
+            ids = getattr(interaction, field)
+            recent_ids = ids[-NOTIFICATION_SUMMARY_ACTORS:]
+            if saved.get((target_id, verb), (0, [])) == (len(ids), recent_ids):
+                continue
+
+            ids_by_kind[kind].update(recent_ids)
+            pending.append(
+                (
+                    kind,
+                    NotificationSummary(
+                        verb=verb,
+                        target_id=target_id,
+                        count=len(ids),
+                        recent_ids=recent_ids,
+                    ),
+                )
+            )
+
+    # deleted contents and users are left out
+    actors = _get_actors(ids_by_kind)
+    for kind, summary in pending:
+        found = [actors[(kind, i)] for i in summary.recent_ids if (kind, i) in actors]
+        summary.actor_ids = [userid for userid, _ in found]
+        summary.actor_usernames = [username for _, username in found]
+
+    return [summary for _, summary in pending]
+
+
+def update_notification_summaries(interaction):
+    """
+    Compute the notification summaries of a saved buzz, rebuzz or comment
+    interaction again, writing only those whose count or recent ids changed
+    """
+
+    target_field, summarized = SUMMARIZED_INTERACTIONS[interaction._meta.model_name]
+    saved = dict(
+        ((target_id, verb), (count, recent_ids))
+        for target_id, verb, count, recent_ids in NotificationSummary.objects.filter(
+            target_id=getattr(interaction, target_field),
+            verb__in=[verb for verb, _, _ in summarized],
+        ).values_list("target_id", "verb", "count", "recent_ids")
+    )
+
+    for summary in _get_summaries([interaction], saved):
+        NotificationSummary.objects.update_or_create(
+            verb=summary.verb,
+            target_id=summary.target_id,
+            defaults=dict(
+                count=summary.count,
+                recent_ids=summary.recent_ids,
+                actor_ids=summary.actor_ids,
+                actor_usernames=summary.actor_usernames,
+            ),
+        )
+
+
+def attach_notification_summaries(notifications):
+    """
+    Load the summaries of grouped notifications of a single model in one
+    query, so rendering them reads no other rows. Returns them as a list
+    """
+
+    notifications = list(notifications)
+    if not notifications:
+        return notifications
+
+    content_name = notifications[0].content_name
+    summaries = {}
+    for summary in NotificationSummary.objects.filter(
+        target_id__in=[
+            getattr(notification, f"{content_name}_id")
+            for notification in notifications
+        ],
+        verb__in=TARGET_VERBS[content_name],
+    ):
+        summaries.setdefault(summary.target_id, {})[summary.verb] = summary
+
+    for notification in notifications:
+        notification.summaries = summaries.get(
+            getattr(notification, f"{content_name}_id"), {}
+        )
+    return notifications
+
+
+def rebuild_notification_summaries(batch_size=1000):
+    """
+    Compute every notification summary again from the interaction arrays, eg.
+    for interactions written in bulk. Returns the number of summaries
+    """
+
+    with transaction.atomic():
+        NotificationSummary.objects.all().delete()
+
+        created = 0
+        for model in [BuzzInteractions, RebuzzInteractions, CommentInteractions]:
+            interactions = model.objects.order_by("id").iterator(chunk_size=batch_size)
+            while True:
+                batch = list(itertools.islice(interactions, batch_size))
+                if not batch:
+                    break
+                created += len(
+                    NotificationSummary.objects.bulk_create(
+                        summary for summary in _get_summaries(batch) if summary.count
+                    )
+                )
+
+    return created
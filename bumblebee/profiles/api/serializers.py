@@ -2,6 +2,7 @@ from rest_framework import serializers
 
 from bumblebee.core.exceptions import UnknownModelFieldsError
 from bumblebee.profiles.models import Profile
+from bumblebee.sentiment_analysis.api.serializers import SentimentAggregateSerializer
 
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -46,6 +47,10 @@ class ProfileSerializer(serializers.ModelSerializer):
     following_count = serializers.SerializerMethodField()
     muted_count = serializers.SerializerMethodField()
     blocked_count = serializers.SerializerMethodField()
+    # sentiment of the buzzes, rebuzzes and comments, null until one is scored
+    author_sentiment = SentimentAggregateSerializer(
+        source="user.author_sentiment", read_only=True, allow_null=True
+    )
 
     class Meta:
         abstract = True
@@ -73,6 +78,7 @@ class ProfileSerializer(serializers.ModelSerializer):
             "following_count",
             "muted_count",
             "blocked_count",
+            "author_sentiment",
         ]
 
     def get_followers_count(self, obj):
@@ -116,6 +122,7 @@ class ProfileOwnerSerializer(ProfileSerializer):
             "following_count",
             "muted_count",
             "blocked_count",
+            "author_sentiment",
         ]
 
 
@@ -141,6 +148,7 @@ class ProfilePublicSerializer(ProfileSerializer):
             "email",
             "followers_count",
             "following_count",
+            "author_sentiment",
         ]
 
 
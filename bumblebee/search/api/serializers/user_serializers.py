@@ -1,11 +1,14 @@
 from rest_framework import serializers
 
+from bumblebee.core.api.serializers import EagerLoadingMixin
 from bumblebee.users.models import CustomUser
 
 
-class SearchUserSerializer(serializers.ModelSerializer):
+class SearchUserSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     """ """
 
+    select_related_fields = ["profile"]
+
     userid = serializers.IntegerField(source="id")
     username = serializers.CharField()
     account_verified = serializers.BooleanField(source="profile.account_verified")
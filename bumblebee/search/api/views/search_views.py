@@ -30,17 +30,21 @@ class SearchView(APIView):
             keyword = self.request.query_params.get("keyword")
 
             if keyword is not None:
-                buzzes = Buzz.objects.filter(
+                buzzes = Buzz.objects.visible_to(self.request.user).filter(
                     Q(content__icontains=keyword)
                     | Q(author__username__icontains=keyword)
-                ).exclude(privacy="priv")
-                rebuzzes = Rebuzz.objects.filter(
+                )
+                rebuzzes = Rebuzz.objects.visible_to(self.request.user).filter(
                     Q(content__icontains=keyword)
                     | Q(author__username__icontains=keyword)
-                ).exclude(privacy="priv")
+                )
                 users = CustomUser.objects.filter(Q(username__icontains=keyword))
 
-                return dict(buzzes=buzzes, rebuzzes=rebuzzes, users=users)
+                return dict(
+                    buzzes=BuzzDetailSerializer.setup_eager_loading(buzzes),
+                    rebuzzes=RebuzzDetailSerializer.setup_eager_loading(rebuzzes),
+                    users=SearchUserSerializer.setup_eager_loading(users),
+                )
 
             else:
                 raise UrlParameterError(
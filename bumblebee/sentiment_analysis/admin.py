@@ -1,3 +1,39 @@
 from django.contrib import admin
 
-# Register your models here.
+from .feedback import record_sentiment_feedback
+from .models import SentimentFeedback
+
+
+def _label_sentiment(queryset, label):
+    for instance in queryset:
+        record_sentiment_feedback(
+            instance, label, SentimentFeedback.SourceChoices.MODERATOR
+        )
+
+
+@admin.action(description="Label sentiment as positive")
+def label_positive_sentiment(modeladmin, request, queryset):
+    """ """
+
+    _label_sentiment(queryset, SentimentFeedback.LabelChoices.POSITIVE)
+
+
+@admin.action(description="Label sentiment as negative")
+def label_negative_sentiment(modeladmin, request, queryset):
+    """ """
+
+    _label_sentiment(queryset, SentimentFeedback.LabelChoices.NEGATIVE)
+
+
+# moderator labels, added to the admins of buzzes, rebuzzes and comments
+SENTIMENT_LABEL_ACTIONS = [label_positive_sentiment, label_negative_sentiment]
+
+
+class SentimentFeedbackAdmin(admin.ModelAdmin):
+    """ """
+
+    list_display = ("id", "content", "label", "source", "applied_version")
+    list_filter = ("label", "source")
+
+
+admin.site.register(SentimentFeedback, SentimentFeedbackAdmin)
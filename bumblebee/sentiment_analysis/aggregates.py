@@ -0,0 +1,164 @@
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.comments.models import Comment
+
+from .models import AuthorSentiment, ThreadSentiment
+
+# field naming the author of each kind of content
+AUTHOR_FIELDS = dict(buzz="author_id", rebuzz="author_id", comment="commenter_id")
+
+# field naming the buzz thread of each kind of content
+THREAD_FIELDS = dict(comment="parent_buzz_id")
+
+
+######################################
+##           INCREMENTAL
+######################################
+
+
+def get_sentiment_rows(model, ids):
+    """
+    `{id: ((author_id, buzz_id), sentiment_value)}` of contents, locked until
+    the transaction ends so their values and aggregates change together
+    """
+
+    name = model._meta.model_name
+    thread_field = THREAD_FIELDS.get(name)
+
+    rows = (
+        model.objects.select_for_update()
+        .filter(id__in=ids)
+        .values_list("id", AUTHOR_FIELDS[name], "sentiment_value", thread_field or "id")
+    )
+    return dict(
+        (postid, ((author_id, buzz_id if thread_field else None), sentiment_value))
+        for postid, author_id, sentiment_value, buzz_id in rows
+    )
+
+
+def _add_change(deltas, key, old, new):
+    count, total, total_squares = deltas.get(key, (0, 0.0, 0.0))
+
+    if old is not None:
+        count, total, total_squares = count - 1, total - old, total_squares - old**2
+    if new is not None:
+        count, total, total_squares = count + 1, total + new, total_squares + new**2
+
+    deltas[key] = (count, total, total_squares)
+
+
+def _apply_deltas(aggregate, deltas):
+    """
+    Add `(count, total, total_squares)` deltas to the aggregate rows of their
+    keys. Missing rows are only created for additions, a row removed along
+    with its buzz or user is never created again
+    """
+
+    deltas = dict(
+        (key, delta) for key, delta in deltas.items() if key is not None and any(delta)
+    )
+
+    aggregate.objects.bulk_create(
+        [aggregate(pk=key) for key, delta in deltas.items() if delta[0] >= 0],
+        ignore_conflicts=True,
+    )
+
+    now = timezone.now()
+    for key, (count, total, total_squares) in deltas.items():
+        aggregate.objects.filter(pk=key).update(
+            count=F("count") + count,
+            total=F("total") + total,
+            total_squares=F("total_squares") + total_squares,
+            updated_date=now,
+        )
+
+
+def update_sentiment_aggregates(changes):
+    """
+    Apply `((author_id, buzz_id), old_value, new_value)` changes of sentiment
+    values to the author and thread aggregates, with one update per row
+    touched. A None value is a content without a score
+    """
+
+    authors = {}
+    threads = {}
+    for (author_id, buzz_id), old, new in changes:
+        _add_change(authors, author_id, old, new)
+        _add_change(threads, buzz_id, old, new)
+
+    _apply_deltas(AuthorSentiment, authors)
+    _apply_deltas(ThreadSentiment, threads)
+
+
+def remove_from_sentiment_aggregates(instance):
+    """Take a deleted buzz, rebuzz or comment out of the aggregates"""
+
+    if instance.sentiment_value is None:
+        return
+
+    name = instance._meta.model_name
+    thread_field = THREAD_FIELDS.get(name)
+    key = (
+        getattr(instance, AUTHOR_FIELDS[name]),
+        getattr(instance, thread_field) if thread_field else None,
+    )
+    update_sentiment_aggregates([(key, instance.sentiment_value, None)])
+
+
+######################################
+##           REBUILD
+######################################
+
+
+def _get_totals(queryset, field):
+    return (
+        queryset.filter(sentiment_value__isnull=False)
+        .order_by()
+        .values_list(field)
+        .annotate(
+            count=Count("id"),
+            total=Sum("sentiment_value"),
+            total_squares=Sum(F("sentiment_value") * F("sentiment_value")),
+        )
+    )
+
+
+def rebuild_sentiment_aggregates():
+    """
+    Compute every aggregate again from the stored values, eg. for contents
+    created before aggregates were kept or written in bulk. Returns the number
+    of thread and author rows
+    """
+
+    with transaction.atomic():
+        ThreadSentiment.objects.all().delete()
+        AuthorSentiment.objects.all().delete()
+
+        threads = ThreadSentiment.objects.bulk_create(
+            ThreadSentiment(
+                buzz_id=buzz_id, count=count, total=total, total_squares=total_squares
+            )
+            for buzz_id, count, total, total_squares in _get_totals(
+                Comment.objects.filter(parent_buzz__isnull=False), "parent_buzz_id"
+            )
+        )
+
+        authors = {}
+        for model in [Buzz, Rebuzz, Comment]:
+            field = AUTHOR_FIELDS[model._meta.model_name]
+            for author_id, *totals in _get_totals(model.objects.all(), field):
+                authors[author_id] = [
+                    a + b for a, b in zip(authors.get(author_id, (0, 0.0, 0.0)), totals)
+                ]
+
+        AuthorSentiment.objects.bulk_create(
+            AuthorSentiment(
+                user_id=author_id, count=count, total=total, total_squares=total_squares
+            )
+            for author_id, (count, total, total_squares) in authors.items()
+        )
+
+    return len(threads), len(authors)
@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+
+class SentimentAggregateSerializer(serializers.Serializer):
+    """ """
+
+    count = serializers.IntegerField(help_text="Scored contents")
+    total = serializers.FloatField(help_text="Sum of the sentiment values")
+    total_squares = serializers.FloatField(
+        help_text="Sum of the squared sentiment values"
+    )
+    mean = serializers.FloatField(allow_null=True)
+    variance = serializers.FloatField(allow_null=True)
+    updated_date = serializers.DateTimeField()
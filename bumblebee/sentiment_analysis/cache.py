@@ -0,0 +1,121 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+# contents whose scores are kept in process
+SENTIMENT_CACHE_SIZE = 10000
+
+# seconds scores are kept in the shared cache
+SENTIMENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def normalize_content(content):
+    """
+    Collapse whitespace, which neither the vectorizer nor textblob tokens
+    depend on, so reformatted copies of a content share a cache entry
+    """
+
+    return " ".join(content.split())
+
+
+class SentimentCache:
+    """
+    Bounded LRU of `(sentiment_value, textblob_value)` scores keyed by the hash
+    of the normalized content and the model version, in front of an optional
+    shared Django cache named by the `SENTIMENT_SHARED_CACHE` setting.
+
+    Rebuzzes often repeat the content they share, so their scores are looked up
+    instead of computed again. Entries of another model version are never
+    returned, the in-process tier is cleared when the version changes.
+    """
+
+    def __init__(self, maxsize=SENTIMENT_CACHE_SIZE, shared_alias=None):
+        self.maxsize = maxsize
+        self.shared_alias = shared_alias
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.stats = dict(hits=0, shared_hits=0, misses=0)
+
+    def _get_shared_cache(self):
+        alias = self.shared_alias or getattr(settings, "SENTIMENT_SHARED_CACHE", None)
+        return caches[alias] if alias else None
+
+    def _get_key(self, version, content):
+        digest = hashlib.sha1(normalize_content(content).encode()).hexdigest()
+        return f"sentiment:{version}:{digest}"
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get_many(self, version, contents):
+        """Cached scores of `contents`, as a dict of the contents found"""
+
+        keys = dict((content, self._get_key(version, content)) for content in contents)
+
+        found = {}
+        with self._lock:
+            self._check_version(version)
+            for content, key in keys.items():
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[content] = self._entries[key]
+            self.stats["hits"] += len(found)
+
+        shared_cache = self._get_shared_cache()
+        missing = [content for content in keys if content not in found]
+        if shared_cache is not None and missing:
+            values = shared_cache.get_many([keys[content] for content in missing])
+            shared = dict(
+                (content, values[keys[content]])
+                for content in missing
+                if keys[content] in values
+            )
+            self._store(version, dict((keys[c], v) for c, v in shared.items()))
+            found.update(shared)
+
+            with self._lock:
+                self.stats["shared_hits"] += len(shared)
+
+        with self._lock:
+            self.stats["misses"] += len(keys) - len(found)
+
+        return found
+
+    def _store(self, version, entries):
+        with self._lock:
+            self._check_version(version)
+            for key, value in entries.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def set_many(self, version, scores):
+        """Cache a dict of content scores in both tiers"""
+
+        entries = dict(
+            (self._get_key(version, content), value)
+            for content, value in scores.items()
+        )
+        self._store(version, entries)
+
+        shared_cache = self._get_shared_cache()
+        if shared_cache is not None:
+            shared_cache.set_many(entries, timeout=SENTIMENT_CACHE_TIMEOUT)
+
+    def clear(self):
+        """Drop the in-process tier and reset the counters"""
+
+        with self._lock:
+            self._entries.clear()
+            self.stats = dict(hits=0, shared_hits=0, misses=0)
+
+
+sentiment_cache = SentimentCache()
@@ -0,0 +1,242 @@
+import json
+import os
+import re
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# engine attributes saved as numpy arrays
+ENGINE_ARRAYS = ["idf", "weights", "bias"]
+
+
+class SentimentEngine:
+    """
+    Sparse inference over the fitted tfidf vectorizer, logistic regression and
+    naive bayes models.
+
+    Both models are linear in the tfidf vector once their outputs are turned
+    into the log odds of the positive class:
+
+        logreg: coef . x + intercept
+        bayes:  (log P(w|pos) - log P(w|neg)) . x + log P(pos) - log P(neg)
+
+    so their per-token weights are stacked into a single `(features, 2)`
+    matrix, with the idf folded in. Scoring a batch is then one tokenizing pass
+    into a CSR matrix of term frequencies and one sparse matrix product,
+    without densifying the 1000 feature row or building DataFrames.
+    Probabilities match `predict_proba` of both models.
+
+    The engine only holds numpy arrays and the vocabulary, so once saved it
+    loads without scikit-learn, joblib or pandas.
+    """
+
+    def __init__(
+        self,
+        vocabulary,
+        idf,
+        weights,
+        bias,
+        token_pattern=r"(?u)\b\w\w+\b",
+        lowercase=True,
+        ngram_range=(1, 1),
+        sublinear_tf=False,
+        norm="l2",
+    ):
+        if norm not in ("l2", "l1", None):
+            raise ValueError(f"Unsupported tfidf norm `{norm}`")
+
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights
+        self.bias = bias
+
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.ngram_range = tuple(ngram_range)
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+
+        self._tokenize = re.compile(token_pattern).findall
+
+    @classmethod
+    def from_models(cls, vectorizer, logreg, bayes):
+        """Build the engine from a fitted tfidf vectorizer and both models"""
+
+        if vectorizer.analyzer != "word" or vectorizer.strip_accents is not None:
+            raise ValueError(
+                "Only word analyzers without accent stripping are supported"
+            )
+        if vectorizer.stop_words is not None:
+            raise ValueError("Vectorizers with stop words are not supported")
+
+        # tfidf options are read off the inner transformer, vectorizers
+        # pickled by older scikit-learn releases only keep them there
+        transformer = vectorizer._tfidf
+
+        vocabulary = dict(
+            (token, int(index)) for token, index in vectorizer.vocabulary_.items()
+        )
+        if transformer.use_idf:
+            idf = np.asarray(transformer.idf_, dtype=np.float64)
+        else:
+            idf = np.ones(len(vocabulary))
+
+        # classes_ are [0, 1], column 1 being the positive class
+        bayes_weights = bayes.feature_log_prob_[1] - bayes.feature_log_prob_[0]
+        bayes_bias = bayes.class_log_prior_[1] - bayes.class_log_prior_[0]
+
+        return cls(
+            vocabulary=vocabulary,
+            idf=idf,
+            weights=np.column_stack([logreg.coef_[0], bayes_weights]) * idf[:, None],
+            bias=np.array([logreg.intercept_[0], bayes_bias]),
+            token_pattern=vectorizer.token_pattern,
+            lowercase=vectorizer.lowercase,
+            ngram_range=vectorizer.ngram_range,
+            sublinear_tf=transformer.sublinear_tf,
+            norm=transformer.norm,
+        )
+
+    ######################################
+    ##           PERSISTENCE
+    ######################################
+
+    def save(self, directory, **metadata):
+        """
+        Write the engine to `directory`: arrays as `.npy` files which can be
+        memory mapped, everything else with `metadata` in `engine.json`
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        for name in ENGINE_ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+        with open(os.path.join(directory, "engine.json"), "w") as file:
+            json.dump(
+                dict(
+                    vocabulary=self.vocabulary,
+                    token_pattern=self.token_pattern,
+                    lowercase=self.lowercase,
+                    ngram_range=self.ngram_range,
+                    sublinear_tf=self.sublinear_tf,
+                    norm=self.norm,
+                    metadata=metadata,
+                ),
+                file,
+            )
+
+    @staticmethod
+    def read_metadata(directory):
+        """Metadata an engine was saved with"""
+
+        with open(os.path.join(directory, "engine.json")) as file:
+            return json.load(file)["metadata"]
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Load an engine saved with `save`. With `mmap` the arrays are memory
+        mapped read-only, so processes loading the same files share their pages
+        """
+
+        with open(os.path.join(directory, "engine.json")) as file:
+            config = json.load(file)
+        config.pop("metadata")
+
+        arrays = dict(
+            (
+                name,
+                np.load(
+                    os.path.join(directory, f"{name}.npy"),
+                    mmap_mode="r" if mmap else None,
+                ),
+            )
+            for name in ENGINE_ARRAYS
+        )
+        return cls(**arrays, **config)
+
+    ######################################
+    ##           SCORING
+    ######################################
+
+    def analyze(self, content):
+        """Tokens of a content, as the word analyzer of the vectorizer makes them"""
+
+        if self.lowercase:
+            content = content.lower()
+        tokens = self._tokenize(content)
+
+        low, high = self.ngram_range
+        if high == 1:
+            return tokens
+
+        ngrams = tokens if low == 1 else []
+        for size in range(max(low, 2), high + 1):
+            ngrams += [
+                " ".join(tokens[start : start + size])
+                for start in range(len(tokens) - size + 1)
+            ]
+        return ngrams
+
+    def vectorize(self, contents):
+        """
+        Term frequencies of `contents` as a CSR matrix over the vocabulary,
+        tokens outside of it being dropped
+        """
+
+        indptr = [0]
+        indices = []
+        data = []
+
+        for content in contents:
+            counts = {}
+            for token in self.analyze(content):
+                index = self.vocabulary.get(token)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+
+            indices.extend(counts.keys())
+            data.extend(counts.values())
+            indptr.append(len(indices))
+
+        data = np.asarray(data, dtype=np.float64)
+        if self.sublinear_tf:
+            data = np.log(data) + 1
+
+        return csr_matrix(
+            (data, indices, indptr), shape=(len(contents), len(self.vocabulary))
+        )
+
+    def _get_norms(self, counts):
+        """Norm of each tfidf row, rows without known tokens getting 1"""
+
+        if self.norm is None:
+            return np.ones(counts.shape[0])
+
+        weighted = counts.multiply(self.idf).tocsr()
+        if self.norm == "l2":
+            norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)))
+        else:
+            norms = np.asarray(abs(weighted).sum(axis=1))
+
+        norms = norms.ravel()
+        norms[norms == 0] = 1
+        return norms
+
+    def predict_proba(self, contents):
+        """
+        Positive class probability of each content for both models, as an
+        array of `(logreg, bayes)` rows
+        """
+
+        counts = self.vectorize(contents)
+        log_odds = (counts @ self.weights) / self._get_norms(counts)[:, None]
+        return 1 / (1 + np.exp(-(log_odds + self.bias)))
+
+    def score(self, contents):
+        """Sentiment index of each content, the mean of both model probabilities"""
+
+        if not contents:
+            return np.empty(0)
+
+        return self.predict_proba(contents).mean(axis=1)
@@ -0,0 +1,117 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from .models import SentimentFeedback
+from .registry import CURRENT_FILE, VERSIONS_DIR, activate_version
+
+# downvotes a post needs, more than its upvotes, before it is labeled negative
+SENTIMENT_DOWNVOTE_THRESHOLD = 3
+
+# weight of a label when the online model is updated, downvotes say less about
+# the sentiment of a content than a moderator does
+SENTIMENT_FEEDBACK_WEIGHTS = {
+    SentimentFeedback.SourceChoices.MODERATOR: 1.0,
+    SentimentFeedback.SourceChoices.DOWNVOTES: 0.5,
+}
+
+# labels applied to the online model together
+SENTIMENT_FEEDBACK_BATCH_SIZE = 64
+
+
+def record_sentiment_feedback(instance, label, source):
+    """
+    Label the sentiment of a buzz, rebuzz or comment. A newer label of the same
+    source replaces the older one and is applied to the model again
+    """
+
+    feedback, _ = SentimentFeedback.objects.update_or_create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.id,
+        source=source,
+        defaults=dict(
+            content=instance.content or "", label=label, applied_version=None
+        ),
+    )
+    return feedback
+
+
+def record_downvote_feedback(instance, interaction):
+    """
+    Label a post negative once enough users downvoted it, and more of them
+    than upvoted it. Posts are labeled once from their downvotes
+    """
+
+    downvotes = len(interaction.downvotes)
+    if downvotes < SENTIMENT_DOWNVOTE_THRESHOLD or downvotes <= len(
+        interaction.upvotes
+    ):
+        return None
+
+    SentimentFeedback.objects.bulk_create(
+        [
+            SentimentFeedback(
+                content_type=ContentType.objects.get_for_model(instance),
+                object_id=instance.id,
+                content=instance.content or "",
+                label=SentimentFeedback.LabelChoices.NEGATIVE,
+                source=SentimentFeedback.SourceChoices.DOWNVOTES,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def apply_sentiment_feedback(
+    batch_size=SENTIMENT_FEEDBACK_BATCH_SIZE,
+    limit=None,
+    versions_dir=VERSIONS_DIR,
+    current_file=CURRENT_FILE,
+):
+    """
+    Update the active online model from the labels not applied yet, a batch at
+    a time, and publish the result as the new active version.
+
+    Every batch is scored before the model learns from it, giving the accuracy
+    of the previous model on unseen labels. Returns the new version and its
+    metrics, or None when there were no labels to apply.
+    """
+
+    from .online import OnlineSentimentModel
+
+    feedback = SentimentFeedback.objects.filter(applied_version__isnull=True)
+    rows = list(feedback.values_list("id", "content", "label", "source")[:limit])
+    if not rows:
+        return None
+
+    model = OnlineSentimentModel.load_active(versions_dir, current_file)
+
+    correct = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        contents = [row[1] for row in batch]
+        labels = [row[2] for row in batch]
+
+        correct += int(((model.score(contents) >= 0.5) == labels).sum())
+        model.partial_fit(
+            contents,
+            labels,
+            sample_weight=[SENTIMENT_FEEDBACK_WEIGHTS[row[3]] for row in batch],
+        )
+
+    metrics = dict(feedback_rows=len(rows), progressive_accuracy=correct / len(rows))
+
+    with transaction.atomic():
+        version = model.save(versions_dir, metrics=metrics)
+        # labels recorded again since they were read stay pending
+        for start in range(0, len(rows), batch_size):
+            unchanged = Q()
+            for feedbackid, content, label, _ in rows[start : start + batch_size]:
+                unchanged |= Q(id=feedbackid, content=content, label=label)
+            SentimentFeedback.objects.filter(
+                unchanged, applied_version__isnull=True
+            ).update(applied_version=version)
+        # published last, if it fails the labels are applied again next time
+        activate_version(version, current_file, versions_dir)
+
+    return version, metrics
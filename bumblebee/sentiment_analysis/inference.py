@@ -0,0 +1,322 @@
+import json
+import os
+import queue
+import socket
+import socketserver
+import stat
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+# socket the `serve_sentiment` command listens on, unless the
+# `SENTIMENT_INFERENCE_SOCKET` setting names another one. It is kept in the
+# private runtime directory of the user, or in a directory of the temp
+# directory only this user can enter, never directly in the shared temp
+# directory, where another user could listen on it first
+INFERENCE_SOCKET_NAME = "bumblebee-sentiment.sock"
+
+# requests scored together, and milliseconds the first one waits for others
+INFERENCE_MAX_REQUESTS = 64
+INFERENCE_MAX_WAIT_MS = 5
+
+# seconds a client waits for its scores before scoring in process
+INFERENCE_TIMEOUT = 30
+
+# messages are a 4 byte big endian length followed by as many bytes of json
+HEADER = struct.Struct("!I")
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+def get_inference_socket():
+    """Path of the inference server socket"""
+
+    path = getattr(settings, "SENTIMENT_INFERENCE_SOCKET", None)
+    if path:
+        return path
+
+    directory = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        tempfile.gettempdir(), f"bumblebee-{os.getuid()}"
+    )
+    return os.path.join(directory, INFERENCE_SOCKET_NAME)
+
+
+def make_private_directory(path):
+    """
+    Create the directory of a socket only its user can enter, or check an
+    existing one is. Raises PermissionError otherwise
+    """
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(
+            f"{directory} must be owned by this user and private to it (mode 700)"
+        )
+
+
+def is_trusted_socket(path):
+    """Whether a path is a socket owned by this user"""
+
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+######################################
+##           PROTOCOL
+######################################
+
+
+def send_message(connection, message):
+    data = json.dumps(message).encode()
+    connection.sendall(HEADER.pack(len(data)) + data)
+
+
+def _receive_exactly(connection, size):
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 1024 * 1024))
+        if not chunk:
+            raise ConnectionError("Sentiment inference connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def receive_message(connection):
+    """Next message of a connection, None once the peer closed it"""
+
+    header = connection.recv(HEADER.size, socket.MSG_WAITALL)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ConnectionError("Sentiment inference connection closed")
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Sentiment inference message of {size} bytes is too large")
+    return json.loads(_receive_exactly(connection, size))
+
+
+######################################
+##           SERVER
+######################################
+
+
+class _Request:
+    def __init__(self, contents):
+        self.contents = contents
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Answers the requests of one client connection, one at a time"""
+
+    def handle(self):
+        while True:
+            try:
+                message = receive_message(self.request)
+            except (OSError, ValueError):
+                return
+            if message is None:
+                return
+
+            contents = message.get("contents")
+            if not isinstance(contents, list):
+                send_message(self.request, dict(error="`contents` must be a list"))
+                continue
+
+            request = _Request([str(content) for content in contents])
+            self.server.requests.put(request)
+            request.done.wait()
+
+            send_message(
+                self.request,
+                dict(error=request.error) if request.error else request.result,
+            )
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Scores contents for other processes over a unix domain socket, so the
+    models are loaded by this process only.
+
+    Each client connection is read by its own thread, which queues its
+    requests. A single batching thread takes the first queued request, waits
+    up to `max_wait_ms` for at most `max_requests - 1` others, and scores the
+    contents of all of them with one call of `score`. Under load many small
+    requests share a model call, an idle server answers after `max_wait_ms`.
+
+    `score(contents)` returns the version of the models and the sentiment and
+    textblob values of the contents.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path,
+        score,
+        max_requests=INFERENCE_MAX_REQUESTS,
+        max_wait_ms=INFERENCE_MAX_WAIT_MS,
+    ):
+        self.score = score
+        self.max_requests = max_requests
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.stats = dict(requests=0, batches=0, contents=0)
+
+        make_private_directory(path)
+
+        # a socket left by a server which did not stop cleanly
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+
+        self._batcher = threading.Thread(target=self._run_batches, daemon=True)
+        self._batcher.start()
+
+    def _collect(self):
+        """The next batch of requests, blocking until there is one"""
+
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_requests:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_batches(self):
+        while True:
+            batch = self._collect()
+            contents = [content for request in batch for content in request.contents]
+
+            try:
+                version, sentiment_values, textblob_values = self.score(contents)
+            except Exception as error:
+                for request in batch:
+                    request.error = f"{type(error).__name__}: {error}"
+                    request.done.set()
+                continue
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["contents"] += len(contents)
+
+            position = 0
+            for request in batch:
+                end = position + len(request.contents)
+                request.result = dict(
+                    version=version,
+                    sentiment_values=[float(v) for v in sentiment_values[position:end]],
+                    textblob_values=[float(v) for v in textblob_values[position:end]],
+                )
+                position = end
+                request.done.set()
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+######################################
+##           CLIENT
+######################################
+
+
+class InferenceClient:
+    """
+    Scores contents through the inference server, keeping a connection per
+    thread. Returns None instead of scores whenever the server is not running,
+    fails or is not run by this user, so callers score in process instead.
+    """
+
+    def __init__(self, path=None, timeout=INFERENCE_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _get_path(self):
+        return self.path or get_inference_socket()
+
+    def _connect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self._get_path())
+                self._check_peer(connection)
+            except OSError:
+                connection.close()
+                raise
+            self._local.connection = connection
+        return connection
+
+    def _check_peer(self, connection):
+        """Raise unless the server process runs as this user, where it is known"""
+
+        if not hasattr(socket, "SO_PEERCRED"):
+            return
+
+        credentials = connection.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+        )
+        _, uid, _ = struct.unpack("3i", credentials)
+        if uid != os.getuid():
+            raise PermissionError(f"Sentiment inference server runs as user {uid}")
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            self._local.connection = None
+            connection.close()
+
+    def score(self, contents):
+        """
+        `(version, sentiment_values, textblob_values)` of contents as the server
+        scored them, None when they could not be scored by it
+        """
+
+        # scores of a socket another user could have bound are never trusted
+        if not is_trusted_socket(self._get_path()):
+            self.close()
+            return None
+
+        try:
+            connection = self._connect()
+            send_message(connection, dict(contents=list(contents)))
+            response = receive_message(connection)
+        except (OSError, ValueError):
+            # the server stopped or timed out, the next call connects again
+            self.close()
+            return None
+
+        if response is None or "error" in response:
+            self.close()
+            return None
+        return (
+            response["version"],
+            response["sentiment_values"],
+            response["textblob_values"],
+        )
+
+
+inference_client = InferenceClient()
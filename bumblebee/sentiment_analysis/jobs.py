@@ -0,0 +1,136 @@
+import logging
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F
+
+from .aggregates import get_sentiment_rows, update_sentiment_aggregates
+from .models import SentimentJob
+from .signals import sentiment_scored_signal
+from .utils import calculate_versioned_sentiment_values
+
+logger = logging.getLogger(__name__)
+
+# number of jobs claimed and scored together by a worker
+SENTIMENT_JOB_BATCH_SIZE = 100
+
+# fields written when a content is scored
+SENTIMENT_FIELDS = ["sentiment_value", "textblob_value", "sentiment_version"]
+
+# jobs failing this many times are dropped, their content stays unscored
+SENTIMENT_JOB_MAX_ATTEMPTS = 3
+
+
+def enqueue_sentiment_job(instance):
+    """
+    Queue a buzz, rebuzz or comment for sentiment scoring once the current
+    transaction commits
+    """
+
+    content_type = ContentType.objects.get_for_model(instance)
+
+    def enqueue():
+        # a job claimed by a worker is row locked until the worker deletes it,
+        # so the update waits for the worker and, finding the job gone, a new
+        # one is created. A plain insert would conflict with the claimed job
+        # without waiting and the edit would keep the old values
+        jobs = SentimentJob.objects.filter(
+            content_type=content_type, object_id=instance.id
+        )
+        if not jobs.update(attempts=0):
+            SentimentJob.objects.bulk_create(
+                [SentimentJob(content_type=content_type, object_id=instance.id)],
+                ignore_conflicts=True,
+            )
+
+    transaction.on_commit(enqueue)
+
+
+def save_sentiment_values(model, instances):
+    """
+    Write the sentiment fields of instances of a single model, and the change
+    of their values to the thread and author aggregates. Call it inside a
+    transaction
+    """
+
+    rows = get_sentiment_rows(model, [instance.id for instance in instances])
+    model.objects.bulk_update(instances, SENTIMENT_FIELDS)
+
+    update_sentiment_aggregates(
+        (rows[instance.id][0], rows[instance.id][1], instance.sentiment_value)
+        for instance in instances
+        if instance.id in rows
+    )
+
+
+def _score_instances(model, instances):
+    """Set and save the sentiment values of instances of a single model"""
+
+    version, sentiment_values, textblob_values = calculate_versioned_sentiment_values(
+        instance.content for instance in instances
+    )
+
+    for instance, sentiment_value, textblob_value in zip(
+        instances, sentiment_values, textblob_values
+    ):
+        instance.sentiment_value = float(sentiment_value)
+        instance.textblob_value = float(textblob_value)
+        instance.sentiment_version = version
+
+    save_sentiment_values(model, instances)
+
+
+def process_sentiment_jobs(batch_size=SENTIMENT_JOB_BATCH_SIZE):
+    """
+    Claim a batch of queued jobs, score their contents and bulk update the
+    sentiment values
+
+    Claimed rows are locked with `SKIP LOCKED`, so several workers can run
+    side by side without scoring a content twice. Returns the number of jobs
+    taken off the queue.
+    """
+
+    scored = {}
+
+    with transaction.atomic():
+        jobs = list(
+            SentimentJob.objects.select_for_update(skip_locked=True).order_by("id")[
+                :batch_size
+            ]
+        )
+
+        jobs_by_type = {}
+        for job in jobs:
+            jobs_by_type.setdefault(job.content_type_id, []).append(job)
+
+        failed = []
+        for content_type_id, type_jobs in jobs_by_type.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+            # contents deleted since they were queued are skipped
+            instances = list(
+                model.objects.in_bulk([job.object_id for job in type_jobs]).values()
+            )
+
+            try:
+                with transaction.atomic():
+                    _score_instances(model, instances)
+                scored[model] = [instance.id for instance in instances]
+            except Exception:
+                logger.exception("Sentiment scoring of %s failed", model.__name__)
+                failed += type_jobs
+
+        if failed:
+            SentimentJob.objects.filter(id__in=[job.id for job in failed]).update(
+                attempts=F("attempts") + 1
+            )
+
+        SentimentJob.objects.filter(
+            id__in=[job.id for job in jobs if job not in failed]
+        ).delete()
+        SentimentJob.objects.filter(attempts__gte=SENTIMENT_JOB_MAX_ATTEMPTS).delete()
+
+    for model, ids in scored.items():
+        sentiment_scored_signal.send(sender=model, model=model, ids=ids)
+
+    return len(jobs)
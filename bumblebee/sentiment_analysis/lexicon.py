@@ -0,0 +1,334 @@
+import importlib.util
+import os
+import re
+import threading
+from xml.etree import ElementTree
+
+import numpy as np
+
+# negations and the punctuation textblob treats as such, as in `textblob.en`
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+PUNCTUATION = frozenset(".,;:!?()[]{}`''\"@#$^&*+-|=~_")
+
+# emoticon polarities of `textblob._text.EMOTICONS`
+EMOTICONS = {
+    +1.00: ("<3", "♥", ">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD"),
+    +0.75: (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)"),
+    +0.50: (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)"),
+    +0.25: (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)"),
+    +0.05: (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°"),
+    -0.25: (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S"),
+    -0.75: (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/"),
+    -1.00: (":'(", ":'''(", ";'("),
+}
+
+# characters split from the start and end of words, quotes are split everywhere
+_QUOTES = "'\"“”‘’"
+_EDGE = re.escape("".join(sorted(PUNCTUATION)) + _QUOTES)
+_INNER = re.escape(_QUOTES)
+
+# words textblob never splits a period from, as in `textblob._text`
+ABBREVIATIONS = (
+    "Med. Mil. Mr. a. a.m. adj. adv. al. c. cf. comp. conf. def. e.g. ed. esp. "
+    "etc. ex. f. fig. gen. i.e. id. int. l. m. n. n.q. orig. p.m. pl. pred. pres. "
+    "ref. v. vs."
+).split()
+_ABBREVIATION = (
+    r"(?=[A-Za-z][a-z|]*\.)(?:%s|(?:[A-Za-z]\.)+|[A-Z][b|c|d|f|g|h|j|k|l|m|n|p|q|r|s|t|v|w|x|z]+\.)"
+    % (
+        "|".join(
+            re.escape(word) for word in sorted(ABBREVIATIONS, key=len, reverse=True)
+        )
+    )
+)
+
+# one pass over the content gives the tokens of textblob's tokenizer, before
+# they are lowercased and emoticons are merged: abbreviations, words starting
+# with a period, which is never split from their start, ellipses, words before
+# `n't`, other words stripped of the punctuation around them, then any other
+# character
+TOKEN = re.compile(
+    r"%s(?!\.\.)(?=[%s]*(?![^\s%s]))|\.(?:[^\s%s]*[^\s%s])|\.\.\.|[^\s%s]+?(?=n't)"
+    r"|[^\s%s](?:[^\s%s]*[^\s%s])?|\S"
+    % (_ABBREVIATION, _EDGE, _INNER, _INNER, _EDGE, _EDGE, _EDGE, _INNER, _EDGE)
+)
+
+# textblob joins its tokens with spaces and then merges emoticons and sarcasm
+# marks spread over several tokens, eg. ":)great" is split into ": ) great"
+# and read as ":) great"
+SPLIT_EMOTICON = re.compile(
+    r"(%s)($|\s)"
+    % "|".join(
+        r" ?".join(re.escape(character) for character in emoticon)
+        for emoticon in sorted(
+            (emoticon for emoticons in EMOTICONS.values() for emoticon in emoticons),
+            key=len,
+            reverse=True,
+        )
+    )
+)
+SPLIT_SARCASM = re.compile(r"\( ?\! ?\)")
+
+# only contents with two neighbouring characters of an emoticon or sarcasm
+# mark split by a space can be merged, the others skip both substitutions
+SPLIT_PAIR = re.compile(
+    "|".join(
+        sorted(
+            set(
+                re.escape(first) + " " + re.escape(second)
+                for emoticon in [
+                    emoticon
+                    for emoticons in EMOTICONS.values()
+                    for emoticon in emoticons
+                ]
+                + ["(!)"]
+                for first, second in zip(emoticon, emoticon[1:])
+            )
+        )
+    )
+)
+
+# token kinds, besides known words
+UNKNOWN, WORD, NEGATION, EXCLAMATION, SARCASM, EMOTICON = range(6)
+
+
+def _get_lexicon_path():
+    """Path of the pattern sentiment lexicon shipped with textblob"""
+
+    spec = importlib.util.find_spec("textblob")
+    return os.path.join(spec.submodule_search_locations[0], "en", "en-sentiment.xml")
+
+
+def _average(values):
+    return [sum(each) / len(each) for each in zip(*values)]
+
+
+class SentimentLexicon:
+    """
+    The textblob (pattern) polarity analyzer, compiled for batches.
+
+    `TextBlob(content).sentiment.polarity` tokenizes with a dozen regular
+    expressions and looks every token up in a dict of dicts, one content at a
+    time. Here the pattern lexicon is read once into a vocabulary and numpy
+    arrays of polarity, intensity and whether a word modifies the next one,
+    and a batch is tokenized by a single regex and looked up in one pass. Only
+    contents with an emoticon split over several tokens, eg. ":)great", take
+    a second pass merging it as textblob does.
+
+    Contents without modifiers ("very"), negations ("not"), exclamation marks
+    or emoticons are scored by numpy alone, as the mean polarity of their known
+    words. The others go through textblob's rules, on the compiled arrays:
+
+        "very good"     polarity of "good" times the intensity of "very"
+        "not good"      half of the polarity of "good", negated
+        "good!"         polarity of "good" times 1.25
+        ":)"            polarity of the emoticon
+
+    Like textblob, "isn't" is split into "is n ' t", so only "no", "not" and
+    "never" negate.
+
+    Only the lexicon file is read, textblob and nltk are never imported.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or _get_lexicon_path()
+
+        words = self._read_words(self.path)
+        # emoticons which are words never count, as in textblob
+        emoticons = dict(
+            (emoticon.lower(), p)
+            for p, emoticons in EMOTICONS.items()
+            for emoticon in emoticons
+            if not emoticon.isalpha()
+        )
+        special = (
+            [(word, NEGATION) for word in NEGATIONS if word not in words]
+            + [("!", EXCLAMATION), ("(!)", SARCASM)]
+            + [(emoticon, EMOTICON) for emoticon in emoticons]
+        )
+
+        self.vocabulary = {}
+        polarity, intensity, modifier, kind = [], [], [], []
+
+        def add(token, token_kind, p=0.0, i=1.0, is_modifier=False):
+            if token in self.vocabulary:
+                return
+            self.vocabulary[token] = len(polarity)
+            polarity.append(p)
+            intensity.append(i)
+            modifier.append(is_modifier)
+            kind.append(token_kind)
+
+        for word, (p, i, is_modifier) in words.items():
+            add(word, WORD, p, i, is_modifier)
+        for token, token_kind in special:
+            add(token, token_kind, emoticons.get(token, 0.0))
+
+        self.polarity = np.array(polarity)
+        self.intensity = np.array(intensity)
+        self.modifier = np.array(modifier)
+        self.kind = np.array(kind, dtype=np.int8)
+
+        # tokens needing the sequential rules
+        self.special = self.modifier | (self.kind > WORD)
+
+        # the rules walk tokens one by one, python lists index faster there
+        self._entries = list(zip(polarity, intensity, modifier, kind))
+
+    @staticmethod
+    def _read_words(path):
+        """
+        `{word: (polarity, intensity, is_modifier)}` of the lexicon, averaged
+        over the senses of each word as `textblob._text.Sentiment.load` does
+        """
+
+        senses = {}
+        for element in ElementTree.parse(path).getroot().findall("word"):
+            word = element.attrib.get("form")
+            if word:
+                senses.setdefault(word, {}).setdefault(
+                    element.attrib.get("pos"), []
+                ).append(
+                    (
+                        float(element.attrib.get("polarity", 0.0)),
+                        float(element.attrib.get("intensity", 1.0)),
+                    )
+                )
+
+        words = {}
+        for word, tags in senses.items():
+            tags = dict((tag, _average(values)) for tag, values in tags.items())
+            tags[None] = _average(tags.values())
+            words[word] = tags
+
+        # adjectives as adverbs, "terrible" gives "terribly", see `textblob.en`
+        for word, tags in list(words.items()):
+            if "JJ" in tags:
+                if word.endswith("y"):
+                    word = word[:-1] + "i"
+                if word.endswith("le"):
+                    word = word[:-2]
+                adverb = words.setdefault(word + "ly", {})
+                adverb["RB"] = adverb[None] = tags["JJ"]
+
+        return dict(
+            (word, (tags[None][0], tags[None][1], "RB" in tags))
+            for word, tags in words.items()
+        )
+
+    def tokenize(self, content):
+        tokens = TOKEN.findall(content)
+        if len(tokens) > 1:
+            joined = " ".join(tokens)
+            if SPLIT_PAIR.search(joined):
+                tokens = SPLIT_EMOTICON.sub(
+                    lambda match: match.group(1).replace(" ", "") + match.group(2),
+                    SPLIT_SARCASM.sub("(!)", joined),
+                ).split()
+        return [token.lower() for token in tokens]
+
+    def _score_tokens(self, tokens, ids):
+        """
+        Polarity of a tokenized content following the rules of
+        `textblob._text.Sentiment.assessments`
+        """
+
+        # [polarity, intensity, negated] of every assessed word
+        assessments = []
+        modifier = None
+        negation = None
+
+        for token, index in zip(tokens, ids):
+            if index >= 0:
+                polarity, intensity, is_modifier, kind = self._entries[index]
+            else:
+                kind = UNKNOWN
+
+            if kind == WORD:
+                if modifier is None:
+                    assessments.append([polarity, intensity, False])
+                else:
+                    previous = assessments[-1]
+                    previous[0] = max(-1.0, min(polarity * previous[1], 1.0))
+                    previous[1] = intensity
+                if negation is not None:
+                    assessments[-1][1] = 1.0 / assessments[-1][1]
+                    assessments[-1][2] = True
+
+                modifier = token if is_modifier else None
+                negation = token if token in NEGATIONS else None
+                continue
+
+            if kind == NEGATION:
+                negation = token
+            elif negation and len(token.strip("'")) > 1:
+                negation = None
+
+            # "really not good"
+            if negation is not None and modifier and modifier.endswith("ly"):
+                assessments[-1][2] = True
+                negation = None
+            elif modifier and len(token) > 2:
+                modifier = None
+
+            if kind == EXCLAMATION and assessments:
+                assessments[-1][0] = max(-1.0, min(assessments[-1][0] * 1.25, 1.0))
+            elif kind == SARCASM:
+                assessments.append([0.0, 1.0, False])
+            elif kind == EMOTICON and len(token) <= 5 and token not in PUNCTUATION:
+                assessments.append([polarity, 1.0, False])
+
+        if not assessments:
+            return 0.0
+        return sum(
+            polarity * -0.5 if negated else polarity
+            for polarity, _, negated in assessments
+        ) / len(assessments)
+
+    def score(self, contents):
+        """Polarity of each content, from -1 to 1, as a numpy array"""
+
+        tokens = [self.tokenize(content) for content in contents]
+        get_id = self.vocabulary.get
+        ids = [[get_id(token, -1) for token in each] for each in tokens]
+
+        lengths = np.fromiter((len(each) for each in ids), dtype=np.int64)
+        flat = np.fromiter(
+            (index for each in ids for index in each),
+            dtype=np.int64,
+            count=int(lengths.sum()),
+        )
+        owner = np.repeat(np.arange(len(contents)), lengths)
+
+        known = flat >= 0
+        flat, owner = flat[known], owner[known]
+
+        # mean polarity of the known words of each content
+        words = self.kind[flat] == WORD
+        sums = np.bincount(
+            owner[words], weights=self.polarity[flat[words]], minlength=len(contents)
+        )
+        counts = np.bincount(owner[words], minlength=len(contents))
+        scores = sums / np.maximum(counts, 1)
+
+        # contents with modifiers, negations, marks or emoticons
+        for position in np.unique(owner[self.special[flat]]):
+            scores[position] = self._score_tokens(tokens[position], ids[position])
+
+        return scores
+
+
+_lexicon = None
+_lock = threading.Lock()
+
+
+def get_lexicon():
+    """The compiled lexicon, read on first use"""
+
+    global _lexicon
+
+    if _lexicon is None:
+        with _lock:
+            if _lexicon is None:
+                _lexicon = SentimentLexicon()
+    return _lexicon
@@ -0,0 +1,144 @@
+import contextlib
+import io
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from bumblebee.sentiment_analysis.utils import (
+    calculate_dense_sentiment_index,
+    calculate_sentiment_index,
+    calculate_sentiment_indexes,
+    calculate_textblob_values,
+)
+
+WORDS = (
+    "today is a very nice day i dont really like how this is going love hate "
+    "great terrible movie food friends work happy sad best worst ever again "
+    "honey bee hive garden summer rain"
+).split()
+
+
+def calculate_textblob_polarities(contents):
+    """Textblob polarities the way they were computed, a `TextBlob` each"""
+
+    from textblob import TextBlob
+
+    return [TextBlob(content).sentiment.polarity for content in contents]
+
+
+class Command(BaseCommand):
+    """
+    Compare the dense DataFrame sentiment path with the sparse engine, per call
+    and per batch. Reports median latency and peak allocated memory of a call,
+    and the largest difference between the scores of both paths.
+
+    The `polarity` row compares a `TextBlob` per content with the compiled
+    lexicon scoring the whole batch.
+    """
+
+    help = "Benchmark dense and sparse sentiment inference"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat", type=int, default=200, help="Contents scored per path"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Contents per batch call"
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def _allocations(self, func, args):
+        """Median peak KiB allocated per call"""
+
+        peaks = []
+        for arg in args:
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracemalloc.start()
+                func(arg)
+                peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+                tracemalloc.stop()
+
+        return statistics.median(peaks)
+
+    def _time(self, func, args):
+        """Median milliseconds per call"""
+
+        timings = []
+        for arg in args:
+            # the dense path prints progress
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                func(arg)
+                timings.append((time.perf_counter() - start) * 1000)
+
+        return statistics.median(timings)
+
+    def _report(self, name, dense, sparse, dense_kib, sparse_kib):
+        self.stdout.write(
+            f"{name:>8} {dense:>10.3f} {sparse:>10.3f} {dense / sparse:>8.1f}x"
+            f" {dense_kib:>10.1f} {sparse_kib:>10.1f}"
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        contents = [
+            " ".join(rng.choices(WORDS, k=rng.randint(3, 30)))
+            for i in range(options["repeat"])
+        ]
+        batch_size = options["batch_size"]
+        batches = [
+            contents[start : start + batch_size]
+            for start in range(0, len(contents), batch_size)
+        ]
+
+        # warm up every path
+        self._time(calculate_dense_sentiment_index, contents[:3])
+        self._time(calculate_sentiment_index, contents[:3])
+        calculate_textblob_polarities(contents[:3])
+        calculate_textblob_values(contents[:3])
+
+        self.stdout.write(
+            f"{'':>8} {'dense ms':>10} {'sparse ms':>10} {'speedup':>9}"
+            f" {'dense KiB':>10} {'sparse KiB':>10}"
+        )
+
+        dense = self._time(calculate_dense_sentiment_index, contents)
+        sparse = self._time(calculate_sentiment_index, contents)
+        dense_kib = self._allocations(calculate_dense_sentiment_index, contents[:20])
+        sparse_kib = self._allocations(calculate_sentiment_index, contents[:20])
+        self._report("single", dense, sparse, dense_kib, sparse_kib)
+
+        dense = self._time(calculate_dense_sentiment_index, batches)
+        sparse = self._time(calculate_sentiment_indexes, batches)
+        dense_kib = self._allocations(calculate_dense_sentiment_index, batches[:1])
+        sparse_kib = self._allocations(calculate_sentiment_indexes, batches[:1])
+        self._report("batch", dense, sparse, dense_kib, sparse_kib)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            difference = max(
+                abs(dense_value - sparse_value)
+                for batch in batches
+                for dense_value, sparse_value in zip(
+                    calculate_dense_sentiment_index(batch),
+                    calculate_sentiment_indexes(batch),
+                )
+            )
+        self.stdout.write(f"largest score difference: {difference:.2e}")
+
+        dense = self._time(calculate_textblob_polarities, batches)
+        sparse = self._time(calculate_textblob_values, batches)
+        dense_kib = self._allocations(calculate_textblob_polarities, batches[:1])
+        sparse_kib = self._allocations(calculate_textblob_values, batches[:1])
+        self._report("polarity", dense, sparse, dense_kib, sparse_kib)
+
+        difference = max(
+            abs(textblob_value - lexicon_value)
+            for batch in batches
+            for textblob_value, lexicon_value in zip(
+                calculate_textblob_polarities(batch), calculate_textblob_values(batch)
+            )
+        )
+        self.stdout.write(f"largest polarity difference: {difference:.2e}")
@@ -0,0 +1,270 @@
+import datetime as dt
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from bumblebee.core.management.commands.benchmark_endpoints import percentile
+from bumblebee.sentiment_analysis.lexicon import get_lexicon
+from bumblebee.sentiment_analysis.registry import ModelRegistry
+from bumblebee.sentiment_analysis.trainer import TRAINING_DATA, SentimentAnalysis
+
+from .benchmark_sentiment import WORDS
+
+# loads a registry in a fresh interpreter and scores a content, printing the
+# seconds it took and the peak resident memory of the process
+COLD_START = """
+import json, resource, sys, time
+
+start = time.perf_counter()
+from bumblebee.sentiment_analysis.registry import ModelRegistry
+
+ModelRegistry(sys.argv[1] or None).get_engine().score(["what a lovely day"])
+seconds = time.perf_counter() - start
+
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps(dict(seconds=seconds, max_rss_mib=max_rss / 1024)))
+"""
+
+# metrics which must not drop below the baseline
+REGRESSION_METRICS = [("sentiment", "accuracy"), ("sentiment", "auc")]
+
+
+class Command(BaseCommand):
+    """
+    Benchmark and evaluate the sentiment models, writing the results as json.
+
+    Measures the latency of scoring one content, the throughput at several
+    batch sizes and the peak memory of a batch, for both the sentiment engine
+    and the polarity lexicon. It also measures the cold start of a process,
+    and the accuracy and roc auc on the held-out split of the training data
+    (the rows `train_sentiment_models` did not train on, given the same
+    `--rows`, `--test-size` and `--seed`).
+
+    Runs are compared by keeping their reports. With `--baseline`, the command
+    fails when the accuracy or auc dropped by more than `--tolerance`.
+    """
+
+    help = "Benchmark and evaluate the sentiment models as json"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model-dir", help="Evaluate these models instead of the active ones"
+        )
+        parser.add_argument("--data", default=TRAINING_DATA, help="Training csv")
+        parser.add_argument(
+            "--rows", type=int, default=30000, help="Rows read from the csv"
+        )
+        parser.add_argument("--test-size", type=float, default=0.2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--repeat", type=int, default=200, help="Contents timed one by one"
+        )
+        parser.add_argument(
+            "--batch-sizes",
+            type=int,
+            nargs="+",
+            default=[1, 10, 100, 1000],
+            help="Batch sizes the throughput is measured at",
+        )
+        parser.add_argument("--output", help="Write the json report to a file")
+        parser.add_argument("--baseline", help="Report of an earlier run to compare")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.01,
+            help="Largest accepted drop of accuracy and auc from the baseline",
+        )
+
+    ######################################
+    ##           SPEED
+    ######################################
+
+    def _get_latency(self, score, contents):
+        """Percentiles of the milliseconds taken to score each content alone"""
+
+        timings = []
+        for content in contents:
+            start = time.perf_counter()
+            score([content])
+            timings.append((time.perf_counter() - start) * 1000)
+
+        return dict(
+            p50_ms=round(percentile(timings, 50), 4),
+            p95_ms=round(percentile(timings, 95), 4),
+            p99_ms=round(percentile(timings, 99), 4),
+        )
+
+    def _get_throughput(self, score, contents, batch_size):
+        """Contents scored per second in batches of `batch_size`"""
+
+        # at least a few batches, recycling contents for the larger sizes
+        total = max(len(contents), batch_size * 3)
+        contents = [contents[i % len(contents)] for i in range(total)]
+
+        start = time.perf_counter()
+        for position in range(0, total, batch_size):
+            score(contents[position : position + batch_size])
+        return round(total / (time.perf_counter() - start), 1)
+
+    def _get_peak_memory(self, score, contents):
+        """Peak KiB allocated while scoring a batch"""
+
+        tracemalloc.start()
+        try:
+            score(contents)
+            return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+
+    def _get_cold_start(self, model_dir):
+        result = subprocess.run(
+            [sys.executable, "-c", COLD_START, model_dir or ""],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return dict(
+            (name, round(value, 3)) for name, value in json.loads(result.stdout).items()
+        )
+
+    ######################################
+    ##           ACCURACY
+    ######################################
+
+    def _get_accuracy(self, engine, lexicon, texts, labels):
+        from sklearn.metrics import accuracy_score, roc_auc_score
+
+        scores = dict(
+            sentiment=(engine.score(texts), 0.5),
+            polarity=(lexicon.score(texts), 0.0),
+        )
+        return dict(
+            rows=len(texts),
+            **dict(
+                (
+                    name,
+                    dict(
+                        accuracy=round(
+                            float(accuracy_score(labels, values > threshold)), 4
+                        ),
+                        auc=round(float(roc_auc_score(labels, values)), 4),
+                    ),
+                )
+                for name, (values, threshold) in scores.items()
+            ),
+        )
+
+    def _compare(self, report, baseline, tolerance):
+        """Metrics which dropped more than `tolerance` from the baseline"""
+
+        regressions = []
+        for name, metric in REGRESSION_METRICS:
+            try:
+                before = baseline["accuracy"][name][metric]
+                after = report["accuracy"][name][metric]
+            except (KeyError, TypeError):
+                continue
+            if after < before - tolerance:
+                regressions.append(f"{name} {metric} {before} -> {after}")
+        return regressions
+
+    def handle(self, *args, **options):
+        registry = ModelRegistry(options["model_dir"])
+        lexicon = get_lexicon()
+
+        held_out = None
+        if os.path.exists(options["data"]):
+            trainer = SentimentAnalysis(
+                data_path=options["data"],
+                nrows=options["rows"],
+                test_size=options["test_size"],
+                seed=options["seed"],
+            )
+            _, test_texts, _, test_labels = trainer.split()
+            held_out = (test_texts, test_labels)
+        else:
+            self.stderr.write(f"{options['data']} not found, accuracy is skipped")
+
+        rng = random.Random(options["seed"])
+        contents = (
+            list(held_out[0][: options["repeat"]])
+            if held_out
+            else [
+                " ".join(rng.choices(WORDS, k=rng.randint(3, 30)))
+                for i in range(options["repeat"])
+            ]
+        )
+
+        cold_start = self._get_cold_start(options["model_dir"])
+
+        scorers = dict(sentiment=registry.get_engine().score, polarity=lexicon.score)
+        # warm up, the first call compiles and caches
+        for score in scorers.values():
+            score(contents[:3])
+
+        largest = max(options["batch_sizes"])
+        report = dict(
+            created=dt.datetime.now(dt.timezone.utc).isoformat(),
+            version=registry.get_model_version(),
+            environment=dict(
+                python=platform.python_version(),
+                numpy=np.__version__,
+                machine=platform.machine(),
+                cpus=os.cpu_count(),
+            ),
+            cold_start=cold_start,
+            latency=dict(
+                (name, self._get_latency(score, contents))
+                for name, score in scorers.items()
+            ),
+            throughput=dict(
+                (
+                    name,
+                    dict(
+                        (str(size), self._get_throughput(score, contents, size))
+                        for size in options["batch_sizes"]
+                    ),
+                )
+                for name, score in scorers.items()
+            ),
+            peak_memory_kib=dict(
+                (
+                    name,
+                    self._get_peak_memory(
+                        score, [contents[i % len(contents)] for i in range(largest)]
+                    ),
+                )
+                for name, score in scorers.items()
+            ),
+            accuracy=(
+                self._get_accuracy(registry.get_engine(), lexicon, *held_out)
+                if held_out
+                else None
+            ),
+        )
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        self.stdout.write(output)
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+
+            regressions = self._compare(report, baseline, options["tolerance"])
+            if regressions:
+                raise CommandError(
+                    "Sentiment accuracy regressed: " + ", ".join(regressions)
+                )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.sentiment_analysis.registry import registry
+
+
+class Command(BaseCommand):
+    """
+    Export the sparse scoring engine of the trained models as numpy arrays.
+
+    Meant to be run on deploy, after the model dumps change. Workers then
+    memory map the exported arrays instead of each unpickling the dumps.
+    """
+
+    help = "Export the sentiment scoring engine for memory mapped loading"
+
+    def handle(self, *args, **options):
+        registry.export_engine()
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported sentiment engine to {registry.engine_dir}")
+        )
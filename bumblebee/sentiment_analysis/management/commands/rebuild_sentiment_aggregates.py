@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from bumblebee.sentiment_analysis.aggregates import rebuild_sentiment_aggregates
+
+
+class Command(BaseCommand):
+    """
+    Compute the sentiment aggregates of every buzz thread and author again from
+    the stored sentiment values.
+
+    Aggregates are kept up to date as contents are scored, edited and deleted,
+    this is only needed for values written around them, eg. by a bulk import.
+    """
+
+    help = "Rebuild the sentiment aggregates of buzz threads and authors"
+
+    def handle(self, *args, **options):
+        threads, authors = rebuild_sentiment_aggregates()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt the sentiment of {threads} threads and {authors} authors"
+            )
+        )
@@ -0,0 +1,233 @@
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from bumblebee.buzzes.models import Buzz, Rebuzz
+from bumblebee.comments.models import Comment
+from bumblebee.sentiment_analysis.jobs import save_sentiment_values
+from bumblebee.sentiment_analysis.registry import registry
+from bumblebee.sentiment_analysis.signals import sentiment_scored_signal
+from bumblebee.sentiment_analysis.utils import calculate_versioned_sentiment_values
+
+MODELS = dict(buzz=Buzz, rebuzz=Rebuzz, comment=Comment)
+
+
+class Command(BaseCommand):
+    """
+    Score the sentiment of existing buzzes, rebuzzes and comments again, eg.
+    after the models were retrained or for rows created before scoring.
+
+    Rows are streamed in id order a batch at a time (keyset pagination), scored
+    across a pool of processes and written back with `bulk_update`. The last
+    written id of each model is kept in a checkpoint file, so an interrupted
+    run resumes where it stopped.
+    """
+
+    help = "Backfill and rescore sentiment values of existing content"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models",
+            nargs="+",
+            choices=list(MODELS),
+            default=list(MODELS),
+            help="Kinds of content to rescore",
+        )
+        parser.add_argument(
+            "--only-null",
+            action="store_true",
+            help="Only score rows without a sentiment value",
+        )
+        parser.add_argument(
+            "--model-version",
+            help="Only rescore rows scored by the given model version",
+        )
+        parser.add_argument(
+            "--outdated",
+            action="store_true",
+            help="Only rescore rows not scored by the current model version",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Scoring processes, 1 scores in this process",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default="rescore_sentiment.json",
+            help="File the progress is kept in",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint and start over",
+        )
+
+    ######################################
+    ##           CHECKPOINT
+    ######################################
+
+    def _load_checkpoint(self, filters):
+        if self.restart or not os.path.exists(self.checkpoint_path):
+            return {}
+
+        with open(self.checkpoint_path) as file:
+            checkpoint = json.load(file)
+
+        if checkpoint["filters"] != filters:
+            raise CommandError(
+                f"{self.checkpoint_path} was written with other filters, "
+                "pass --restart to start over"
+            )
+        return checkpoint["last_ids"]
+
+    def _save_checkpoint(self, filters, last_ids):
+        path = f"{self.checkpoint_path}.tmp"
+        with open(path, "w") as file:
+            json.dump(dict(filters=filters, last_ids=last_ids), file)
+        os.replace(path, self.checkpoint_path)
+
+    ######################################
+    ##           SCORING
+    ######################################
+
+    def _get_filter(self, options):
+        rows = Q()
+        if options["only_null"]:
+            rows &= Q(sentiment_value__isnull=True)
+        if options["model_version"]:
+            rows &= Q(sentiment_version=options["model_version"])
+        if options["outdated"]:
+            rows &= ~Q(sentiment_version=self.version) | Q(
+                sentiment_version__isnull=True
+            )
+        return rows
+
+    def _iterate_batches(self, model, rows, last_id, batch_size):
+        """`(ids, contents)` batches of matching rows after `last_id`"""
+
+        while True:
+            batch = list(
+                model.objects.filter(rows, id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "content")[:batch_size]
+            )
+            if not batch:
+                return
+
+            last_id = batch[-1][0]
+            yield [row[0] for row in batch], [row[1] or "" for row in batch]
+
+    def _write(self, model, ids, values):
+        version, sentiment_values, textblob_values = values
+        with transaction.atomic():
+            save_sentiment_values(
+                model,
+                [
+                    model(
+                        id=postid,
+                        sentiment_value=float(sentiment_value),
+                        textblob_value=float(textblob_value),
+                        sentiment_version=version,
+                    )
+                    for postid, sentiment_value, textblob_value in zip(
+                        ids, sentiment_values, textblob_values
+                    )
+                ],
+            )
+        sentiment_scored_signal.send(sender=model, model=model, ids=ids)
+
+    def _rescore(self, name, rows, last_ids, filters, pool, batch_size):
+        model = MODELS[name]
+        last_id = last_ids.get(name, 0)
+
+        total = model.objects.filter(rows, id__gt=last_id).count()
+        done = 0
+        start = time.perf_counter()
+
+        # batches are written in id order, so the checkpoint never skips rows
+        pending = deque()
+
+        def write_oldest():
+            nonlocal done
+
+            ids, result = pending.popleft()
+            values = result.result() if pool else result
+            self._write(model, ids, values)
+
+            done += len(ids)
+            last_ids[name] = ids[-1]
+            self._save_checkpoint(filters, last_ids)
+
+            rate = done / max(time.perf_counter() - start, 1e-9)
+            self.stdout.write(
+                f"{name}: {done}/{total} ({done * 100 // max(total, 1)}%)"
+                f" {rate:.0f} rows/s"
+            )
+
+        for ids, contents in self._iterate_batches(model, rows, last_id, batch_size):
+            if pool:
+                pending.append(
+                    (ids, pool.submit(calculate_versioned_sentiment_values, contents))
+                )
+            else:
+                pending.append((ids, calculate_versioned_sentiment_values(contents)))
+
+            if len(pending) > self.workers:
+                write_oldest()
+
+        while pending:
+            write_oldest()
+
+        return done
+
+    def handle(self, *args, **options):
+        self.version = registry.get_model_version()
+        self.checkpoint_path = options["checkpoint"]
+        self.restart = options["restart"]
+        self.workers = max(options["workers"] or 1, 1)
+
+        filters = dict(
+            only_null=options["only_null"],
+            model_version=options["model_version"],
+            outdated=options["outdated"],
+            version=self.version,
+        )
+        last_ids = self._load_checkpoint(filters)
+        rows = self._get_filter(options)
+
+        pool = None
+        if self.workers > 1:
+            # spawned, not forked: a worker forked after a query would share
+            # the database connection this process has open
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+
+        try:
+            rescored = sum(
+                self._rescore(
+                    name, rows, last_ids, filters, pool, options["batch_size"]
+                )
+                for name in options["models"]
+            )
+        finally:
+            if pool:
+                pool.shutdown()
+
+        # a finished run starts over next time
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(f"Rescored {rescored} rows"))
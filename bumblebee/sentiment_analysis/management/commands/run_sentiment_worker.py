@@ -0,0 +1,60 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from bumblebee.sentiment_analysis.cache import sentiment_cache
+from bumblebee.sentiment_analysis.jobs import (
+    SENTIMENT_JOB_BATCH_SIZE,
+    process_sentiment_jobs,
+)
+
+
+class Command(BaseCommand):
+    """
+    Score queued buzzes, rebuzzes and comments in batches.
+
+    Runs until stopped, polling the queue when it is empty. Several workers can
+    run at once, each claiming different jobs.
+    """
+
+    help = "Process queued sentiment scoring jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SENTIMENT_JOB_BATCH_SIZE,
+            help="Jobs scored together",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before polling an empty queue again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Stop once the queue is empty",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+
+        while True:
+            close_old_connections()
+            count = process_sentiment_jobs(options["batch_size"])
+            processed += count
+
+            if count:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {processed} jobs, score cache {sentiment_cache.stats}"
+            )
+        )
@@ -0,0 +1,69 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from bumblebee.sentiment_analysis.inference import (
+    INFERENCE_MAX_REQUESTS,
+    INFERENCE_MAX_WAIT_MS,
+    InferenceServer,
+    get_inference_socket,
+)
+from bumblebee.sentiment_analysis.utils import score_contents
+
+
+class Command(BaseCommand):
+    """
+    Serve sentiment scoring over a unix domain socket.
+
+    The models are loaded once, by this process, instead of by every web and
+    worker process. While the socket exists, `utils.calculate_sentiment_values`
+    sends the contents it has to score here, and scores them in process when
+    the server is not running, fails or runs other models. Requests arriving
+    together are scored in one batch, see `inference.InferenceServer`.
+    """
+
+    help = "Serve sentiment scoring to other processes over a unix socket"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default=None,
+            help="Socket path, the SENTIMENT_INFERENCE_SOCKET setting by default",
+        )
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=INFERENCE_MAX_REQUESTS,
+            help="Requests scored together",
+        )
+        parser.add_argument(
+            "--max-wait-ms",
+            type=float,
+            default=INFERENCE_MAX_WAIT_MS,
+            help="Milliseconds a request waits for others to be batched with",
+        )
+
+    def handle(self, *args, **options):
+        path = options["socket"] or get_inference_socket()
+
+        # load the models before accepting requests
+        version = score_contents(["what a lovely day"])[0]
+
+        server = InferenceServer(
+            path, score_contents, options["max_requests"], options["max_wait_ms"]
+        )
+        self.stdout.write(f"Serving sentiment version {version} on {path}")
+
+        # stop cleanly, removing the socket, when terminated as well
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Stopped sentiment server, {server.stats}")
+        )
@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from bumblebee.sentiment_analysis.registry import activate_version
+from bumblebee.sentiment_analysis.trainer import TRAINING_DATA, SentimentAnalysis
+
+
+class Command(BaseCommand):
+    """
+    Train the sentiment models into a new version directory.
+
+    The version is only used once activated, with `--activate` or by writing
+    its name to `trained_models/CURRENT`.
+    """
+
+    help = "Train and save a new version of the sentiment models"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--data", default=TRAINING_DATA, help="Training csv")
+        parser.add_argument(
+            "--rows", type=int, default=30000, help="Rows read from the csv"
+        )
+        parser.add_argument("--chunksize", type=int, default=10000)
+        parser.add_argument("--max-features", type=int, default=1000)
+        parser.add_argument(
+            "--C",
+            type=float,
+            default=1e9,
+            help="Inverse regularization of the logistic regression",
+        )
+        parser.add_argument("--test-size", type=float, default=0.2)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--activate",
+            action="store_true",
+            help="Make the trained version the active one",
+        )
+
+    def handle(self, *args, **options):
+        trainer = SentimentAnalysis(
+            data_path=options["data"],
+            nrows=options["rows"],
+            chunksize=options["chunksize"],
+            max_features=options["max_features"],
+            C=options["C"],
+            test_size=options["test_size"],
+            seed=options["seed"],
+        )
+        metrics = trainer.train()
+        version = trainer.save()
+
+        if options["activate"]:
+            activate_version(version)
+
+        self.stdout.write(json.dumps(dict(version=version, **metrics), indent=2))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Trained version {version}"
+                + (" (active)" if options["activate"] else "")
+            )
+        )
@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bumblebee.sentiment_analysis.feedback import (
+    SENTIMENT_FEEDBACK_BATCH_SIZE,
+    apply_sentiment_feedback,
+)
+from bumblebee.sentiment_analysis.online import ONLINE_FEATURES, OnlineSentimentModel
+from bumblebee.sentiment_analysis.registry import activate_version
+from bumblebee.sentiment_analysis.trainer import TRAINING_DATA
+
+
+class Command(BaseCommand):
+    """
+    Update the online sentiment model from the moderator and downvote labels
+    not applied yet, and activate the updated model as a new version.
+
+    Running processes load the new version on their next pointer check, see
+    `registry.ModelRegistry`. With `--bootstrap`, a new online model is first
+    learnt from the training csv and activated.
+    """
+
+    help = "Update the online sentiment model from labeled feedback"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--bootstrap",
+            action="store_true",
+            help="Learn a new online model from the training csv first",
+        )
+        parser.add_argument("--data", default=TRAINING_DATA, help="Training csv")
+        parser.add_argument(
+            "--rows", type=int, default=None, help="Rows read from the csv"
+        )
+        parser.add_argument("--chunksize", type=int, default=10000)
+        parser.add_argument("--n-features", type=int, default=ONLINE_FEATURES)
+        parser.add_argument(
+            "--alpha",
+            type=float,
+            default=1e-5,
+            help="Regularization of the logistic regression",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SENTIMENT_FEEDBACK_BATCH_SIZE,
+            help="Labels learnt from together",
+        )
+        parser.add_argument(
+            "--limit", type=int, default=None, help="Labels applied in this run"
+        )
+
+    def handle(self, *args, **options):
+        if options["bootstrap"]:
+            model = OnlineSentimentModel(
+                n_features=options["n_features"], alpha=options["alpha"]
+            )
+            model.fit_csv(options["data"], options["rows"], options["chunksize"])
+            version = model.save(data=options["data"])
+            activate_version(version)
+
+            self.stdout.write(
+                f"Bootstrapped version {version} from {model.samples} rows"
+            )
+
+        try:
+            result = apply_sentiment_feedback(options["batch_size"], options["limit"])
+        except ValueError as error:
+            raise CommandError(error)
+
+        if result is None:
+            self.stdout.write(self.style.SUCCESS("No new sentiment feedback"))
+            return
+
+        version, metrics = result
+        self.stdout.write(json.dumps(dict(version=version, **metrics), indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Activated version {version}"))
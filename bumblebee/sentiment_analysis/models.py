@@ -1,3 +1,127 @@
+from django.contrib.contenttypes.models import ContentType
 from django.db import models
 
-# Create your models here.
+
+class SentimentJob(models.Model):
+    """
+    A buzz, rebuzz or comment waiting for its sentiment values.
+
+    Jobs are queued once the transaction creating the content commits and are
+    scored in batches by the `run_sentiment_worker` command, which keeps model
+    inference out of the request.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+
+    created_date = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="unique_sentiment_job"
+            )
+        ]
+
+    def __str__(self):
+        return f"Sentiment Job- {self.content_type}:{self.object_id}"
+
+
+class SentimentFeedback(models.Model):
+    """
+    A label of the sentiment of a buzz, rebuzz or comment, given by a
+    moderator or inferred from downvotes.
+
+    The content is copied as it was labeled, the online model is updated from
+    labels not yet applied by the `update_sentiment_model` command, which
+    stamps them with the version they went into.
+    """
+
+    class SourceChoices(models.TextChoices):
+        MODERATOR = "MOD", "Moderator"
+        DOWNVOTES = "DWV", "Downvotes"
+
+    class LabelChoices(models.IntegerChoices):
+        NEGATIVE = 0, "Negative"
+        POSITIVE = 1, "Positive"
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+
+    content = models.TextField()
+    label = models.PositiveSmallIntegerField(choices=LabelChoices.choices)
+    source = models.CharField(max_length=3, choices=SourceChoices.choices)
+
+    created_date = models.DateTimeField(auto_now_add=True)
+    applied_version = models.CharField(max_length=40, null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id", "source"],
+                name="unique_sentiment_feedback",
+            )
+        ]
+
+    def __str__(self):
+        return f"Sentiment Feedback- {self.content_type}:{self.object_id} {self.get_label_display()}"
+
+
+class SentimentAggregate(models.Model):
+    """
+    Running count, sum and sum of squares of scored sentiment values, from
+    which the mean and variance are read without scanning the contents.
+
+    Kept up to date by `aggregates.py` whenever a value is scored, rescored or
+    its content deleted.
+    """
+
+    count = models.PositiveIntegerField(default=0)
+    total = models.FloatField(default=0)
+    total_squares = models.FloatField(default=0)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    @property
+    def variance(self):
+        if not self.count:
+            return None
+        # rounding can leave a tiny negative variance
+        return max(self.total_squares / self.count - self.mean**2, 0.0)
+
+
+class ThreadSentiment(SentimentAggregate):
+    """Sentiment of the comments of a buzz, replies included"""
+
+    buzz = models.OneToOneField(
+        "buzzes.Buzz",
+        related_name="thread_sentiment",
+        primary_key=True,
+        on_delete=models.CASCADE,
+    )
+
+    def __str__(self):
+        return f"Thread Sentiment- {self.buzz_id}: {self.mean} ({self.count})"
+
+
+class AuthorSentiment(SentimentAggregate):
+    """Sentiment of the buzzes, rebuzzes and comments of a user"""
+
+    user = models.OneToOneField(
+        "users.CustomUser",
+        related_name="author_sentiment",
+        primary_key=True,
+        on_delete=models.CASCADE,
+    )
+
+    def __str__(self):
+        return f"Author Sentiment- {self.user_id}: {self.mean} ({self.count})"
@@ -0,0 +1,179 @@
+import datetime as dt
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import dump, load
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import MultinomialNB
+
+from .registry import CURRENT_FILE, VERSIONS_DIR, get_version_dir, read_current_version
+
+# dump of an online version, next to its `metadata.json`
+ONLINE_MODEL_FILE = "OnlineSentimentModel.sav"
+
+# hashed token features, collisions are rare at this size for short posts
+ONLINE_FEATURES = 2**18
+
+CLASSES = np.array([0, 1])
+
+
+class OnlineSentimentModel:
+    """
+    Sentiment model which learns a batch at a time with `partial_fit`, so it
+    can be updated from new labels without training from scratch.
+
+    Contents are vectorized by a `HashingVectorizer`, which has no vocabulary
+    to fit: a token learnt from feedback gets a feature without refitting the
+    vectorizer, and vectorizing needs no state besides its parameters. Like the
+    tfidf models, a logistic regression (`SGDClassifier` with log loss) and a
+    naive bayes model are combined, the sentiment index is the mean of their
+    positive class probabilities.
+    """
+
+    def __init__(self, n_features=ONLINE_FEATURES, alpha=1e-5, seed=0):
+        self.params = dict(n_features=n_features, alpha=alpha, seed=seed)
+
+        # non negative features, naive bayes takes no negative counts
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, alternate_sign=False, norm="l2"
+        )
+        # `log`, the pinned scikit-learn 0.24 has no `log_loss` alias yet
+        self.logreg = SGDClassifier(loss="log", alpha=alpha, random_state=seed)
+        self.bayes = MultinomialNB()
+
+        self.samples = 0
+        self.parent = None
+
+    ######################################
+    ##           LEARNING
+    ######################################
+
+    def partial_fit(self, contents, labels, sample_weight=None):
+        """Update both models from a batch of labeled contents"""
+
+        X = self.vectorizer.transform(contents)
+        Y = np.asarray(labels, dtype=np.int64)
+
+        self.logreg.partial_fit(X, Y, classes=CLASSES, sample_weight=sample_weight)
+        self.bayes.partial_fit(X, Y, classes=CLASSES, sample_weight=sample_weight)
+        self.samples += len(Y)
+        return self
+
+    def fit_csv(self, data_path, nrows=None, chunksize=10000):
+        """
+        Learn from the `text` and `polarity` columns of a training csv a chunk at
+        a time, the whole file is never in memory
+        """
+
+        for chunk in pd.read_csv(
+            data_path,
+            usecols=["polarity", "text"],
+            nrows=nrows,
+            chunksize=chunksize,
+        ):
+            self.partial_fit(
+                chunk.text.fillna("").astype(str).tolist(),
+                (chunk.polarity.to_numpy() > 0).astype(np.int64),
+            )
+        return self
+
+    ######################################
+    ##           SCORING
+    ######################################
+
+    def predict_proba(self, contents):
+        """
+        Positive class probability of each content for both models, as an
+        `(n, 2)` array
+        """
+
+        X = self.vectorizer.transform(contents)
+        return np.column_stack(
+            [self.logreg.predict_proba(X)[:, 1], self.bayes.predict_proba(X)[:, 1]]
+        )
+
+    def score(self, contents):
+        """
+        Sentiment index of each content, from 0 (negative) to 1 (positive), as
+        the scoring engine computes it
+        """
+
+        contents = list(contents)
+        if not contents:
+            return np.empty(0)
+        return self.predict_proba(contents).mean(axis=1)
+
+    ######################################
+    ##           VERSIONS
+    ######################################
+
+    def save(self, versions_dir=VERSIONS_DIR, **metadata):
+        """
+        Write the model and a `metadata.json` to a new version directory.
+        Returns the version name
+        """
+
+        created = dt.datetime.now(dt.timezone.utc)
+        version = (
+            created.strftime("%Y%m%d%H%M%S")
+            + "-"
+            + hashlib.sha1(
+                json.dumps([self.params, self.parent, self.samples]).encode()
+            ).hexdigest()[:8]
+        )
+
+        directory = get_version_dir(version, versions_dir)
+        os.makedirs(directory)
+        dump(self, os.path.join(directory, ONLINE_MODEL_FILE))
+
+        with open(os.path.join(directory, "metadata.json"), "w") as file:
+            json.dump(
+                dict(
+                    version=version,
+                    kind="online",
+                    created=created.isoformat(),
+                    parent=self.parent,
+                    samples=self.samples,
+                    params=self.params,
+                    sklearn=sklearn.__version__,
+                    **metadata,
+                ),
+                file,
+                indent=2,
+            )
+
+        # versions saved from this one descend from it
+        self.parent = version
+        return version
+
+    @staticmethod
+    def load(directory):
+        """Read the model of an online version directory"""
+
+        return load(os.path.join(directory, ONLINE_MODEL_FILE))
+
+    @classmethod
+    def load_active(cls, versions_dir=VERSIONS_DIR, current_file=CURRENT_FILE):
+        """
+        The model of the active version, raising ValueError when it is not an
+        online version
+        """
+
+        version = read_current_version(current_file)
+        directory = get_version_dir(version, versions_dir) if version else None
+        if not directory or not os.path.exists(
+            os.path.join(directory, ONLINE_MODEL_FILE)
+        ):
+            raise ValueError(
+                "The active sentiment model is not an online model, "
+                "bootstrap one with `update_sentiment_model --bootstrap`"
+            )
+
+        model = cls.load(directory)
+        model.parent = version
+        return model
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+module_dir = os.path.dirname(__file__)  # get current directory
+
+# trained model dumps shipped with the app
+MODEL_DIR = os.path.join(module_dir, "notebook/trained_models")
+MODEL_FILES = dict(
+    logreg="LogRegForSentimentAnalysis.sav",
+    bayes="NaiBayesForSentimentAnalysis.sav",
+    vectorizer="DfFittedVectorizer.sav",
+)
+
+# versions written by the `train_sentiment_models` command, each in its own
+# directory with the dumps, a `metadata.json` and an exported engine
+VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+
+# names the active version, the shipped dumps are used without it
+CURRENT_FILE = os.path.join(MODEL_DIR, "CURRENT")
+
+# engine exported next to the dumps by the `export_sentiment_engine` command
+ENGINE_DIRNAME = "engine"
+
+# seconds between checks of the active version pointer
+REGISTRY_CHECK_INTERVAL = 5
+
+
+def get_version_dir(version, versions_dir=VERSIONS_DIR):
+    """Directory the artifacts of a trained version are kept in"""
+
+    return os.path.join(versions_dir, version)
+
+
+def read_current_version(current_file=CURRENT_FILE):
+    """Name of the active trained version, None for the shipped dumps"""
+
+    try:
+        with open(current_file) as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def activate_version(version, current_file=CURRENT_FILE, versions_dir=VERSIONS_DIR):
+    """
+    Make a trained version the active one. The pointer file is replaced
+    atomically, so readers see either the old or the new version
+    """
+
+    directory = get_version_dir(version, versions_dir)
+    if not os.path.exists(os.path.join(directory, "metadata.json")):
+        raise ValueError(f"Sentiment model version `{version}` does not exist")
+
+    path = f"{current_file}.tmp"
+    with open(path, "w") as file:
+        file.write(version)
+    os.replace(path, current_file)
+
+
+class ModelRegistry:
+    """
+    Loads the trained sentiment models on first use instead of on import, so
+    processes which never score anything (migrations, shells, most requests)
+    skip pandas, scikit-learn and the dumps entirely.
+
+    The scoring engine is read from the `engine` directory next to the dumps
+    when it was exported from them, its arrays memory mapped so every worker on
+    a host shares one copy of the pages. Otherwise it is built from the joblib
+    dumps.
+
+    Models are read from the active trained version (see `CURRENT_FILE`), or
+    from `model_dir` when one is given or no version was activated. The pointer
+    is checked again every `check_interval` seconds, once another version was
+    activated the models are loaded from it on next use, without a restart.
+    Online versions (see `online.py`) are scored by their own model.
+    """
+
+    def __init__(
+        self,
+        model_dir=None,
+        mmap=True,
+        current_file=CURRENT_FILE,
+        versions_dir=VERSIONS_DIR,
+        check_interval=REGISTRY_CHECK_INTERVAL,
+    ):
+        self.fixed_model_dir = model_dir
+        self.mmap = mmap
+        self.current_file = current_file
+        self.versions_dir = versions_dir
+        self.check_interval = check_interval
+
+        # reentrant, the engine is built from the models under the same lock
+        self._lock = threading.RLock()
+        self._models = None
+        self._engine = None
+        self._version = None
+        self._model_dir = None
+        self._current = None
+        self._checked = None
+
+    @property
+    def model_dir(self):
+        """Directory the models are loaded from"""
+
+        if self._model_dir is None:
+            with self._lock:
+                if self._model_dir is None:
+                    self._model_dir = self._resolve_model_dir()
+        return self._model_dir
+
+    @property
+    def engine_dir(self):
+        return os.path.join(self.model_dir, ENGINE_DIRNAME)
+
+    def _resolve_model_dir(self):
+        if self.fixed_model_dir:
+            return self.fixed_model_dir
+
+        self._current = read_current_version(self.current_file)
+        self._checked = time.monotonic()
+        if self._current:
+            return get_version_dir(self._current, self.versions_dir)
+        return MODEL_DIR
+
+    def refresh(self, force=False):
+        """
+        Forget the loaded models when another version was activated since they
+        were loaded. The pointer is read at most every `check_interval` seconds
+        unless `force` is given. Returns whether the models were dropped
+        """
+
+        if self.fixed_model_dir or self._checked is None:
+            return False
+        if not force and time.monotonic() - self._checked < self.check_interval:
+            return False
+
+        with self._lock:
+            current = read_current_version(self.current_file)
+            self._checked = time.monotonic()
+            if current == self._current:
+                return False
+
+            self.reset()
+            return True
+
+    def get_metadata(self):
+        """Metadata of a trained version, empty for the shipped dumps"""
+
+        try:
+            with open(os.path.join(self.model_dir, "metadata.json")) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def get_model_checksum(self):
+        """Checksum of the joblib dumps, identifying the trained model version"""
+
+        digest = hashlib.sha1()
+        for name in sorted(MODEL_FILES):
+            with open(os.path.join(self.model_dir, MODEL_FILES[name]), "rb") as file:
+                digest.update(file.read())
+        return digest.hexdigest()
+
+    def get_model_version(self):
+        """
+        Version of the loaded models, scores cached under another version are
+        not reused
+        """
+
+        self.refresh()
+        if self._version is None:
+            with self._lock:
+                if self._version is None:
+                    self._version = (
+                        self.get_metadata().get("version") or self.get_model_checksum()
+                    )
+        return self._version
+
+    def get_models(self):
+        """The fitted `logreg`, `bayes` and `vectorizer` as a dict"""
+
+        self.refresh()
+        if self._models is None:
+            with self._lock:
+                if self._models is None:
+                    from joblib import load
+
+                    self._models = dict(
+                        (name, load(os.path.join(self.model_dir, filename)))
+                        for name, filename in MODEL_FILES.items()
+                    )
+        return self._models
+
+    def _load_engine(self):
+        from .engine import SentimentEngine
+
+        if self.get_metadata().get("kind") == "online":
+            from .online import OnlineSentimentModel
+
+            return OnlineSentimentModel.load(self.model_dir)
+
+        if os.path.exists(os.path.join(self.engine_dir, "engine.json")):
+            metadata = SentimentEngine.read_metadata(self.engine_dir)
+            if metadata.get("checksum") == self.get_model_checksum():
+                return SentimentEngine.load(self.engine_dir, mmap=self.mmap)
+
+        return SentimentEngine.from_models(**self.get_models())
+
+    def get_engine(self):
+        """The sparse scoring engine"""
+
+        self.refresh()
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    self._engine = self._load_engine()
+        return self._engine
+
+    def export_engine(self):
+        """Save an engine built from the dumps to `engine_dir`"""
+
+        from .engine import SentimentEngine
+
+        engine = SentimentEngine.from_models(**self.get_models())
+        engine.save(self.engine_dir, checksum=self.get_model_checksum())
+        return engine
+
+    def reset(self):
+        """Forget loaded models, they are loaded again on next use"""
+
+        with self._lock:
+            self._models = None
+            self._engine = None
+            self._version = None
+            self._model_dir = None
+            self._current = None
+            self._checked = None
+
+
+registry = ModelRegistry()
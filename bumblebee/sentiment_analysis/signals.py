@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+#  sentiment scored signal instance, sentiment values of `model` rows `ids` were updated
+sentiment_scored_signal = Signal(providing_args=["model", "ids"])
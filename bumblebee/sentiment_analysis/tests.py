@@ -1,6 +1,80 @@
+import contextlib
+import io
+import itertools
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
-from .utils import calculate_sensitivity_index
+from bumblebee.buzzes.models import Buzz
+from bumblebee.users.models import CustomUser
+
+from .cache import SentimentCache
+from .engine import SentimentEngine
+from .inference import InferenceClient, InferenceServer, inference_client
+from .management.commands.rescore_sentiment import Command as RescoreCommand
+from .online import OnlineSentimentModel
+from .registry import (
+    ENGINE_DIRNAME,
+    MODEL_DIR,
+    MODEL_FILES,
+    ModelRegistry,
+    activate_version,
+    registry,
+)
+from .trainer import SentimentAnalysis
+from .utils import (
+    calculate_dense_sentiment_index,
+    calculate_sentiment_index,
+    calculate_sentiment_indexes,
+    calculate_versioned_sentiment_values,
+    calculate_textblob_values,
+    score_contents,
+)
+
+# posts covering the lexicon rules: negations, modifiers, exclamation marks,
+# emoticons, contractions, sarcasm and unknown words, and the tokenizer:
+# emoticons glued to or split around words, leading periods, abbreviations
+LEXICON_CORPUS = [
+    "Today is a very nice day",
+    "I dont really like how this is going.",
+    "This is not good at all",
+    "not a bad movie, honestly",
+    "Really not good...",
+    "what an AMAZING concert!!!",
+    "worst. service. ever!",
+    "I can't believe how terrible the traffic was :(",
+    "love this song <3",
+    "new phone :D best purchase this year",
+    "never been so happy ;)",
+    "great, another monday (!)",
+    "extremely disappointing and incredibly slow",
+    "isn't it wonderful?",
+    "meh",
+    "",
+    "The food was okay, the service was awful and the view was beautiful",
+    "so so so tired",
+    '"perfect" weather for a picnic... not',
+    "well-known band, horribly mixed sound",
+    ":)great",
+    "=(confusedly appealingly",
+    "so good : ) see you",
+    "...really nice",
+    "best gig ever :p.",
+    "Mr. Bean was hilarious",
+    "great( ! )",
+]
 
 
 # Create your tests here.
@@ -11,7 +85,453 @@ class SensitivityAnalysisTest(TestCase):
     test_string2 = "I dont really like how this is going."
 
     def test_get_sensitivity_index(self):
-        test1 = calculate_sensitivity_index(self.test_string)
-        test2 = calculate_sensitivity_index(self.test_string2)
+        test1 = calculate_sentiment_index(self.test_string)
+        test2 = calculate_sentiment_index(self.test_string2)
         self.assertGreaterEqual(test1, 0.5, "Positive test pass")
         self.assertLessEqual(test2, 0.5, "Negative test pass")
+
+
+class SentimentLexiconTest(TestCase):
+    """ """
+
+    def test_lexicon_matches_textblob(self):
+        from textblob import TextBlob
+
+        values = calculate_textblob_values(LEXICON_CORPUS)
+
+        for content, value in zip(LEXICON_CORPUS, values):
+            self.assertAlmostEqual(
+                value, TextBlob(content).sentiment.polarity, places=7, msg=content
+            )
+
+
+class SentimentEngineTest(TestCase):
+    """ """
+
+    def test_engine_matches_models(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            dense = calculate_dense_sentiment_index(LEXICON_CORPUS)
+
+        for expected, value in zip(dense, calculate_sentiment_indexes(LEXICON_CORPUS)):
+            self.assertAlmostEqual(value, expected, places=9)
+
+    def test_sparse_probabilities_match_models(self):
+        models = registry.get_models()
+        X = models["vectorizer"].transform(LEXICON_CORPUS)
+
+        probabilities = SentimentEngine.from_models(**models).predict_proba(
+            LEXICON_CORPUS
+        )
+
+        np.testing.assert_allclose(
+            probabilities[:, 0], models["logreg"].predict_proba(X)[:, 1], atol=1e-9
+        )
+        np.testing.assert_allclose(
+            probabilities[:, 1], models["bayes"].predict_proba(X)[:, 1], atol=1e-9
+        )
+
+    def test_saved_engine_is_memory_mapped(self):
+        engine = SentimentEngine.from_models(**registry.get_models())
+
+        with tempfile.TemporaryDirectory() as directory:
+            engine.save(directory, checksum="abc")
+            loaded = SentimentEngine.load(directory, mmap=True)
+
+            self.assertEqual(
+                SentimentEngine.read_metadata(directory), dict(checksum="abc")
+            )
+            self.assertIsInstance(loaded.weights, np.memmap)
+            self.assertEqual(loaded.vocabulary, engine.vocabulary)
+            self.assertEqual(
+                list(loaded.score(LEXICON_CORPUS)), list(engine.score(LEXICON_CORPUS))
+            )
+
+
+class SentimentBatchTest(TestCase):
+    """ """
+
+    def test_empty_input(self):
+        self.assertEqual(len(calculate_sentiment_indexes([])), 0)
+        self.assertEqual(len(calculate_sentiment_indexes(iter([]))), 0)
+
+        version, sentiment_values, textblob_values = score_contents([])
+        self.assertEqual(version, registry.get_model_version())
+        self.assertEqual((len(sentiment_values), len(textblob_values)), (0, 0))
+
+    def test_chunks_keep_the_input_order(self):
+        engine = registry.get_engine()
+        expected = [calculate_sentiment_index(content) for content in LEXICON_CORPUS]
+
+        with mock.patch.object(engine, "score", wraps=engine.score) as score:
+            values = calculate_sentiment_indexes(iter(LEXICON_CORPUS), chunk_size=4)
+
+        self.assertEqual(score.call_count, math.ceil(len(LEXICON_CORPUS) / 4))
+        self.assertEqual(len(values), len(LEXICON_CORPUS))
+        for content, value, single in zip(LEXICON_CORPUS, values, expected):
+            self.assertAlmostEqual(value, single, places=12, msg=content)
+
+        version, sentiment_values, textblob_values = score_contents(LEXICON_CORPUS)
+        np.testing.assert_allclose(sentiment_values, values, atol=1e-12)
+        np.testing.assert_allclose(
+            textblob_values, calculate_textblob_values(LEXICON_CORPUS)
+        )
+
+
+class ModelRegistryTest(TestCase):
+    """ """
+
+    def create_version(self, versions_dir, version):
+        """A trained version directory holding the shipped dumps"""
+
+        directory = os.path.join(versions_dir, version)
+        os.makedirs(directory)
+        for filename in MODEL_FILES.values():
+            shutil.copy(os.path.join(MODEL_DIR, filename), directory)
+        with open(os.path.join(directory, "metadata.json"), "w") as file:
+            json.dump(dict(version=version), file)
+        return directory
+
+    def test_loading_the_app_skips_the_models(self):
+        # a fresh interpreter, with the settings of this one
+        code = (
+            "import sys, django; django.setup();"
+            "from django.urls import get_resolver; get_resolver().url_patterns;"
+            "import bumblebee.sentiment_analysis.utils;"
+            "print(sorted(set(sys.modules) & {'sklearn', 'pandas', 'joblib'}))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        self.assertEqual(output.splitlines()[-1], "[]")
+
+    def test_activated_version_is_loaded_after_refresh(self):
+        with tempfile.TemporaryDirectory() as versions_dir:
+            current_file = os.path.join(versions_dir, "CURRENT")
+            for version in ["v1", "v2"]:
+                self.create_version(versions_dir, version)
+            activate_version("v1", current_file, versions_dir)
+
+            registry = ModelRegistry(
+                current_file=current_file, versions_dir=versions_dir
+            )
+            models = registry.get_models()
+            self.assertEqual(registry.get_model_version(), "v1")
+
+            activate_version("v2", current_file, versions_dir)
+            self.assertTrue(registry.refresh(force=True))
+
+            self.assertEqual(registry.get_model_version(), "v2")
+            self.assertEqual(registry.model_dir, os.path.join(versions_dir, "v2"))
+            self.assertIsNot(registry.get_models(), models)
+
+    def test_stale_engine_is_built_from_models(self):
+        with tempfile.TemporaryDirectory() as versions_dir:
+            directory = self.create_version(versions_dir, "v1")
+            registry = ModelRegistry(model_dir=directory)
+            registry.export_engine()
+
+            with mock.patch.object(
+                SentimentEngine, "load", wraps=SentimentEngine.load
+            ) as load:
+                registry.get_engine()
+                self.assertEqual(load.call_count, 1)
+
+                # the dumps were replaced after the engine was exported
+                SentimentEngine.from_models(**registry.get_models()).save(
+                    registry.engine_dir, checksum="stale"
+                )
+                registry.reset()
+                engine = registry.get_engine()
+                self.assertEqual(load.call_count, 1)
+
+            self.assertEqual(
+                list(engine.score(LEXICON_CORPUS)),
+                list(calculate_sentiment_indexes(LEXICON_CORPUS)),
+            )
+
+
+class SentimentCacheTest(TestCase):
+    """ """
+
+    def test_least_recent_entries_are_evicted(self):
+        cache = SentimentCache(maxsize=2)
+        cache.set_many("v1", {"a": (0.1, 0.0), "b": (0.2, 0.0)})
+        cache.get_many("v1", ["a"])
+        cache.set_many("v1", {"c": (0.3, 0.0)})
+
+        self.assertEqual(set(cache.get_many("v1", ["a", "b", "c"])), {"a", "c"})
+        self.assertEqual(cache.get_many("v2", ["a", "c"]), {})
+
+    def test_scores_are_cached_under_the_version_scoring_them(self):
+        cache = SentimentCache()
+        # another version is activated while the first one is scoring
+        versions = itertools.chain(["v1"], itertools.repeat("v2"))
+
+        with mock.patch(
+            "bumblebee.sentiment_analysis.utils.sentiment_cache", cache
+        ), mock.patch.object(
+            registry, "get_model_version", side_effect=lambda: next(versions)
+        ), mock.patch.object(
+            inference_client, "score", return_value=None
+        ):
+            version = calculate_versioned_sentiment_values(["what a lovely day"])[0]
+
+        # stamped on the contents as the version of their values
+        self.assertEqual(version, "v2")
+        self.assertEqual(
+            list(cache.get_many("v2", ["what a lovely day"])), ["what a lovely day"]
+        )
+
+
+class OnlineSentimentModelTest(TestCase):
+    """ """
+
+    def test_partial_fit_learns_labeled_rows(self):
+        model = OnlineSentimentModel(n_features=2**10)
+        model.partial_fit(["lovely happy day", "awful sad day"], [1, 0])
+        before = model.score(["awful sad day"])[0]
+
+        # weighted as feedback labels are
+        model.partial_fit(
+            ["awful sad day", "awful day", "sad day"],
+            [0, 0, 0],
+            sample_weight=[1.0, 0.5, 0.5],
+        )
+        self.assertEqual(model.samples, 5)
+        self.assertLess(model.score(["awful sad day"])[0], before)
+
+        with tempfile.TemporaryDirectory() as versions_dir:
+            current_file = os.path.join(versions_dir, "CURRENT")
+            activate_version(model.save(versions_dir), current_file, versions_dir)
+
+            engine = ModelRegistry(
+                current_file=current_file, versions_dir=versions_dir
+            ).get_engine()
+            self.assertEqual(
+                list(engine.score(LEXICON_CORPUS)), list(model.score(LEXICON_CORPUS))
+            )
+
+
+class InferenceServerTest(TestCase):
+    """ """
+
+    def test_client_scores_through_server(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sentiment.sock")
+            client = InferenceClient(path)
+            self.assertIsNone(client.score(LEXICON_CORPUS))
+
+            server = InferenceServer(path, score_contents, max_wait_ms=50)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            try:
+                results = [None, None]
+
+                def request(i):
+                    results[i] = InferenceClient(path).score(LEXICON_CORPUS[i::2])
+
+                threads = [threading.Thread(target=request, args=(i,)) for i in (0, 1)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                version, sentiment_values, textblob_values = client.score(
+                    LEXICON_CORPUS
+                )
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            expected = score_contents(LEXICON_CORPUS)
+            self.assertEqual(version, expected[0])
+            self.assertEqual(sentiment_values, list(expected[1]))
+            self.assertEqual(textblob_values, list(expected[2]))
+            self.assertEqual(
+                [result[1] for result in results],
+                [list(expected[1][0::2]), list(expected[1][1::2])],
+            )
+            self.assertEqual(server.stats["requests"], 3)
+
+            # the socket is gone, contents are scored in process again
+            self.assertIsNone(client.score(LEXICON_CORPUS))
+
+    def test_server_and_client_refuse_shared_paths(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sentiment.sock")
+
+            # anything but a socket of this user is not connected to
+            with open(path, "w"):
+                pass
+            self.assertIsNone(InferenceClient(path).score(["hello"]))
+
+            os.chmod(directory, 0o777)
+            with self.assertRaises(PermissionError):
+                InferenceServer(path, score_contents)
+
+
+class RescoreSentimentTest(TestCase):
+    """ """
+
+    def setUp(self):
+        author = CustomUser.objects.create(
+            email="rescore@bumblebee.com",
+            username="rescore",
+            password="123ajkdsa34fana",
+        )
+        self.buzzes = Buzz.objects.filter(
+            id__in=[
+                Buzz.objects.create(author=author, content=f"what a lovely day {i}").id
+                for i in range(3)
+            ]
+        ).order_by("id")
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, "rescore.json")
+
+    def rescore(self, **options):
+        stdout = io.StringIO()
+        options = dict(dict(workers=1, batch_size=1), **options)
+        call_command(
+            "rescore_sentiment",
+            models=["buzz"],
+            checkpoint=self.checkpoint,
+            stdout=stdout,
+            **options,
+        )
+        return stdout.getvalue()
+
+    def interrupt(self, **options):
+        """Rescore stopping after the first batch is written"""
+
+        write = RescoreCommand._write
+
+        def interrupted(command, *args):
+            if os.path.exists(self.checkpoint):
+                raise KeyboardInterrupt
+            write(command, *args)
+
+        with mock.patch.object(RescoreCommand, "_write", interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                self.rescore(**options)
+
+    def get_values(self):
+        return list(self.buzzes.values_list("sentiment_value", flat=True))
+
+    def test_interrupted_run_resumes(self):
+        self.interrupt(only_null=True)
+        self.assertEqual(self.get_values()[1:], [None, None])
+
+        # rows before the checkpoint are not scored again
+        self.buzzes.filter(id=self.buzzes[0].id).update(sentiment_value=5.0)
+        self.assertIn("Rescored 2 rows", self.rescore(only_null=True))
+
+        values = self.get_values()
+        self.assertEqual(values[0], 5.0)
+        self.assertNotIn(None, values)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_restart_ignores_checkpoint(self):
+        self.interrupt(only_null=True)
+
+        with self.assertRaises(CommandError):
+            self.rescore()
+        self.buzzes.update(sentiment_value=5.0)
+        self.assertIn("Rescored 3 rows", self.rescore(restart=True))
+        self.assertNotIn(5.0, self.get_values())
+
+    def test_filters_select_rows(self):
+        first, second, third = [buzz.id for buzz in self.buzzes]
+
+        def rescored(**options):
+            # unscored, scored by an old version and by the current one
+            self.buzzes.filter(id=first).update(
+                sentiment_value=None, sentiment_version=None
+            )
+            self.buzzes.filter(id=second).update(
+                sentiment_value=5.0, sentiment_version="old"
+            )
+            self.buzzes.filter(id=third).update(
+                sentiment_value=5.0, sentiment_version=registry.get_model_version()
+            )
+
+            self.rescore(**options)
+            return list(
+                self.buzzes.exclude(sentiment_value=5.0)
+                .exclude(sentiment_value__isnull=True)
+                .values_list("id", flat=True)
+            )
+
+        self.assertEqual(rescored(only_null=True), [first])
+        self.assertEqual(rescored(model_version="old"), [second])
+        # scored across spawned workers
+        self.assertEqual(rescored(outdated=True, workers=2), [first, second])
+
+
+class SentimentTrainerTest(TestCase):
+    """ """
+
+    def test_trained_version_is_scored_by_registry(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data = os.path.join(directory, "data.csv")
+            with open(data, "w") as file:
+                file.write("polarity,text\n")
+                for i in range(20):
+                    file.write(f"4,what a lovely happy day {i}\n0,awful sad day {i}\n")
+
+            trainer = SentimentAnalysis(data_path=data, nrows=None, chunksize=16)
+            metrics = trainer.train()
+            version = trainer.save(directory)
+
+            self.assertEqual(metrics["test_rows"], 8)
+            version_dir = os.path.join(directory, version)
+            self.assertEqual(
+                sorted(os.listdir(version_dir)),
+                sorted([ENGINE_DIRNAME, "metadata.json", *MODEL_FILES.values()]),
+            )
+            with open(os.path.join(version_dir, "metadata.json")) as file:
+                self.assertEqual(json.load(file)["version"], version)
+
+            registry = ModelRegistry(model_dir=version_dir)
+            with mock.patch.object(
+                SentimentEngine, "from_models", side_effect=AssertionError
+            ):
+                positive, negative = registry.get_engine().score(
+                    ["lovely happy day", "awful sad day"]
+                )
+            self.assertEqual(registry.get_model_version(), version)
+            self.assertGreater(positive, negative)
+
+
+class EvaluateSentimentTest(TestCase):
+    """ """
+
+    def test_report_and_regression(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data = os.path.join(directory, "data.csv")
+            with open(data, "w") as file:
+                file.write("polarity,text\n")
+                for i in range(20):
+                    file.write(f"4,what a lovely happy day {i}\n0,awful sad day {i}\n")
+
+            output = os.path.join(directory, "report.json")
+            options = dict(
+                data=data, repeat=5, batch_sizes=[1, 5], stdout=io.StringIO()
+            )
+            call_command("evaluate_sentiment", output=output, **options)
+
+            with open(output) as file:
+                report = json.load(file)
+            self.assertEqual(report["accuracy"]["rows"], 8)
+            self.assertEqual(set(report["throughput"]["sentiment"]), {"1", "5"})
+            self.assertGreater(report["cold_start"]["seconds"], 0)
+
+            report["accuracy"]["sentiment"]["auc"] += 0.5
+            with open(output, "w") as file:
+                json.dump(report, file)
+            with self.assertRaises(CommandError):
+                call_command("evaluate_sentiment", baseline=output, **options)
@@ -1,183 +1,204 @@
-import time
+import datetime as dt
+import hashlib
+import json
 import os
-from pathlib import Path
+import time
 
+import numpy as np
 import pandas as pd
+import sklearn
+from joblib import Parallel, delayed, dump
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
 from sklearn.naive_bayes import MultinomialNB
 
+from .engine import SentimentEngine
+from .registry import ENGINE_DIRNAME, MODEL_FILES, VERSIONS_DIR, ModelRegistry
 
-module_dir=os.path.dirname(__file__)  # get current directory
+module_dir = os.path.dirname(__file__)  # get current directory
 
+TRAINING_DATA = os.path.join(module_dir, "notebook/data/sentiment140-subset.csv")
 
-class SentimentAnalysis:
 
-    df = None
-    words_df = None
-    vectorizer = None
-    X = None
-    Y = None
-    logreg = None
-    bayes = None
+class SentimentAnalysis:
+    """
+    Trains the tfidf vectorizer, logistic regression and naive bayes models
+    used by `utils.py` and writes them as a new version.
+
+    The tfidf matrix stays sparse from vectorizing to fitting, both models are
+    fit side by side, and a held-out split is scored so versions can be
+    compared. Given the same data and parameters, the same models are trained.
+    """
+
+    def __init__(
+        self,
+        data_path=TRAINING_DATA,
+        nrows=30000,
+        chunksize=10000,
+        max_features=1000,
+        C=1e9,
+        test_size=0.2,
+        seed=0,
+    ):
+        self.data_path = data_path
+        self.nrows = nrows
+        self.chunksize = chunksize
+        self.params = dict(
+            max_features=max_features, C=C, test_size=test_size, seed=seed
+        )
+
+        self.vectorizer = None
+        self.logreg = None
+        self.bayes = None
+        self.metrics = None
 
     def _load_training_data(self):
-        """Load Training Data"""
-        try:
-            if self.df is None:
-                start = time.time()
-                print("Loading Training data...")
-
-                # print(Path(__file__).__str__())
-                # df = pd.read_csv(file_dir + "/data/sentiment140-subset.csv", nrows=30000)
-                df = pd.read_csv(
-                    os.path.join(module_dir, "notebook/data/sentiment140-subset.csv"),
-                    nrows=30000,
-                )
-
-                end = time.time()
-                print(f"Completed Loading data.\nElasped Time: {end - start}")
-
-            return df
-        except Exception as error:
-            raise error
-
-    def _tfidf_vectorize_dataframe(self):
-        """Vectorize Dataframe"""
-        try:
-            if self.df is None:
-                print("Please load data first")
-                raise TypeError("df empty. Please load data first)")
-
-            df = self.df
-
-            start = time.time()
-            print("Tfidf Vectorizing Training data...")
-
-            vectorizer = TfidfVectorizer(max_features=1000)
-            vectors = vectorizer.fit_transform(df.text)
-            words_df = pd.DataFrame(
-                vectors.toarray(), columns=vectorizer.get_feature_names()
+        """
+        Read the `text` and `polarity` columns of the training csv in chunks.
+        Polarity is 0 for negative, anything above for positive
+        """
+
+        texts = []
+        labels = []
+        for chunk in pd.read_csv(
+            self.data_path,
+            usecols=["polarity", "text"],
+            nrows=self.nrows,
+            chunksize=self.chunksize,
+        ):
+            texts += chunk.text.fillna("").astype(str).tolist()
+            labels.append((chunk.polarity.to_numpy() > 0).astype(np.int64))
+
+        return texts, np.concatenate(labels) if labels else np.empty(0, np.int64)
+
+    def _get_data_checksum(self):
+        digest = hashlib.sha1()
+        with open(self.data_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _fit(model, X, Y):
+        return model.fit(X, Y)
+
+    def _evaluate(self, X, Y):
+        """Accuracy and roc auc of both models and their mean on `X`"""
+
+        probabilities = dict(
+            logreg=self.logreg.predict_proba(X)[:, 1],
+            bayes=self.bayes.predict_proba(X)[:, 1],
+        )
+        probabilities["ensemble"] = (
+            probabilities["logreg"] + probabilities["bayes"]
+        ) / 2
+
+        return dict(
+            (
+                name,
+                dict(
+                    accuracy=float(accuracy_score(Y, proba >= 0.5)),
+                    auc=float(roc_auc_score(Y, proba)),
+                ),
             )
-
-            end = time.time()
-            print(f"Completed Loading data.\nElasped Time: {end - start}")
-
-            self.vectorizer = vectorizer
-            self.words_df = words_df
-
-            return dict(words_df=words_df, vectorizer=vectorizer)
-
-        except Exception as error:
-            raise error
-
-    def _train_data(self):
-        """Train Data"""
-
-        try:
-            if self.df is None:
-                print("Please load data first")
-                raise TypeError("df empty. Please load data first)")
-            if self.words_df is None:
-                print("Please vectorize data first")
-                raise TypeError("words_df empty. Please vectorize loaded data first)")
-
-            X = self.words_df
-            Y = self.df.polarity
-
-            start = time.time()
-            print("Training Data using 1. logistic regression 2. Naive Bayes")
-
-            print("Starting Logistic Regression...")
-            logreg = LogisticRegression(C=1e9, solver="lbfgs", max_iter=1000)
-            logreg.fit(X, Y)
-
-            print("Starting Naive Bayes...")
-            bayes = MultinomialNB()
-            bayes.fit(X, Y)
-
-            end = time.time()
-            print(f"Completed Training data.\nElasped Time: {end - start}")
-
-            self.X = X
-            self.Y = Y
-            self.logreg = logreg
-            self.bayes = bayes
-
-            return dict(X=X, Y=Y, logreg=logreg, bayes=bayes)
-
-        except Exception as error:
-            raise error
-
-    def _vectorize_unknown(self, content_to_analyze):
-        """ """
-        try:
-            if self.vectorizer is None:
-                print("Please vectorize data first")
-                raise TypeError("words_df empty. Please vectorize loaded data first)")
-
-            vectorizer = self.vectorizer
-
-            start = time.time()
-            print("Tfidf Vectorizing data to be analyzed...")
-
-            unknown = pd.DataFrame({"content": [content_to_analyze]})
-            unknown_vectors = vectorizer.transform(unknown.content)
-            unknown_words_df = pd.DataFrame(
-                unknown_vectors.toarray(), columns=vectorizer.get_feature_names()
+            for name, proba in probabilities.items()
+        )
+
+    def split(self):
+        """
+        `(train_texts, test_texts, train_labels, test_labels)` of the training
+        data. The held-out rows only depend on the data, `test_size` and `seed`
+        """
+
+        texts, labels = self._load_training_data()
+        if len(set(labels)) < 2:
+            raise ValueError("Training data needs both positive and negative rows")
+
+        return train_test_split(
+            texts,
+            labels,
+            test_size=self.params["test_size"],
+            random_state=self.params["seed"],
+            stratify=labels,
+        )
+
+    def train(self):
+        """Fit the vectorizer and both models, returning held-out metrics"""
+
+        start = time.time()
+        train_texts, test_texts, train_labels, test_labels = self.split()
+
+        self.vectorizer = TfidfVectorizer(max_features=self.params["max_features"])
+        X_train = self.vectorizer.fit_transform(train_texts)
+        X_test = self.vectorizer.transform(test_texts)
+
+        # both fits release the gil in their numeric code, threads avoid
+        # copying the matrix into other processes
+        self.logreg, self.bayes = Parallel(n_jobs=2, prefer="threads")(
+            delayed(self._fit)(model, X_train, train_labels)
+            for model in [
+                LogisticRegression(C=self.params["C"], solver="lbfgs", max_iter=1000),
+                MultinomialNB(),
+            ]
+        )
+
+        self.metrics = dict(
+            train_rows=len(train_texts),
+            test_rows=len(test_texts),
+            train_seconds=round(time.time() - start, 3),
+            **self._evaluate(X_test, test_labels),
+        )
+        return self.metrics
+
+    def save(self, versions_dir=VERSIONS_DIR):
+        """
+        Write the models, an exported engine and a `metadata.json` to a new
+        version directory. Returns the version name
+        """
+
+        if self.metrics is None:
+            raise TypeError("Models are not trained. Please train them first")
+
+        created = dt.datetime.now(dt.timezone.utc)
+        data_checksum = self._get_data_checksum()
+        version = (
+            created.strftime("%Y%m%d%H%M%S")
+            + "-"
+            + hashlib.sha1(
+                json.dumps([self.params, data_checksum]).encode()
+            ).hexdigest()[:8]
+        )
+
+        directory = os.path.join(versions_dir, version)
+        os.makedirs(directory)
+
+        models = dict(logreg=self.logreg, bayes=self.bayes, vectorizer=self.vectorizer)
+        for name, filename in MODEL_FILES.items():
+            dump(models[name], os.path.join(directory, filename))
+
+        SentimentEngine.from_models(**models).save(
+            os.path.join(directory, ENGINE_DIRNAME),
+            checksum=ModelRegistry(directory).get_model_checksum(),
+        )
+
+        with open(os.path.join(directory, "metadata.json"), "w") as file:
+            json.dump(
+                dict(
+                    version=version,
+                    created=created.isoformat(),
+                    data=dict(
+                        path=os.path.relpath(self.data_path, module_dir),
+                        checksum=data_checksum,
+                        rows=self.nrows,
+                    ),
+                    params=self.params,
+                    sklearn=sklearn.__version__,
+                    metrics=self.metrics,
+                ),
+                file,
+                indent=2,
             )
 
-            end = time.time()
-            print(f"Completed Vectorizing data.\nElasped Time: {end - start}")
-
-            return dict(unknown=unknown, unknown_words_df=unknown_words_df)
-
-        except Exception as error:
-            raise error
-
-    def calculate_sentiment(self, content_to_analyze):
-        """ """
-        try:
-            if self.vectorizer is None:
-                print("Please vectorize data first")
-                raise TypeError("words_df empty. Please vectorize loaded data first)")
-
-            if self.logreg is None or self.bayes is None:
-                print("Please train data first")
-                raise TypeError("logreg and bayes empty. Please train data first)")
-
-            vectorized_unknown = self._vectorize_unknown(content_to_analyze)
-            logreg = self.logreg
-            bayes = self.bayes
-
-            unknown = vectorized_unknown["unknown"]
-            unknown_words_df = vectorized_unknown["unknown_words_df"]
-
-            # Logistic Regression predictions + probabilities
-            unknown["pred_logreg"] = logreg.predict(unknown_words_df)
-            unknown["pred_logreg_proba"] = logreg.predict_proba(unknown_words_df)[:, 1]
-
-            # Bayes predictions + probabilities
-            unknown["pred_bayes"] = bayes.predict(unknown_words_df)
-            unknown["pred_bayes_proba"] = bayes.predict_proba(unknown_words_df)[:, 1]
-
-            return (unknown["pred_bayes_proba"] + unknown["pred_logreg_proba"]) / 2
-
-        except Exception as error:
-            raise error
-
-    def __init__(self):
-        """ """
-
-        self._load_training_data()
-        self._tfidf_vectorize_dataframe()
-        self._train_data()
-
-
-# sensisitivity_analyzer = SentimentAnalysis()
-
-
-# def calculate_sensitivity_index(content):
-#     """ """
-
-#     return sensisitivity_analyzer.calculate_sentiment(content)
+        return version
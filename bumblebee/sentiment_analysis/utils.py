@@ -1,32 +1,37 @@
-import os
+import itertools
 import time
 
-from joblib import load
-import pandas as pd
-from textblob import TextBlob
+import numpy as np
 
-# Load trained models from dumps
-module_dir = os.path.dirname(__file__)  # get current directory
+from .cache import normalize_content, sentiment_cache
+from .inference import inference_client
+from .lexicon import get_lexicon
+from .registry import registry
 
+# pandas, scikit-learn and the trained models are imported on first use, see
+# `registry.ModelRegistry`
 
-logreg = load(
-    os.path.join(module_dir, "notebook/trained_models/LogRegForSentimentAnalysis.sav")
-)
-bayes = load(
-    os.path.join(module_dir, "notebook/trained_models/NaiBayesForSentimentAnalysis.sav")
-)
-vectorizer = load(
-    os.path.join(module_dir, "notebook/trained_models/DfFittedVectorizer.sav")
-)
+# number of contents vectorized and scored together by the batch api
+SENTIMENT_CHUNK_SIZE = 1000
 
 
 def vectorize_unknown(content_to_analyze):
-    """ """
+    """
+    Tfidf vectorize a content, or a list of contents in a single pass, into a
+    dense DataFrame. Kept as the baseline of the `benchmark_sentiment` command
+    """
     try:
         start = time.time()
         print("Tfidf Vectorizing data to be analyzed...")
 
-        unknown = pd.DataFrame({"content": [content_to_analyze]})
+        import pandas as pd
+
+        vectorizer = registry.get_models()["vectorizer"]
+
+        if not isinstance(content_to_analyze, list):
+            content_to_analyze = [content_to_analyze]
+
+        unknown = pd.DataFrame({"content": content_to_analyze})
         unknown_vectors = vectorizer.transform(unknown.content)
         unknown_words_df = pd.DataFrame(
             unknown_vectors.toarray(), columns=vectorizer.get_feature_names()
@@ -41,9 +46,15 @@ def vectorize_unknown(content_to_analyze):
         raise error
 
 
-def calculate_sentiment_index(content_to_analyze):
-    """ """
+def calculate_dense_sentiment_index(content_to_analyze):
+    """
+    Sentiment index through dense DataFrames, as the models were trained.
+    Kept as the baseline of the `benchmark_sentiment` command
+    """
     try:
+        logreg = registry.get_models()["logreg"]
+        bayes = registry.get_models()["bayes"]
+
         #  Vectorize diven data
         vectorized_unknown = vectorize_unknown(content_to_analyze)
 
@@ -64,7 +75,129 @@ def calculate_sentiment_index(content_to_analyze):
         raise error
 
 
+def calculate_sentiment_index(content_to_analyze):
+    """
+    Calculate the sentiment index of a content, from 0 (negative) to 1
+    (positive)
+    """
+
+    return float(registry.get_engine().score([content_to_analyze])[0])
+
+
+def _iterate_chunks(contents, chunk_size):
+    """Split an iterable of contents into lists of at most `chunk_size`"""
+
+    contents = iter(contents)
+    while True:
+        chunk = list(itertools.islice(contents, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def calculate_sentiment_indexes(contents, chunk_size=SENTIMENT_CHUNK_SIZE):
+    """
+    Calculate the sentiment index of every content of an iterable as a numpy
+    array. Contents are vectorized and scored a chunk at a time, with a single
+    sparse product per chunk instead of one model call per content
+    """
+
+    chunks = [
+        registry.get_engine().score(chunk)
+        for chunk in _iterate_chunks(contents, chunk_size)
+    ]
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
 def calculate_textblob_value(content_to_analyze):
-    """ """
+    """
+    Calculate the textblob polarity of a content, from -1 (negative) to 1
+    (positive)
+    """
+
+    return float(get_lexicon().score([content_to_analyze])[0])
+
+
+def calculate_textblob_values(contents):
+    """
+    Calculate the textblob polarity of every content of an iterable as a numpy
+    array, with the compiled lexicon instead of a `TextBlob` per content
+    """
+
+    return get_lexicon().score(list(contents))
+
+
+def score_contents(contents):
+    """
+    Score contents in this process, returning the model version and the
+    sentiment indexes and textblob polarities as two numpy arrays. Contents
+    are scored again when another version was activated while scoring, so
+    the version returned is the one every index was computed with
+    """
+
+    while True:
+        version = registry.get_model_version()
+        sentiment_indexes = calculate_sentiment_indexes(contents)
+        if registry.get_model_version() == version:
+            return version, sentiment_indexes, calculate_textblob_values(contents)
+
+
+def request_sentiment_values(contents, version):
+    """
+    Model version, sentiment indexes and textblob polarities of contents,
+    scored by the `serve_sentiment` inference server when it runs with the
+    models of `version`, otherwise in this process. The version returned
+    differs from `version` when another one was activated meanwhile
+    """
+
+    result = inference_client.score(contents)
+    if result is None or result[0] != version:
+        result = score_contents(contents)
+    return result
+
+
+def calculate_versioned_sentiment_values(contents):
+    """
+    Calculate the sentiment index and textblob polarity of every content of an
+    iterable, as two numpy arrays, along with the model version which scored
+    them. Scores are memoized by content, only contents missing from the
+    cache are scored, once each
+    """
+
+    contents = [normalize_content(content) for content in contents]
+
+    while True:
+        version = registry.get_model_version()
+        scores = sentiment_cache.get_many(version, contents)
+        missing = list(dict.fromkeys(c for c in contents if c not in scores))
+        if not missing:
+            break
+
+        scored_version, sentiment_values, textblob_values = request_sentiment_values(
+            missing, version
+        )
+        computed = dict(
+            (content, (float(sentiment_value), float(textblob_value)))
+            for content, sentiment_value, textblob_value in zip(
+                missing, sentiment_values, textblob_values
+            )
+        )
+        # cached under the version which scored them, whichever it is
+        sentiment_cache.set_many(scored_version, computed)
+
+        if scored_version == version:
+            scores.update(computed)
+            break
+        # the models changed while scoring, the hits are of the older version
+
+    values = np.array([scores[content] for content in contents]).reshape(-1, 2)
+    return version, values[:, 0], values[:, 1]
+
+
+def calculate_sentiment_values(contents):
+    """
+    Calculate the sentiment index and textblob polarity of every content of an
+    iterable, as two numpy arrays
+    """
 
-    return TextBlob(content_to_analyze).sentiment.polarity
+    return calculate_versioned_sentiment_values(contents)[1:]
@@ -106,6 +106,16 @@ DATABASES = {
 }
 
 
+# Cache, holds feed responses. Shared by every worker, so a feed invalidated
+# by one is not served by the others; create it with `createcachetable`
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "bumblebee_cache",
+    }
+}
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
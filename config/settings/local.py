@@ -94,6 +94,15 @@ DATABASES = {
 }
 
 
+# Cache, holds feed responses
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "bumblebee",
+    }
+}
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {